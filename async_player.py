@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiohttp
+
+from player import (DEFAULT_RETRY_POLICY, DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS, IDEMPOTENT_ENDPOINTS, LONG_POLL_MARGIN,
+                    PlayerSource, PlayerStatus, endpoint_label, get_breaker, parse_browse_page, parse_status,
+                    volume_params)
+from metrics import REQUEST_METRICS, RequestMetrics
+from resilience import CircuitBreaker, RetryPolicy, failed_attempt
+
+logger = logging.getLogger(__name__)
+
+RequestError = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def _error_text(e: BaseException) -> str:
+    # asyncio.TimeoutError has an empty message
+    return str(e) or type(e).__name__
+
+
+def _is_unreachable(error: BaseException) -> bool:
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return _is_unreachable(error)
+
+
+class AsyncBlusoundPlayer:
+    """asyncio counterpart of BlusoundPlayer.
+
+    Shares the PlayerStatus/PlayerSource models and XML parsing with the
+    threaded client. Pass one aiohttp.ClientSession to many players so a
+    single event loop can drive a whole fleet over pooled connections.
+    """
+
+    def __init__(self, host_name, name, port: int = 11000,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 timeouts: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.host_name = host_name
+        self.name = name
+        self.address = f"{self.host_name}:{port}"
+        self.base_url = f"http://{self.address}"
+        self.sources: List[PlayerSource] = []
+        self.timeouts: Dict[str, Tuple[float, float]] = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.metrics: RequestMetrics = REQUEST_METRICS
+        self.retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY
+        self._session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self) -> 'AsyncBlusoundPlayer':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def circuit(self) -> CircuitBreaker:
+        # Shared with any threaded BlusoundPlayer for the same address.
+        return get_breaker(self.base_url)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=8))
+        return self._session
+
+    async def request(self, url: str, params: Optional[Dict] = None,
+                      timeout: Optional[Tuple[float, float]] = None, deadline: Optional[float] = None,
+                      idempotent: Optional[bool] = None) -> str:
+        """Async counterpart of BlusoundPlayer.request, sharing its circuit breaker and retry policy."""
+        endpoint = url.split('?', 1)[0]
+        if timeout is None:
+            timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        if idempotent is None:
+            idempotent = endpoint in IDEMPOTENT_ENDPOINTS
+        attempts = self.retry_policy.attempts if idempotent else 1
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline if deadline is not None else None
+        breaker = self.circuit
+        label = endpoint_label(url, params)
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise aiohttp.ClientConnectionError(f"{self.name} is unreachable (circuit {breaker.state}, "
+                                                    f"next check in {breaker.retry_in:.0f}s)")
+            attempt_timeout = timeout
+            if expires is not None:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Deadline of {deadline}s exceeded for {label} on {self.name}")
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+            try:
+                body = await self._send(url, params, attempt_timeout, label)
+            except RequestError as e:
+                remaining = expires - loop.time() if expires is not None else None
+                delay = failed_attempt(breaker, self.retry_policy, attempt, attempts,
+                                       _is_unreachable(e), _is_retryable(e), remaining)
+                if delay is None:
+                    raise
+                logger.info(f"Retrying {label} on {self.name} in {delay:.2f}s after: {_error_text(e)}")
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return body
+
+    async def _send(self, url: str, params: Optional[Dict], timeout: Tuple[float, float], label: str) -> str:
+        full_url = f"{self.base_url}{url}"
+        connect_timeout, read_timeout = timeout
+        logger.debug("Sending request to: %s params: %s", full_url, params)
+        query = {key: str(value) for key, value in params.items()} if params else None
+        started = time.perf_counter()
+        try:
+            async with self._get_session().get(
+                    full_url, params=query,
+                    timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)) as response:
+                body = await response.read()
+        except asyncio.TimeoutError:
+            self.metrics.record(self.address, label, time.perf_counter() - started, error=True, timeout=True)
+            raise
+        except aiohttp.ClientError:
+            self.metrics.record(self.address, label, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(self.address, label, time.perf_counter() - started, len(body),
+                            error=response.status >= 400)
+        logger.debug("Response status code: %s", response.status)
+        response.raise_for_status()
+        return body.decode(response.get_encoding())
+
+    async def capture_sources(self, browse_key: Optional[str] = None) -> List[PlayerSource]:
+        url = "/Browse"
+        sources: List[PlayerSource] = []
+        seen_keys = set()
+        key = browse_key
+        try:
+            while True:
+                params = {"key": key} if key else None
+                page = parse_browse_page([await self.request(url, params)])
+                sources.extend(page.items)
+                if not page.next_key or page.next_key in seen_keys:
+                    break
+                seen_keys.add(page.next_key)
+                key = page.next_key
+            logger.debug("Captured %d sources for %s", len(sources), self.name)
+            return sources
+        except RequestError as e:
+            logger.error(f"Error capturing sources for {self.name}: {_error_text(e)}")
+            return []
+
+    async def get_nested_sources(self, source: PlayerSource) -> None:
+        if source.browse_key:
+            nested_sources = await self.capture_sources(source.browse_key)
+            if nested_sources:
+                source.children = nested_sources
+            else:
+                logger.warning(f"No nested sources found for {source.text}")
+
+    async def initialize_sources(self) -> None:
+        self.sources = await self.capture_sources()
+        if not self.sources and not self.circuit.is_open:
+            delay = self.retry_policy.backoff(self.retry_policy.attempts)
+            logger.warning(f"No sources found for {self.name}. Retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+            self.sources = await self.capture_sources()
+        logger.info(f"Initialized {len(self.sources)} sources for {self.name}")
+
+    async def get_status(self, timeout: Optional[int] = None, etag: Optional[str] = None,
+                         deadline: Optional[float] = None) -> Tuple[bool, Union[PlayerStatus, str]]:
+        url = "/Status"
+        params = {}
+        if timeout:
+            params['timeout'] = timeout
+        if etag:
+            params['etag'] = etag
+
+        connect_timeout, read_timeout = self.timeouts.get(url, DEFAULT_TIMEOUT)
+        if timeout:
+            read_timeout = max(read_timeout, timeout + LONG_POLL_MARGIN)
+
+        logger.debug("Getting status for %s", self.name)
+        try:
+            status = parse_status(await self.request(url, params, timeout=(connect_timeout, read_timeout),
+                                                     deadline=deadline))
+            logger.debug("Status for %s: %s", self.name, status)
+            return True, status
+        except RequestError as e:
+            logger.error(f"Error getting status for {self.name}: {_error_text(e)}")
+            return False, _error_text(e)
+
+    async def _command(self, url: str, params: Optional[Dict], success_message: str,
+                       error_context: str, idempotent: Optional[bool] = None) -> Tuple[bool, str]:
+        try:
+            await self.request(url, params, idempotent=idempotent)
+            return True, success_message
+        except RequestError as e:
+            logger.error(f"Error {error_context} for {self.name}: {_error_text(e)}")
+            return False, _error_text(e)
+
+    async def set_volume(self, volume: Optional[int] = None, db: Optional[float] = None,
+                         tell_slaves: Optional[bool] = None) -> Tuple[bool, str]:
+        params = volume_params(volume, db, tell_slaves)
+        logger.info(f"Setting volume for {self.name}: {params}")
+        return await self._command("/Volume", params, "Volume set successfully", "setting volume",
+                                   idempotent=db is None)
+
+    async def toggle_play_pause(self) -> Tuple[bool, str]:
+        logger.info(f"Toggling play/pause for {self.name}")
+        return await self._command("/Pause", {'toggle': 1}, "Playback toggled successfully", "toggling play/pause")
+
+    async def skip(self) -> Tuple[bool, str]:
+        logger.info(f"Skipping track on {self.name}")
+        return await self._command("/Skip", None, "Skipped to next track successfully", "skipping track")
+
+    async def back(self) -> Tuple[bool, str]:
+        logger.info(f"Going back a track on {self.name}")
+        return await self._command("/Back", None, "Went back to previous track successfully", "going back a track")
+
+    async def select_input(self, source: PlayerSource) -> Tuple[bool, str]:
+        if source.play_url:
+            url, params = source.play_url, None
+        elif source.browse_key:
+            url, params = "/Browse", {'key': source.browse_key}
+        else:
+            return False, "Invalid source"
+        logger.info(f"Selecting source for {self.name}: {source.text}")
+        return await self._command(url, params, f"{source.text} selected successfully", "selecting source")
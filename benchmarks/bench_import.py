@@ -0,0 +1,73 @@
+"""Check module import times against budgets using `python -X importtime`.
+
+Each module is imported in a fresh interpreter several times and the
+fastest cumulative time is compared with its budget. The run also fails if
+importing a module loads one of the heavy dependencies that should only be
+imported on first use.
+
+Usage: python benchmarks/bench_import.py [-n RUNS]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budgets in milliseconds. They leave headroom for
+# slow machines; a lazily imported dependency slipping back onto the import
+# path costs 50-150ms and blows through them.
+BUDGETS_MS: Dict[str, float] = {
+    'metrics': 10,
+    'player': 45,
+    'cache': 50,
+    'headless': 55,
+    'search': 50,
+    'cli': 55,
+}
+
+# Loaded on first use only: HTTP, mDNS, XML parsing, log handlers and asyncio HTTP.
+LAZY_MODULES = ('requests', 'urllib3', 'zeroconf', 'xml.etree.ElementTree', 'logging.handlers', 'aiohttp')
+
+
+def measure_import(module: str, runs: int = 5) -> Tuple[float, List[str]]:
+    """Fastest cumulative import time of `module` in ms, and the lazy modules it loaded."""
+    probe = (f"import {module}, sys, json; "
+             f"print(json.dumps(sorted(m for m in {LAZY_MODULES!r} if m in sys.modules)))")
+    best = float('inf')
+    loaded: List[str] = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[2] == module:
+                best = min(best, int(parts[1]) / 1000)
+        loaded = json.loads(result.stdout)
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        elapsed, loaded = measure_import(module, args.runs)
+        status = 'ok'
+        if elapsed > budget:
+            status = 'OVER BUDGET'
+            failures.append(module)
+        if loaded:
+            status = f"loads {', '.join(loaded)}"
+            failures.append(module)
+        print(f"{module:<10} {elapsed:>7.1f} ms  (budget {budget:g} ms)  {status}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Measure /Status parse throughput and PlayerStatus memory per instance.
+
+Compares the table-driven parse_status with the original find()-per-field
+parser building a regular (dict-backed) dataclass.
+
+Usage: python benchmarks/bench_parse.py [-n PARSES]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, fields
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bluos_server import STATUS_XML  # noqa: E402
+from player import PlayerStatus, parse_status  # noqa: E402
+
+LegacyPlayerStatus = dataclass(type('LegacyPlayerStatus', (), {
+    '__annotations__': {f.name: f.type for f in fields(PlayerStatus)},
+    **{f.name: f.default for f in fields(PlayerStatus)},
+}))
+
+
+def legacy_parse_status(xml_text):
+    root = ET.fromstring(xml_text)
+
+    def safe_find(element, tag, default=''):
+        found = element.find(tag)
+        return found.text if found is not None else default
+
+    def safe_int(value, default=0):
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return default
+
+    return LegacyPlayerStatus(
+        etag=root.get('etag', ''),
+        album=safe_find(root, 'album'),
+        artist=safe_find(root, 'artist'),
+        name=safe_find(root, 'title1'),
+        state=safe_find(root, 'state'),
+        volume=safe_int(safe_find(root, 'volume')),
+        service=safe_find(root, 'service'),
+        inputId=safe_find(root, 'inputId'),
+        can_move_playback=safe_find(root, 'canMovePlayback') == 'true',
+        can_seek=safe_int(safe_find(root, 'canSeek')) == 1,
+        cursor=safe_int(safe_find(root, 'cursor')),
+        db=float(safe_find(root, 'db', '0')),
+        fn=safe_find(root, 'fn'),
+        image=safe_find(root, 'image'),
+        indexing=safe_int(safe_find(root, 'indexing')),
+        mid=safe_int(safe_find(root, 'mid')),
+        mode=safe_int(safe_find(root, 'mode')),
+        mute=safe_int(safe_find(root, 'mute')) == 1,
+        pid=safe_int(safe_find(root, 'pid')),
+        prid=safe_int(safe_find(root, 'prid')),
+        quality=safe_int(safe_find(root, 'quality')),
+        repeat=safe_int(safe_find(root, 'repeat')),
+        service_icon=safe_find(root, 'serviceIcon'),
+        service_name=safe_find(root, 'serviceName'),
+        shuffle=safe_int(safe_find(root, 'shuffle')) == 1,
+        sid=safe_int(safe_find(root, 'sid')),
+        sleep=safe_find(root, 'sleep'),
+        song=safe_int(safe_find(root, 'song')),
+        stream_format=safe_find(root, 'streamFormat'),
+        sync_stat=safe_int(safe_find(root, 'syncStat')),
+        title1=safe_find(root, 'title1'),
+        title2=safe_find(root, 'title2'),
+        title3=safe_find(root, 'title3'),
+        totlen=safe_int(safe_find(root, 'totlen')),
+        secs=safe_int(safe_find(root, 'secs'))
+    )
+
+
+def throughput(parse, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        parse(STATUS_XML)
+    return count / (time.perf_counter() - start)
+
+
+def bytes_per_instance(parse, count=10000):
+    # Parse outside the measurement so only the retained instances are counted.
+    template = parse(STATUS_XML)
+    values = {f.name: getattr(template, f.name) for f in fields(template)}
+    cls = type(template)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [cls(**values) for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # Subtract the list holding the instances.
+    return (allocated - sys.getsizeof(instances)) / len(instances)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--parses', type=int, default=20000)
+    args = parser.parse_args()
+
+    assert legacy_parse_status(STATUS_XML).volume == parse_status(STATUS_XML).volume
+    for label, parse in (('before', legacy_parse_status), ('after', parse_status)):
+        rate = throughput(parse, args.parses)
+        size = bytes_per_instance(parse)
+        print(f"{label:<10} {rate:>10.0f} parses/s   {size:6.0f} bytes/instance")
+
+
+if __name__ == '__main__':
+    main()
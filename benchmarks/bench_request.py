@@ -0,0 +1,53 @@
+"""Compare one-shot requests.get calls with the pooled BlusoundPlayer.request.
+
+Usage: python benchmarks/bench_request.py [-n REQUESTS] [--endpoint /Status]
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bluos_server import BluOSServer  # noqa: E402
+from player import BlusoundPlayer  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(label, call, count):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {count / elapsed:>10.0f} req/s   "
+          f"p50 {percentile(latencies, 50) * 1000:6.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--requests', type=int, default=2000)
+    parser.add_argument('--endpoint', default='/Status')
+    args = parser.parse_args()
+
+    with BluOSServer() as server:
+        host, port = server.address
+        url = f"http://{host}:{port}{args.endpoint}"
+        player = BlusoundPlayer(host, 'bench', port=port)
+
+        run('before', lambda: requests.get(url).raise_for_status(), args.requests)
+        run('after', lambda: player.request(args.endpoint), args.requests)
+
+
+if __name__ == '__main__':
+    main()
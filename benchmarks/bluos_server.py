@@ -0,0 +1,348 @@
+"""Local stand-in for a BluOS player's HTTP API, used by the benchmarks.
+
+Each BluOSServer simulates one player: /Status honours etag long-polls,
+/Volume, /Play, /Pause, /Skip and /Back change the simulated state,
+/SyncStatus reports groups formed with BluOSFleet.group, and /Browse
+serves either the small static menu below or a generated tree of any
+depth and width, paged with nextKey. SimulatorConfig adds latency, jitter
+and failures; BluOSFleet starts many players at once.
+"""
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+from xml.sax.saxutils import quoteattr
+
+STATUS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<status etag="{etag}">
+<album>Kind of Blue</album>
+<artist>Miles Davis</artist>
+<canMovePlayback>true</canMovePlayback>
+<canSeek>1</canSeek>
+<cursor>1</cursor>
+<db>{db}</db>
+<fn>Tidal:123456</fn>
+<image>/Artwork?service=Tidal&amp;songid=Tidal%3A123456</image>
+<indexing>0</indexing>
+<mid>12</mid>
+<mode>1</mode>
+<mute>0</mute>
+<pid>34</pid>
+<prid>0</prid>
+<quality>1411000</quality>
+<repeat>2</repeat>
+<service>Tidal</service>
+<serviceIcon>/Sources/images/TidalIcon.png</serviceIcon>
+<serviceName>TIDAL</serviceName>
+<shuffle>0</shuffle>
+<sid>5</sid>
+<sleep></sleep>
+<song>{song}</song>
+<state>{state}</state>
+<streamFormat>FLAC 44.1kHz/16bit</streamFormat>
+<syncStat>56</syncStat>
+<title1>{title1}</title1>
+<title2>Miles Davis</title2>
+<title3>Kind of Blue</title3>
+<totlen>562</totlen>
+<secs>81</secs>
+<volume>{volume}</volume>
+</status>
+"""
+
+TRACKS = ("So What", "Freddie Freeloader", "Blue in Green", "All Blues", "Flamenco Sketches")
+
+STATUS_XML = STATUS_TEMPLATE.format(etag="4e266c9fbfba6d13d1a4d6ff4bd2e1e6", db=-23.5, song=0,
+                                    state="stream", title1=TRACKS[0], volume=28)
+
+BROWSE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<browse sid="1" type="menu">
+<item text="TuneIn" image="/Sources/images/TuneInIcon.png" browseKey="TuneIn:" type="link"/>
+<item text="Tidal" image="/Sources/images/TidalIcon.png" browseKey="Tidal:" type="link"/>
+<item text="Optical Input" image="/images/InputIcon.png" playURL="/Play?url=Capture%3Ahw%3A1" inputType="spdif" type="audio"/>
+</browse>
+"""
+
+SYNC_STATUS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<SyncStatus etag="{etag}" name={name} mac="{mac}" group={group} volume="{volume}" modelName="NODE" brand="Bluesound">
+{members}</SyncStatus>
+"""
+
+VOLUME_TEMPLATE = '<?xml version="1.0" encoding="UTF-8"?>\n<volume db="{db}" mute="0">{volume}</volume>\n'
+EMPTY_XML = '<?xml version="1.0" encoding="UTF-8"?>\n<ok/>\n'
+
+# Keys of the generated tree: "node" for the root, "node:2:0" for the first child of the third item.
+TREE_ROOT = 'node'
+# Suffix of a nextKey: "node:2@100" is the page of node:2 starting at item 100.
+PAGE_SEPARATOR = '@'
+
+
+@dataclass
+class SimulatorConfig:
+    # Added to every response, in seconds, plus a uniform +/- jitter.
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of requests answered with 503.
+    failure_rate: float = 0.0
+    # Fraction of requests held for an extra `tail_latency` seconds, for tail-latency experiments.
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+    # 0 serves the static BROWSE_XML menu; otherwise a generated tree this many levels deep.
+    browse_depth: int = 0
+    browse_fanout: int = 20
+    # Items per /Browse response before a nextKey is added; 0 never pages.
+    browse_page_size: int = 0
+    seed: Optional[int] = None
+
+
+class SimulatedPlayer:
+    """Mutable player state behind one server; commands wake pending long-polls."""
+
+    def __init__(self, name: str = 'Simulated Player'):
+        self.name = name
+        self.volume = 28
+        # Like the BluOS volume limit setting: higher levels are clamped to it.
+        self.max_volume = 100
+        self.state = 'stream'
+        self.song = 0
+        self.mac = '90:56:82:00:00:00'
+        # (host, port) of the group master when this player is a slave, and of the slaves when it is a master.
+        self.master: Optional[Tuple[str, int]] = None
+        self.slaves: List[Tuple[str, int]] = []
+        self.group_name = ''
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def etag(self) -> str:
+        return f"{self.version:032x}"
+
+    def status_xml(self) -> str:
+        with self._changed:
+            return STATUS_TEMPLATE.format(etag=self.etag, db=round(self.volume / 2 - 50, 1), song=self.song,
+                                          state=self.state, title1=TRACKS[self.song % len(TRACKS)],
+                                          volume=self.volume)
+
+    def sync_status_xml(self) -> str:
+        with self._changed:
+            if self.master:
+                members = f'<master port="{self.master[1]}">{self.master[0]}</master>\n'
+            else:
+                members = ''.join(f'<slave id="{host}" port="{port}"/>\n' for host, port in self.slaves)
+            return SYNC_STATUS_TEMPLATE.format(etag=self.etag, name=quoteattr(self.name), mac=self.mac,
+                                               group=quoteattr(self.group_name), volume=self.volume,
+                                               members=members)
+
+    def wait_for_change(self, etag: str, timeout: float) -> None:
+        """Block until the etag differs from `etag` or `timeout` seconds pass."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self.etag == etag:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._changed.wait(remaining)
+
+    def update(self, **changes) -> None:
+        with self._changed:
+            for attr, value in changes.items():
+                setattr(self, attr, value)
+            self.version += 1
+            self._changed.notify_all()
+
+
+def browse_tree_xml(key: str, config: SimulatorConfig) -> Optional[str]:
+    """Render one page of the generated tree, or None if `key` is not part of it."""
+    key, _, offset_text = key.partition(PAGE_SEPARATOR)
+    path = key.split(':')
+    if path[0] != TREE_ROOT or (offset_text and not offset_text.isdigit()):
+        return None
+    level = len(path) - 1
+    if level >= config.browse_depth:
+        return None
+    offset = int(offset_text or 0)
+    end = config.browse_fanout
+    if config.browse_page_size:
+        end = min(end, offset + config.browse_page_size)
+    attrs = f' nextKey={quoteattr(f"{key}{PAGE_SEPARATOR}{end}")}' if end < config.browse_fanout else ''
+    lines = [f'<?xml version="1.0" encoding="UTF-8"?>\n<browse sid="1" type="menu"{attrs}>']
+    for index in range(offset, end):
+        child = f"{key}:{index}"
+        text = quoteattr(f"Item {child[len(TREE_ROOT) + 1:]}")
+        if level + 1 < config.browse_depth:
+            lines.append(f'<item text={text} image="/images/folder.png" browseKey="{child}" type="link"/>')
+        else:
+            play = quoteattr('/Play?' + urlencode({'url': f"Tidal:{child}"}))
+            lines.append(f'<item text={text} image="/images/track.png" playURL={play} type="audio"/>')
+    lines.append('</browse>\n')
+    return '\n'.join(lines)
+
+
+def browse_tree_size(config: SimulatorConfig) -> int:
+    """Number of items in the generated tree."""
+    return sum(config.browse_fanout ** level for level in range(1, config.browse_depth + 1))
+
+
+class BluOSHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        config: SimulatorConfig = self.server.config
+        player: SimulatedPlayer = self.server.player
+        url = urlparse(self.path)
+        path = url.path
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        delay = config.latency + (self.server.random.uniform(-config.jitter, config.jitter) if config.jitter else 0)
+        if config.tail_rate and self.server.random.random() < config.tail_rate:
+            delay += config.tail_latency
+        if delay > 0:
+            time.sleep(delay)
+        if config.failure_rate and self.server.random.random() < config.failure_rate:
+            self.send_error(503)
+            return
+
+        if path == '/Status':
+            if 'timeout' in query and query.get('etag') == player.etag:
+                player.wait_for_change(query['etag'], float(query['timeout']))
+            body = player.status_xml()
+        elif path == '/Browse':
+            key = query.get('key')
+            if config.browse_depth:
+                body = browse_tree_xml(key or TREE_ROOT, config)
+            else:
+                body = BROWSE_XML if key is None else '<?xml version="1.0" encoding="UTF-8"?>\n<browse/>\n'
+            if body is None:
+                self.send_error(404)
+                return
+        elif path == '/Volume':
+            if 'level' in query:
+                player.update(volume=max(0, min(player.max_volume, int(query['level']))))
+            elif 'db' in query:
+                player.update(volume=max(0, min(player.max_volume, player.volume + round(float(query['db']) * 2))))
+            body = VOLUME_TEMPLATE.format(db=round(player.volume / 2 - 50, 1), volume=player.volume)
+        elif path == '/Pause':
+            if query.get('toggle') == '1':
+                player.update(state='pause' if player.state in ('play', 'stream') else 'stream')
+            else:
+                player.update(state='pause')
+            body = EMPTY_XML
+        elif path == '/SyncStatus':
+            body = player.sync_status_xml()
+        elif path == '/Skip':
+            player.update(song=player.song + 1)
+            body = EMPTY_XML
+        elif path == '/Back':
+            player.update(song=max(0, player.song - 1))
+            body = EMPTY_XML
+        elif path == '/Play':
+            player.update(state='stream')
+            body = EMPTY_XML
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that give up early (deadlines, hedging) close the socket mid-response; that is expected.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class BluOSServer:
+    """Runs a stand-in player on localhost in a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, config: Optional[SimulatorConfig] = None,
+                 name: str = 'Simulated Player'):
+        self.config = config or SimulatorConfig()
+        self.player = SimulatedPlayer(name)
+        self.httpd = _HTTPServer((host, port), BluOSHandler)
+        self.httpd.config = self.config
+        self.httpd.player = self.player
+        self.httpd.random = random.Random(self.config.seed)
+        port = self.httpd.server_address[1]
+        self.player.mac = f"90:56:82:00:{port >> 8:02x}:{port & 0xff:02x}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return host, port
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class BluOSFleet:
+    """Many stand-in players, each on its own port, sharing one configuration."""
+
+    def __init__(self, count: int, config: Optional[SimulatorConfig] = None, host='127.0.0.1'):
+        config = config or SimulatorConfig()
+        self.servers = [
+            BluOSServer(host, config=replace(config, seed=_seed(config.seed, index)), name=f"Player {index + 1}")
+            for index in range(count)
+        ]
+
+    @property
+    def addresses(self) -> List[Tuple[str, int]]:
+        return [server.address for server in self.servers]
+
+    def start(self):
+        for server in self.servers:
+            server.start()
+        return self
+
+    def group(self, master: int, slaves: List[int], name: str = '') -> None:
+        """Make the players at `slaves` (indexes) follow the one at `master`, as /SyncStatus reports it."""
+        leader = self.servers[master].player
+        name = name or '+'.join(self.servers[index].player.name for index in [master] + slaves)
+        leader.update(slaves=[self.servers[index].address for index in slaves], master=None, group_name=name)
+        for index in slaves:
+            self.servers[index].player.update(master=self.servers[master].address, slaves=[], group_name=name)
+
+    def stop(self):
+        # Each shutdown waits for its serve loop to notice, so stop them side by side.
+        threads = [threading.Thread(target=server.stop) for server in self.servers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _seed(seed: Optional[int], index: int) -> Optional[int]:
+    return None if seed is None else seed + index
@@ -0,0 +1,465 @@
+"""Run the benchmark suite against simulated BluOS players and save the results.
+
+Every run writes one JSON file (benchmarks/results/<timestamp>.json by
+default). Pass an earlier file with --compare to see the change per metric;
+metrics that got worse by more than --threshold percent are reported as
+regressions and make the run exit with status 1.
+
+Usage: python benchmarks/suite.py [--quick] [--only NAME ...] [--output FILE]
+                                  [--compare BASELINE] [--threshold PCT]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_import import BUDGETS_MS, measure_import  # noqa: E402
+from benchmarks.bluos_server import (STATUS_XML, TREE_ROOT, BluOSFleet, BluOSServer,  # noqa: E402
+                                     SimulatorConfig, browse_tree_size, browse_tree_xml)
+from player import (BlusoundPlayer, MyListener, parse_browse_page, parse_status,  # noqa: E402
+                    read_groups, snapshot_all)
+from search import ROOT_KEY, BrowseCrawler, SourceIndex  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULTS_VERSION = 1
+
+# Metrics ending in one of these are better when higher; everything else
+# (durations, bytes, counts of failures) is better when lower.
+HIGHER_IS_BETTER = ('_per_s', '_ratio')
+# Sizes of the generated fixtures. They describe the run rather than measure
+# it, so they are shown but never reported as regressions.
+FIXTURE_METRICS = frozenset(('players', 'members', 'tree_items', 'crawl_entries', 'index_entries'))
+
+Metrics = Dict[str, float]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_status(quick: bool) -> Metrics:
+    """Sequential get_status round trips, and how fast a long-poll wakes after a change."""
+    count = 200 if quick else 2000
+    wakes = 10 if quick else 50
+    with BluOSServer() as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'bench', port=port, initialize=False)
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(count):
+            t0 = time.perf_counter()
+            player.get_status()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+
+        wake_latencies = []
+        for level in range(wakes):
+            success, status = player.get_status()
+            woke = threading.Event()
+            poller = threading.Thread(target=lambda: (player.get_status(timeout=5, etag=status.etag), woke.set()))
+            poller.start()
+            time.sleep(0.01)  # let the poll reach the server
+            t0 = time.perf_counter()
+            server.player.update(volume=level)
+            woke.wait(5)
+            wake_latencies.append(time.perf_counter() - t0)
+            poller.join()
+    return {
+        'status_per_s': count / elapsed,
+        'status_p50_ms': percentile(latencies, 50) * 1000,
+        'status_p99_ms': percentile(latencies, 99) * 1000,
+        'longpoll_wake_p50_ms': percentile(wake_latencies, 50) * 1000,
+    }
+
+
+def bench_parse(quick: bool) -> Metrics:
+    """CPU cost of parsing /Status and a large /Browse page."""
+    count = 2000 if quick else 20000
+    started = time.perf_counter()
+    for _ in range(count):
+        parse_status(STATUS_XML)
+    status_elapsed = time.perf_counter() - started
+
+    page_xml = browse_tree_xml(TREE_ROOT, SimulatorConfig(browse_depth=1, browse_fanout=2000)).encode('utf-8')
+    pages = 10 if quick else 50
+    started = time.perf_counter()
+    for _ in range(pages):
+        items = parse_browse_page([page_xml]).items
+    browse_elapsed = time.perf_counter() - started
+    return {
+        'status_parses_per_s': count / status_elapsed,
+        'browse_items_per_s': pages * len(items) / browse_elapsed,
+    }
+
+
+def bench_browse(quick: bool) -> Metrics:
+    """Walk a whole generated tree, following nextKey paging, then one very large container."""
+    tree = SimulatorConfig(browse_depth=3, browse_fanout=8 if quick else 20, browse_page_size=6)
+    with BluOSServer(config=tree) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'bench', port=port, initialize=False)
+        started = time.perf_counter()
+        pending = [None]
+        items = 0
+        while pending:
+            sources = player.capture_sources(pending.pop(), use_cache=False)
+            items += len(sources)
+            pending.extend(source.browse_key for source in sources if source.browse_key)
+        tree_elapsed = time.perf_counter() - started
+    assert items == browse_tree_size(tree), (items, browse_tree_size(tree))
+
+    large = SimulatorConfig(browse_depth=1, browse_fanout=2000 if quick else 20000, browse_page_size=500)
+    with BluOSServer(config=large) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'bench', port=port, initialize=False)
+        started = time.perf_counter()
+        count = len(player.capture_sources(use_cache=False))
+        large_elapsed = time.perf_counter() - started
+    assert count == large.browse_fanout
+    return {
+        'tree_items': items,
+        'tree_seconds': tree_elapsed,
+        'tree_items_per_s': items / tree_elapsed,
+        'large_container_seconds': large_elapsed,
+        'large_container_items_per_s': count / large_elapsed,
+    }
+
+
+def bench_resilience(quick: bool) -> Metrics:
+    """Retries against a flaky player, fail-fast for an offline one, and hedged /Status tail latency."""
+    count = 60 if quick else 300
+    with BluOSServer(config=SimulatorConfig(failure_rate=0.2, seed=11)) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'flaky', port=port, initialize=False)
+        flaky_ok = sum(player.get_status()[0] for _ in range(count))
+
+    server = BluOSServer().start()
+    host, port = server.address
+    server.stop()
+    player = BlusoundPlayer(host, 'offline', port=port, initialize=False)
+    while not player.circuit.is_open:
+        player.get_status()
+    started = time.perf_counter()
+    for _ in range(count):
+        player.get_status()
+    offline_elapsed = time.perf_counter() - started
+
+    tail = SimulatorConfig(latency=0.005, tail_rate=0.05, tail_latency=0.2, seed=5)
+    hedged = {}
+    with BluOSServer(config=tail) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'tail', port=port, initialize=False)
+        for label, hedge_after in (('plain', None), ('hedged', 0.03)):
+            player.hedge_status_after = hedge_after
+            latencies = []
+            for _ in range(count):
+                t0 = time.perf_counter()
+                player.get_status()
+                latencies.append(time.perf_counter() - t0)
+            hedged[f'{label}_status_p50_ms'] = percentile(latencies, 50) * 1000
+            hedged[f'{label}_status_p99_ms'] = percentile(latencies, 99) * 1000
+    return {
+        'flaky_success_ratio': flaky_ok / count,
+        'offline_status_ms': offline_elapsed / count * 1000,
+        **hedged,
+    }
+
+
+class _ServiceInfo:
+    """Enough of zeroconf.ServiceInfo for MyListener.add_service."""
+
+    def __init__(self, host: str, port: int, server: str):
+        self.addresses = [host]
+        self.port = port
+        self.server = server
+        self.properties: Dict[bytes, bytes] = {}
+
+    def parsed_addresses(self) -> List[str]:
+        return self.addresses
+
+
+class _Zeroconf:
+    def __init__(self, infos: Dict[str, _ServiceInfo]):
+        self.infos = infos
+
+    def get_service_info(self, type, name):
+        return self.infos[name]
+
+
+def bench_discovery(quick: bool) -> Metrics:
+    """Time from mDNS announcements to every player having its sources loaded.
+
+    Announcements are fed straight into MyListener, so this measures the
+    client side of discovery without needing multicast on the host.
+    """
+    # Load the HTTP stack up front; its one-off import cost is tracked by the imports benchmark.
+    import requests  # noqa: F401
+    count = 8 if quick else 32
+    config = SimulatorConfig(latency=0.02, jitter=0.01, browse_depth=1, browse_fanout=12, seed=1)
+    with BluOSFleet(count, config) as fleet:
+        infos = {f"Player {index}._musc._tcp.local.": _ServiceInfo(host, port, f"player-{index}.local.")
+                 for index, (host, port) in enumerate(fleet.addresses)}
+        zeroconf = _Zeroconf(infos)
+        listener = MyListener()
+        started = time.perf_counter()
+        for name in infos:
+            listener.add_service(zeroconf, "_musc._tcp.local.", name)
+        listed = None
+        ready_at: Dict[str, float] = {}
+        while len(ready_at) < count and time.perf_counter() - started < 30:
+            players = listener.players
+            if listed is None and len(players) == count:
+                listed = time.perf_counter() - started
+            for player in players:
+                if player.sources_ready and player.address not in ready_at:
+                    ready_at[player.address] = time.perf_counter() - started
+            time.sleep(0.001)
+        listener.close()
+        if listed is None:
+            listed = time.perf_counter() - started
+    return {
+        'players': count,
+        'all_listed_ms': listed * 1000,
+        'first_ready_ms': min(ready_at.values()) * 1000,
+        'all_ready_ms': max(ready_at.values()) * 1000,
+        'ready_ratio': len(ready_at) / count,
+    }
+
+
+def bench_fanout(quick: bool) -> Metrics:
+    """Fleet-wide status snapshots with realistic latency, jitter and a few failures."""
+    count = 16 if quick else 64
+    rounds = 3 if quick else 10
+    config = SimulatorConfig(latency=0.03, jitter=0.02, failure_rate=0.02, seed=7)
+    with BluOSFleet(count, config) as fleet:
+        players = [BlusoundPlayer(host, f"player-{port}", port=port, initialize=False)
+                   for host, port in fleet.addresses]
+        durations, ok = [], 0
+        for _ in range(rounds):
+            started = time.perf_counter()
+            results = snapshot_all(players, max_concurrency=16, deadline=5.0)
+            durations.append(time.perf_counter() - started)
+            ok += sum(result.ok for result in results)
+
+        async_durations = []
+        for _ in range(rounds):
+            async_durations.append(asyncio.run(_async_snapshot(fleet.addresses)))
+    return {
+        'players': count,
+        'snapshot_p50_ms': statistics.median(durations) * 1000,
+        'snapshot_max_ms': max(durations) * 1000,
+        'snapshot_ok_ratio': ok / (count * rounds),
+        'async_snapshot_p50_ms': statistics.median(async_durations) * 1000,
+    }
+
+
+async def _async_snapshot(addresses) -> float:
+    import aiohttp
+    from async_player import AsyncBlusoundPlayer
+
+    async with aiohttp.ClientSession() as session:
+        players = [AsyncBlusoundPlayer(host, f"player-{port}", port=port, session=session)
+                   for host, port in addresses]
+        started = time.perf_counter()
+        await asyncio.gather(*(player.get_status() for player in players))
+        return time.perf_counter() - started
+
+
+def bench_group(quick: bool) -> Metrics:
+    """Group-wide commands: topology discovery, and skew of concurrent versus one-by-one fan-out."""
+    count = 4 if quick else 8
+    rounds = 5 if quick else 20
+    config = SimulatorConfig(latency=0.03, jitter=0.01, seed=11)
+    with BluOSFleet(count, config) as fleet:
+        fleet.group(0, list(range(1, count)))
+        players = [BlusoundPlayer(host, f"player-{port}", port=port, initialize=False)
+                   for host, port in fleet.addresses]
+        started = time.perf_counter()
+        group = read_groups(players)[0]
+        topology = time.perf_counter() - started
+
+        concurrent_skews, concurrent_durations = [], []
+        for index in range(rounds):
+            started = time.perf_counter()
+            result = group.pause() if index % 2 else group.play()
+            concurrent_durations.append(time.perf_counter() - started)
+            concurrent_skews.append(result.completion_skew)
+
+        sequential_skews, sequential_durations = [], []
+        for index in range(rounds):
+            started = time.perf_counter()
+            done = []
+            for member in group.members:
+                member.pause() if index % 2 else member.play()
+                done.append(time.perf_counter() - started)
+            sequential_durations.append(done[-1])
+            sequential_skews.append(done[-1] - done[0])
+    return {
+        'members': len(group),
+        'topology_ms': topology * 1000,
+        'concurrent_skew_p50_ms': statistics.median(concurrent_skews) * 1000,
+        'concurrent_p50_ms': statistics.median(concurrent_durations) * 1000,
+        'sequential_skew_p50_ms': statistics.median(sequential_skews) * 1000,
+        'sequential_p50_ms': statistics.median(sequential_durations) * 1000,
+    }
+
+
+def bench_search(quick: bool) -> Metrics:
+    """Background crawl of a browse tree, its refresh pass, and per-keystroke search latency on a large index."""
+    tree = SimulatorConfig(browse_depth=3, browse_fanout=8 if quick else 12, latency=0.01, seed=11)
+    with BluOSServer(config=tree) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'bench', port=port, initialize=False)
+        crawler = BrowseCrawler(player, refresh_interval=0)
+        first = crawler.crawl()
+        refresh = crawler.crawl()
+    assert first['entries'] == browse_tree_size(tree), (first, browse_tree_size(tree))
+
+    # Index a large generated tree straight from parsed pages; no HTTP needed to time the search.
+    large = SimulatorConfig(browse_depth=4, browse_fanout=8 if quick else 14)
+    index = SourceIndex()
+    started = time.perf_counter()
+    level = [(ROOT_KEY, TREE_ROOT)]
+    for depth in range(large.browse_depth):
+        next_level = []
+        for key, tree_key in level:
+            items = parse_browse_page([browse_tree_xml(tree_key, large)]).items
+            index.add(key, items, depth)
+            next_level.extend((item.browse_key, item.browse_key) for item in items if item.browse_key)
+        level = next_level
+    build_elapsed = time.perf_counter() - started
+
+    keystrokes = []
+    for phrase in ('item 7:1', 'item 3:5:2:4', '5:1:6', 'itme 2:2', 'node 0', 'item 7'):
+        for end in range(1, len(phrase) + 1):
+            keystrokes.append(index.search(phrase[:end], 40).elapsed)
+    return {
+        'crawl_entries': first['entries'],
+        'crawl_seconds': first['seconds'],
+        'refresh_seconds': refresh['seconds'],
+        'refresh_changed': refresh['changed'],
+        'index_entries': len(index),
+        'index_build_seconds': build_elapsed,
+        'keystroke_p50_ms': statistics.median(keystrokes) * 1000,
+        'keystroke_p99_ms': percentile(keystrokes, 99) * 1000,
+        'keystroke_max_ms': max(keystrokes) * 1000,
+    }
+
+
+def bench_imports(quick: bool) -> Metrics:
+    """Cumulative `-X importtime` cost of each module in a fresh interpreter."""
+    metrics = {}
+    for module in BUDGETS_MS:
+        elapsed, loaded = measure_import(module, runs=2 if quick else 5)
+        metrics[f'{module}_import_ms'] = elapsed
+        metrics[f'{module}_lazy_modules_loaded'] = len(loaded)
+    return metrics
+
+
+BENCHMARKS: Dict[str, Callable[[bool], Metrics]] = {
+    'imports': bench_imports,
+    'status': bench_status,
+    'parse': bench_parse,
+    'browse': bench_browse,
+    'discovery': bench_discovery,
+    'fanout': bench_fanout,
+    'group': bench_group,
+    'search': bench_search,
+    'resilience': bench_resilience,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run_suite(names: List[str], quick: bool) -> Dict:
+    results = {}
+    for name in names:
+        started = time.perf_counter()
+        results[name] = BENCHMARKS[name](quick)
+        print(f"{name:<10} done in {time.perf_counter() - started:.1f}s")
+        for metric, value in results[name].items():
+            print(f"    {metric:<30} {value:>14.3f}")
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'benchmarks': results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print the change of every metric present in both runs; return the regressed ones."""
+    if baseline.get('quick') != current.get('quick'):
+        print("warning: comparing a --quick run with a full run")
+    regressions = []
+    print(f"\n{'metric':<42} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, metrics in current['benchmarks'].items():
+        for metric, value in metrics.items():
+            old = baseline.get('benchmarks', {}).get(name, {}).get(metric)
+            if old is None:
+                continue
+            change = (value - old) / old * 100 if old else 0.0
+            worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+            flag = ''
+            if metric in FIXTURE_METRICS:
+                if value != old:
+                    flag = '  (fixture size differs)'
+            elif worse > threshold:
+                flag = '  REGRESSION'
+                regressions.append(f"{name}.{metric}")
+            print(f"{name + '.' + metric:<42} {old:>12.3f} {value:>12.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="smaller workloads for a fast smoke run")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="percent change that counts as a regression (default: 10)")
+    args = parser.parse_args()
+
+    # Simulated failures are expected; keep their error logs out of the report.
+    logging.getLogger().addHandler(logging.NullHandler())
+    report = run_suite(args.only or list(BENCHMARKS), args.quick)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
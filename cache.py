@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from player import SOURCES_READY, BlusoundPlayer, PlayerSource
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = 'cache'
+PLAYER_CACHE_FILE = os.path.join(CACHE_DIR, 'players.json')
+CACHE_VERSION = 1
+
+
+def source_to_dict(source: PlayerSource) -> Dict:
+    return {
+        "text": source.text,
+        "image": source.image,
+        "browse_key": source.browse_key,
+        "play_url": source.play_url,
+        "input_type": source.input_type,
+        "type": source.type,
+    }
+
+
+def source_from_dict(data: Dict) -> PlayerSource:
+    return PlayerSource(
+        text=data.get('text', ''),
+        image=data.get('image', ''),
+        browse_key=data.get('browse_key'),
+        play_url=data.get('play_url'),
+        input_type=data.get('input_type'),
+        type=data.get('type', ''),
+    )
+
+
+def _write_json(path: str, data) -> None:
+    # Write to a temporary file first so a crash never leaves a truncated cache.
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cache {path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        logger.warning(f"Ignoring cache {path} with unexpected format")
+        return None
+    return data
+
+
+def _entry_address(entry: Dict) -> str:
+    return f"{entry['host_name']}:{entry.get('port', 11000)}"
+
+
+class PlayerCache:
+    """On-disk record of the last known players, used to fill the player list at startup.
+
+    Restored players are marked `from_cache` until live discovery or an HTTP
+    response confirms them; entries not seen for `max_age` seconds are dropped
+    on load. Entries missing from the list passed to `save` are kept with
+    their old `last_seen`, so a session where mDNS found nothing does not
+    wipe the cache.
+    """
+
+    def __init__(self, path: str = PLAYER_CACHE_FILE, max_age: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+
+    def load(self) -> List[BlusoundPlayer]:
+        data = _read_json(self.path)
+        if data is None:
+            return []
+        now = time.time()
+        players = []
+        for entry in data.get('players', []):
+            if now - entry.get('last_seen', 0) > self.max_age:
+                continue
+            player = BlusoundPlayer(entry['host_name'], entry['name'], port=entry.get('port', 11000),
+                                    initialize=False)
+            player.from_cache = True
+            player.service_name = entry.get('service_name')
+            player.mac = entry.get('mac')
+            player.sources = [source_from_dict(source) for source in entry.get('sources', [])]
+            if player.sources:
+                player.sources_state = SOURCES_READY
+            players.append(player)
+        logger.info(f"Loaded {len(players)} players from {self.path}")
+        return players
+
+    def save(self, players: List[BlusoundPlayer]) -> None:
+        data = _read_json(self.path) or {}
+        previous = {_entry_address(entry): entry for entry in data.get('players', [])}
+        now = time.time()
+        entries = []
+        for player in players:
+            entry = previous.pop(player.address, None)
+            if player.from_cache and entry is not None:
+                # Not confirmed this session; keep the original last_seen so it can age out.
+                entries.append(entry)
+                continue
+            entries.append({
+                "host_name": player.host_name,
+                "name": player.name,
+                "port": player.port,
+                "service_name": player.service_name,
+                "mac": player.mac,
+                "last_seen": now,
+                "sources": [source_to_dict(source) for source in player.sources],
+            })
+        # Players not in the list (e.g. expired because mDNS was silent) also age out instead of vanishing.
+        entries.extend(entry for entry in previous.values() if now - entry.get('last_seen', 0) <= self.max_age)
+        try:
+            _write_json(self.path, {"version": CACHE_VERSION, "players": entries})
+            logger.info(f"Saved {len(entries)} players to {self.path}")
+        except OSError as e:
+            logger.error(f"Error saving player cache {self.path}: {e}")
+
+
+BROWSE_CACHE_FILE = os.path.join(CACHE_DIR, 'browse.json')
+
+
+class BrowseCache:
+    """TTL + LRU cache of /Browse results keyed by (player, browse_key).
+
+    Attach an instance to `BlusoundPlayer.browse_cache` to put it in front of
+    `capture_sources`. When `path` is set, `load` and `save` persist the
+    unexpired entries so deep service menus stay instant across restarts.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 600.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, List[PlayerSource]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, player_key: str, browse_key: str) -> Optional[List[PlayerSource]]:
+        key = (player_key, browse_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, sources = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(sources)
+
+    def put(self, player_key: str, browse_key: str, sources: List[PlayerSource]) -> None:
+        key = (player_key, browse_key)
+        with self._lock:
+            self._entries[key] = (time.time(), list(sources))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, player_key: Optional[str] = None) -> None:
+        with self._lock:
+            if player_key is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == player_key]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def load(self) -> None:
+        if not self.path:
+            return
+        data = _read_json(self.path)
+        if data is None:
+            return
+        now = time.time()
+        with self._lock:
+            for entry in data.get('entries', []):
+                if now - entry['stored_at'] > self.ttl:
+                    continue
+                key = (entry['player'], entry['browse_key'])
+                sources = [source_from_dict(source) for source in entry['sources']]
+                self._entries[key] = (entry['stored_at'], sources)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"Loaded {len(self._entries)} browse entries from {self.path}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                {
+                    "player": player_key,
+                    "browse_key": browse_key,
+                    "stored_at": stored_at,
+                    "sources": [source_to_dict(source) for source in sources],
+                }
+                for (player_key, browse_key), (stored_at, sources) in self._entries.items()
+                if now - stored_at <= self.ttl
+            ]
+        try:
+            _write_json(self.path, {"version": CACHE_VERSION, "entries": entries})
+            logger.info(f"Saved {len(entries)} browse entries to {self.path}")
+        except OSError as e:
+            logger.error(f"Error saving browse cache {self.path}: {e}")
@@ -1,21 +1,23 @@
 import curses
 import time
-import requests
-from typing import List, Optional, Tuple
-from player import BlusoundPlayer, PlayerStatus, PlayerSource, threaded_discover
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from player import (SOURCE_CHANGED, STATE_CHANGED, SYNC_CHANGED, TRACK_CHANGED, VOLUME_CHANGED, BlusoundPlayer, GroupResult,
+                    PlayerGroup, PlayerStatus, PlayerSource, SourcePager, SourcePrefetcher, PlayerRegistry, StatusWatcher,
+                    VolumeController, close_sessions, read_groups, status_changes, threaded_discover)
+import queue
+from cache import BROWSE_CACHE_FILE, BrowseCache, PlayerCache
+from history import StatusHistory, sparkline, state_strip, timeline
+from search import BrowseCrawler, SearchHit, SearchResult, SourceIndex
 import logging
-from logging.handlers import RotatingFileHandler
+from logconfig import setup_logging
+from metrics import REQUEST_METRICS
 import json
+import os
+import sys
+from dataclasses import asdict, replace
+from concurrent.futures import ThreadPoolExecutor
 
-# Set up logging
-log_file = 'logs/cli.log'
-log_handler = RotatingFileHandler(log_file, maxBytes=1024*1024, backupCount=1)
-log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                                  datefmt='%Y-%m-%d %H:%M:%S')
-log_handler.setFormatter(log_formatter)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(log_handler)
 
 # Define key codes
 KEY_UP = curses.KEY_UP
@@ -29,13 +31,128 @@ KEY_D = ord('d')
 KEY_P = ord('p')
 KEY_RIGHT = curses.KEY_RIGHT
 KEY_LEFT = curses.KEY_LEFT
+KEY_M = ord('m')
+KEY_E = ord('e')
+KEY_G = ord('g')
+KEY_PLUS = ord('+')
+KEY_MINUS = ord('-')
+KEY_SLASH = ord('/')
+KEY_ESCAPE = 27
+KEY_BACKSPACES = (curses.KEY_BACKSPACE, 127, 8)
+
+VOLUME_STEP = 5
+VOLUME_DB_STEP = 1.0
+# Group volume keys change every member by this much, so the rooms keep their balance.
+GROUP_VOLUME_DB_STEP = 2.0
 
 def create_volume_bar(volume, width=20):
     filled = int(volume / 100 * width)
     return f"[{'#' * filled}{'-' * (width - filled)}]"
 
-class BlusoundCLI:
+def group_outcome(result: GroupResult) -> Tuple[bool, str]:
+    return result.ok, result.summary()
+
+# Screen regions tracked by RenderScheduler
+REGION_HEADER = 'header'
+REGION_PLAYERS = 'players'
+REGION_STATUS = 'status'
+REGION_SOURCES = 'sources'
+REGION_STATS = 'stats'
+ALL_REGIONS = frozenset((REGION_HEADER, REGION_PLAYERS, REGION_STATUS, REGION_SOURCES, REGION_STATS))
+
+STATS_REFRESH_SECONDS = 1.0
+METRICS_JSON_FILE = os.path.join('logs', 'metrics.json')
+METRICS_PROM_FILE = os.path.join('logs', 'metrics.prom')
+HISTORY_WINDOW_SECONDS = 3600
+HISTORY_JSON_FILE = os.path.join('logs', 'history.json')
+HISTORY_CSV_FILE = os.path.join('logs', 'history.csv')
+
+# Status change kinds shown by the summary view; the detail view shows every kind.
+SUMMARY_CHANGE_KINDS = frozenset((TRACK_CHANGED, VOLUME_CHANGED, STATE_CHANGED, SOURCE_CHANGED))
+
+HEADER_MESSAGE_SECONDS = 2
+
+class RenderScheduler:
+    """Tracks which screen regions are dirty so frames with no changes are skipped.
+
+    Regions are invalidated by input, status changes or timers. `take` is
+    called once per loop iteration and counts rendered versus skipped frames.
+    """
+
     def __init__(self):
+        self.dirty: Set[str] = set(ALL_REGIONS)
+        self.timers: Dict[str, float] = {}
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+    def invalidate(self, *regions: str):
+        self.dirty.update(regions or ALL_REGIONS)
+
+    def invalidate_at(self, region: str, when: float):
+        if region not in self.timers or when < self.timers[region]:
+            self.timers[region] = when
+
+    def take(self) -> Set[str]:
+        now = time.time()
+        for region, when in list(self.timers.items()):
+            if when <= now:
+                self.dirty.add(region)
+                del self.timers[region]
+        dirty, self.dirty = self.dirty, set()
+        if dirty:
+            self.frames_rendered += 1
+        else:
+            self.frames_skipped += 1
+        return dirty
+
+    def stats(self) -> str:
+        return f"frames rendered {self.frames_rendered}, skipped {self.frames_skipped}"
+
+class CommandExecutor:
+    """Runs blocking player calls on background workers.
+
+    Completion callbacks are queued and run on the UI thread by
+    `run_callbacks`, so key handlers never wait on the network. A task
+    submitted with a `key` is not queued again while one with the same key
+    is still in flight.
+    """
+
+    def __init__(self, max_workers: int = 1, name: str = 'command'):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._done: queue.Queue = queue.Queue()
+        self._in_flight: Set[object] = set()
+
+    def submit(self, func: Callable, *args, on_done: Optional[Callable] = None, key: object = None) -> bool:
+        if key is not None:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(lambda f: self._done.put((f, on_done, key)))
+        return True
+
+    def run_callbacks(self) -> int:
+        handled = 0
+        while True:
+            try:
+                future, on_done, key = self._done.get_nowait()
+            except queue.Empty:
+                return handled
+            self._in_flight.discard(key)
+            handled += 1
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Background command failed: {e}")
+                result = (False, str(e))
+            if on_done:
+                on_done(result)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class BlusoundCLI:
+    def __init__(self, daemon=None):
         self.header_message: str = ""
         self.header_message_time: float = 0
         self.shortcuts_open: bool = False
@@ -43,36 +160,182 @@ class BlusoundCLI:
         self.source_selection_mode: bool = False
         self.selected_source_index: List[int] = []
         self.player_status: Optional[PlayerStatus] = None
+        # Kinds of status change (player.TRACK_CHANGED, ...) not yet handled by the views.
+        self.changed_kinds: Set[str] = set()
         self.detail_view: bool = False
         self.selected_index: int = 0
         self.active_player: Optional[BlusoundPlayer] = None
         self.players: List[BlusoundPlayer] = []
-        self.last_update_time: float = 0.0
+        # PlayerRegistry, or the daemon's RemoteState; self.players is refreshed when its version changes.
+        self.registry = None
+        self.players_version: Optional[int] = None
         self.current_sources: List[PlayerSource] = []
+        # A daemon.RemoteState when attached to a running daemon; it then supplies players and statuses.
+        self.daemon = daemon
+        self.status_watcher = daemon.watcher if daemon else StatusWatcher()
+        self.status_updates = self.status_watcher.subscribe_queue()
+        self.history = StatusHistory()
+        self.status_watcher.subscribe(self.history.record)
+        self.watched_player: Optional[BlusoundPlayer] = None
+        self.player_cache = PlayerCache()
+        self.browse_cache = BrowseCache(path=BROWSE_CACHE_FILE)
+        self.prefetch_enabled: bool = True
+        self.prefetcher: Optional[SourcePrefetcher] = None
+        # Browse tree index per player address, kept current by a crawler for the active player
+        # once search is first opened.
+        self.source_indexes: Dict[str, SourceIndex] = {}
+        self.crawler: Optional[BrowseCrawler] = None
+        # Text of the '/' prompt in source selection; None while it is closed.
+        self.search_query: Optional[str] = None
+        self.search_result: Optional[SearchResult] = None
+        self.search_generation: int = -1
+        self.search_selected: int = 0
+        self.render_scheduler = RenderScheduler()
+        self.player_mode: bool = False
+        self.stats_view: bool = False
+        # Transport commands run in order on one worker; status and browse loads on their own pool.
+        self.commands = CommandExecutor(1, 'command')
+        self.loader = CommandExecutor(2, 'loader')
+        self.volume_controller: Optional[VolumeController] = None
+        # Sync group of the active player; in group mode transport and volume keys drive all of it.
+        self.active_group: Optional[PlayerGroup] = None
+        self.group_mode: bool = False
+        self.volume_results: queue.Queue = queue.Queue()
 
     def update_header(self, title_win: curses.window, message: str, view: str, active_player: Optional[BlusoundPlayer] = None):
         title_win.erase()
         header = f"Blusound CLI - {view}"
         if active_player:
             header += f" - {active_player.name}"
+        if self.daemon:
+            header += " (daemon)" if self.daemon.connected else " (daemon lost)"
         title_win.addstr(1, 2, header, curses.A_BOLD)
         if message:
-            self.header_message = message
-            self.header_message_time = time.time()
-        if time.time() - self.header_message_time < 2:
+            self.set_header_message(message)
+        if time.time() - self.header_message_time < HEADER_MESSAGE_SECONDS:
             title_win.addstr(1, len(header) + 4, f"- {self.header_message}")
-        title_win.refresh()
+        title_win.noutrefresh()
+        if message:
+            # Show progress messages right away; the caller may block on the network next.
+            curses.doupdate()
+
+    def set_header_message(self, message: str):
+        self.header_message = message
+        self.header_message_time = time.time()
+        self.render_scheduler.invalidate(REGION_HEADER)
+        self.render_scheduler.invalidate_at(REGION_HEADER, self.header_message_time + HEADER_MESSAGE_SECONDS)
+
+    def set_player_status(self, status: Optional[PlayerStatus]):
+        previous, self.player_status = self.player_status, status
+        if status is None:
+            return
+        for change in status_changes(previous, status):
+            self.changed_kinds.add(change.kind)
+            if change.kind == TRACK_CHANGED and previous is not None and status.name:
+                self.set_header_message(f"Now playing: {status.name} - {status.artist}")
+            elif change.kind == SYNC_CHANGED and previous is not None:
+                self.load_group()
+
+    def run_command(self, title_win: curses.window, progress: str, func: Callable, *args,
+                    optimistic: Optional[PlayerStatus] = None):
+        """Send a command in the background, showing `optimistic` until the player confirms it.
+
+        The watcher's next status replaces the optimistic one; if the command
+        fails before that happens, the previous status is restored.
+        """
+        player = self.active_player
+        previous = self.player_status
+        if optimistic is not None:
+            self.set_player_status(optimistic)
+        self.update_header(title_win, progress, "Player Control", player)
+
+        def on_done(result: Tuple[bool, str]):
+            success, message = result
+            if player is not self.active_player:
+                return
+            if not success and optimistic is not None and self.player_status is optimistic:
+                self.set_player_status(previous)
+            self.set_header_message(message)
+
+        self.commands.submit(func, *args, on_done=on_done)
+
+    def run_group_command(self, title_win: curses.window, progress: str, func: Callable[..., GroupResult], *args,
+                          optimistic: Optional[PlayerStatus] = None):
+        """Like run_command, for a PlayerGroup method; the header reports per-member results and skew."""
+        self.run_command(title_win, progress, lambda: group_outcome(func(*args)), optimistic=optimistic)
+
+    def load_group(self):
+        player = self.active_player
+        if player is None:
+            return
+        players = self.players if player in self.players else self.players + [player]
+
+        def load() -> Optional[PlayerGroup]:
+            return next((group for group in read_groups(players) if player in group), None)
+
+        def on_loaded(group):
+            if player is not self.active_player:
+                return
+            self.active_group = group if isinstance(group, PlayerGroup) else None
+            if self.group_mode and (self.active_group is None or len(self.active_group) < 2):
+                self.group_mode = False
+            self.render_scheduler.invalidate(REGION_STATUS)
+
+        self.loader.submit(load, on_done=on_loaded, key=('group', id(player)))
 
-    def update_player_status(self):
+    def watch_active_player(self):
+        if self.watched_player is self.active_player:
+            return
+        if self.watched_player:
+            self.status_watcher.unwatch(self.watched_player)
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+            self.prefetcher = None
+        if self.crawler:
+            self.crawler.stop()
+            self.crawler = None
+        self.watched_player = self.active_player
+        self.volume_controller = None
+        self.active_group = None
+        self.group_mode = False
         if self.active_player:
+            self.active_player.browse_cache = self.browse_cache
+            self.volume_controller = VolumeController(
+                self.active_player, on_result=lambda success, message: self.volume_results.put((success, message)))
+            if self.prefetch_enabled:
+                self.prefetcher = SourcePrefetcher(self.active_player)
+            index = self.source_indexes.setdefault(self.active_player.address, SourceIndex())
+            self.crawler = BrowseCrawler(self.active_player, index)
+            self.status_watcher.watch(self.active_player)
+            self.load_group()
+
+    def apply_status_updates(self) -> bool:
+        updated = False
+        while True:
             try:
-                success, status = self.active_player.get_status()
-                if success:
-                    self.player_status = status
-                else:
-                    logger.error(f"Error updating player status: {status}")
-            except requests.RequestException as e:
-                logger.error(f"Error updating player status: {e}")
+                player, status = self.status_updates.get_nowait()
+            except queue.Empty:
+                break
+            if player is self.active_player:
+                self.set_player_status(self.with_volume_target(status))
+                updated = True
+        while True:
+            try:
+                success, message = self.volume_results.get_nowait()
+            except queue.Empty:
+                return updated
+            if not success:
+                self.set_header_message(message)
+
+    def with_volume_target(self, status: PlayerStatus) -> PlayerStatus:
+        """Show the pending volume target instead of a level the player has not caught up with yet."""
+        controller = self.volume_controller
+        if controller is None:
+            return status
+        controller.observe(status)
+        if controller.busy and controller.target is not None and controller.target != status.volume:
+            return replace(status, volume=controller.target)
+        return status
 
     def display_player_selection(self, stdscr: curses.window):
         if self.selector_shortcuts_open:
@@ -82,10 +345,13 @@ class BlusoundCLI:
             for i, player in enumerate(self.players):
                 if i == self.selected_index:
                     stdscr.attron(curses.color_pair(2))
-                if player == self.active_player:
-                    stdscr.addstr(6 + i, 4, f"* {player.name} ({player.host_name})")
-                else:
-                    stdscr.addstr(6 + i, 4, f"  {player.name} ({player.host_name})")
+                marker = "*" if player == self.active_player else " "
+                readiness = "" if player.sources_ready else f" [sources {player.sources_state}]"
+                if player.from_cache:
+                    readiness += " [cached]"
+                if player.circuit.is_open:
+                    readiness += f" [offline, retry in {player.circuit.retry_in:.0f}s]"
+                stdscr.addstr(6 + i, 4, f"{marker} {player.name} ({player.host_name}){readiness}")
                 if i == self.selected_index:
                     stdscr.attroff(curses.color_pair(2))
             stdscr.addstr(stdscr.getmaxyx()[0] - 1, 2, "Press '?' to show keyboard shortcuts")
@@ -103,6 +369,7 @@ class BlusoundCLI:
         shortcuts = [
             ("UP/DOWN", "Select player"),
             ("ENTER", "Activate player"),
+            ("m", "Request stats"),
             ("q", "Quit application"),
         ]
 
@@ -110,7 +377,9 @@ class BlusoundCLI:
             modal_win.addstr(3 + i, 2, f"{key:<10} : {description}")
 
         modal_win.addstr(modal_height - 2, 2, "Press any key to close", curses.A_ITALIC)
-        modal_win.refresh()
+        # Flush the body first so it does not cover the modal in the virtual screen.
+        stdscr.noutrefresh()
+        modal_win.noutrefresh()
 
     def display_player_control(self, stdscr: curses.window):
         if self.shortcuts_open:
@@ -122,11 +391,13 @@ class BlusoundCLI:
                 self.display_summary_view(stdscr)
             stdscr.addstr(stdscr.getmaxyx()[0] - 2, 2, "Press '?' for shortcuts, 'd' for detail view")
             stdscr.addstr(stdscr.getmaxyx()[0] - 1, 2, "Press 's' to select streaming sources")
+        elif self.active_player:
+            stdscr.addstr(5, 2, f"Connecting to {self.active_player.name}...")
 
     def display_summary_view(self, stdscr: curses.window):
         player_status = self.player_status
         active_player = self.active_player
-        labels = ["Status", "Volume", "Now Playing", "Album", "Service", "Active Input"]
+        labels = ["Status", "Volume", "Now Playing", "Album", "Service", "Active Input", "Group"]
         max_label_width = max(len(label) for label in labels)
 
         stdscr.addstr(5, 2, f"{'Status:':<{max_label_width + 1}} {player_status.state}")
@@ -142,13 +413,22 @@ class BlusoundCLI:
         else:
             stdscr.addstr(10, 2, f"{'Active Input:':<{max_label_width + 1}} No active input")
 
+        group = self.active_group
+        if group is not None and len(group) > 1:
+            members = ', '.join(member.name for member in group.members)
+            mode = " [group mode]" if self.group_mode else ""
+            group_text = f"{group.name} ({members}){mode}"
+        else:
+            group_text = "Not grouped"
+        stdscr.addstr(11, 2, f"{'Group:':<{max_label_width + 1}} {group_text}"[:stdscr.getmaxyx()[1] - 4])
+
     def display_detail_view(self, stdscr: curses.window):
         player_status = self.player_status
         height, width = stdscr.getmaxyx()
-        attributes = vars(player_status)
+        attributes = asdict(player_status)
         max_label_width = max(len(attr) for attr in attributes)
 
-        y = 5
+        y = self.display_history(stdscr, 5, width) + 1
         for attr, value in attributes.items():
             if y >= height - 2:
                 break
@@ -158,10 +438,32 @@ class BlusoundCLI:
                 value_str = value_str[:width - max_label_width - 8] + "..."
             stdscr.addstr(y, 2, f"{label:<{max_label_width + 1}} {value_str}")
             y += 1
+        if y < height - 2:
+            stdscr.addstr(y + 1, 2, f"Render: {self.render_scheduler.stats()}")
+
+    def display_history(self, stdscr: curses.window, y: int, width: int) -> int:
+        """Draw the last hour of volume, state and track changes; returns the next free row."""
+        address = self.active_player.address
+        now = time.time()
+        start = now - HISTORY_WINDOW_SECONDS
+        strip_width = max(10, width - 30)
+        volumes = self.history.series(address, 'volume')
+        known = [volume for timestamp, volume in volumes if timestamp >= start] or [self.player_status.volume]
+        stdscr.addstr(y, 2, f"History (last {HISTORY_WINDOW_SECONDS // 60} min)", curses.A_BOLD)
+        stdscr.addstr(y + 1, 2, f"{'volume:':<10} {sparkline(timeline(volumes, start, now, strip_width), 0, 100)}"
+                                f" {min(known)}-{max(known)}%")
+        states = timeline(self.history.series(address, 'state'), start, now, strip_width)
+        stdscr.addstr(y + 2, 2, f"{'state:':<10} {state_strip(states)} >play |pause")
+        titles = [title for _, title in self.history.series(address, 'title', start)]
+        changes = sum(1 for previous, title in zip(titles, titles[1:]) if title != previous)
+        stdscr.addstr(y + 3, 2, f"{'tracks:':<10} {changes} changes")
+        # Scroll the strips by one column even when the player is idle.
+        self.render_scheduler.invalidate_at(REGION_STATUS, now + HISTORY_WINDOW_SECONDS / strip_width)
+        return y + 4
 
     def display_shortcuts(self, stdscr: curses.window):
         height, width = stdscr.getmaxyx()
-        modal_height, modal_width = 12, 50
+        modal_height, modal_width = 16, 50
         start_y, start_x = (height - modal_height) // 2, (width - modal_width) // 2
 
         modal_win = curses.newwin(modal_height, modal_width, start_y, start_x)
@@ -171,10 +473,14 @@ class BlusoundCLI:
 
         shortcuts = [
             ("UP/DOWN", "Adjust volume"),
+            ("+/-", "Fine volume (1 dB)"),
             ("SPACE", "Play/Pause"),
             (">/<", "Skip/Previous track"),
             ("i", "Select input"),
             ("p", "Pretty print player state"),
+            ("e", "Export status history"),
+            ("g", "Group mode (whole sync group)"),
+            ("m", "Request stats"),
             ("b", "Back to player list"),
             ("q", "Quit application"),
         ]
@@ -183,23 +489,36 @@ class BlusoundCLI:
             modal_win.addstr(3 + i, 2, f"{key:<10} : {description}")
 
         modal_win.addstr(modal_height - 2, 2, "Press any key to close", curses.A_ITALIC)
-        modal_win.refresh()
+        # Flush the body first so it does not cover the modal in the virtual screen.
+        stdscr.noutrefresh()
+        modal_win.noutrefresh()
 
     def display_source_selection(self, stdscr: curses.window):
         active_player = self.active_player
         height, width = stdscr.getmaxyx()
         max_display_items = height - 12  # Reserve space for header and instructions
 
+        if self.search_query is not None:
+            self.display_search(stdscr)
+            return
         stdscr.addstr(5, 2, "UP/DOWN: select source, ENTER: expand/select, LEFT: go back, RIGHT: expand")
-        stdscr.addstr(6, 2, "n: next page, p: previous page, b: back to player control")
+        stdscr.addstr(6, 2, "n: next page, p: previous page, /: search, b: back to player control")
         stdscr.addstr(8, 2, "Select Source:")
         
         if not self.current_sources:
             self.current_sources = active_player.sources
+        if not self.current_sources:
+            active_player.load_sources_in_background()
+            stdscr.addstr(9, 4, f"Loading sources... ({active_player.sources_state})")
+            return
 
-        total_items = len(self.current_sources)
         current_page = max(0, self.selected_source_index[-1] // max_display_items)
         start_index = max(0, current_page * max_display_items)
+        pager = self.current_sources
+        if isinstance(pager, SourcePager) and not pager.complete and len(pager) < start_index + 2 * max_display_items:
+            # Load only the visible page plus one page of read-ahead, off the UI thread.
+            self.loader.submit(pager.ensure, start_index + 2 * max_display_items, key=('page', id(pager)))
+        total_items = len(self.current_sources)
         end_index = min(start_index + max_display_items, total_items)
 
         for i in range(start_index, end_index):
@@ -212,6 +531,8 @@ class BlusoundCLI:
 
         if total_items > max_display_items:
             page_info = f"Page {current_page + 1}/{(total_items + max_display_items - 1) // max_display_items}"
+            if isinstance(self.current_sources, SourcePager) and not self.current_sources.complete:
+                page_info += "+"
             stdscr.addstr(height - 2, width - len(page_info) - 2, page_info)
 
         # Ensure the selected index is within the current page
@@ -220,7 +541,75 @@ class BlusoundCLI:
         elif self.selected_source_index[-1] < start_index:
             self.selected_source_index[-1] = start_index
 
-        # Remove the automatic fetching of nested sources
+        if self.prefetcher:
+            self.prefetcher.focus(self.current_sources, self.selected_source_index[-1], 2 * max_display_items)
+
+    def display_search(self, stdscr: curses.window):
+        height, width = stdscr.getmaxyx()
+        index = self.crawler.index if self.crawler else None
+        stdscr.addstr(5, 2, "Type to search, UP/DOWN: select, ENTER: play or show in menu, ESC: cancel")
+        if index is not None:
+            indexing = " (indexing...)" if self.crawler.crawling else ""
+            stdscr.addstr(6, 2, f"{len(index)} entries indexed{indexing}")
+            if index.generation != self.search_generation:
+                # The crawler added entries since the last search; show them too.
+                self.run_search()
+        stdscr.addstr(8, 2, f"Search: {self.search_query}_"[:width - 4], curses.A_BOLD)
+
+        result = self.search_result
+        if not result:
+            return
+        for i, hit in enumerate(result.hits):
+            prefix = ">" if i == self.search_selected else " "
+            expand_indicator = "+" if hit.source.browse_key else " "
+            line = f"{prefix} {expand_indicator} {hit.source.text}"
+            if hit.trail:
+                line += f"  ({hit.trail})"
+            stdscr.addstr(9 + i, 4, line[:width - 6])
+        more = "" if result.complete else "+"
+        summary = f"{result.total}{more} matches{' (fuzzy)' if result.fuzzy else ''} in {result.elapsed * 1000:.2f} ms"
+        stdscr.addstr(height - 2, max(2, width - len(summary) - 2), summary[:width - 4])
+
+    def display_stats_view(self, stdscr: curses.window):
+        height, width = stdscr.getmaxyx()
+        stdscr.addstr(5, 2, "Request latency and errors per player and endpoint")
+        columns = f"{'Player':<22} {'Endpoint':<20} {'Reqs':>6} {'Err':>5} {'T/O':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB':>8}"
+        stdscr.addstr(7, 2, columns[:width - 4], curses.A_BOLD)
+        names = {player.address: player.name for player in self.players}
+        rows = REQUEST_METRICS.snapshot()
+        y = 8
+        for row in rows:
+            if y >= height - 2:
+                break
+            player_name = names.get(row['player'], row['player'])
+            line = (f"{player_name[:22]:<22} {row['endpoint'][:20]:<20} {row['requests']:>6} {row['errors']:>5} "
+                    f"{row['timeouts']:>5} {row['p50'] * 1000:>8.1f} {row['p95'] * 1000:>8.1f} "
+                    f"{row['p99'] * 1000:>8.1f} {row['bytes_received'] / 1024:>8.1f}")
+            stdscr.addstr(y, 2, line[:width - 4])
+            y += 1
+        if not rows:
+            stdscr.addstr(8, 2, "No requests yet")
+        opened = [f"{player.name} {player.circuit.times_opened}x" for player in self.players
+                  if player.circuit.times_opened]
+        if opened:
+            stdscr.addstr(height - 2, 2, f"Went offline: {', '.join(opened)}"[:width - 4])
+        stdscr.addstr(height - 1, 2, "Press 'e' to export JSON/Prometheus, 'm' or 'b' to go back")
+        self.render_scheduler.invalidate_at(REGION_STATS, time.time() + STATS_REFRESH_SECONDS)
+
+    def handle_stats_view(self, key: int):
+        if key in (KEY_M, KEY_B):
+            self.stats_view = False
+        elif key == KEY_E:
+            try:
+                os.makedirs(os.path.dirname(METRICS_JSON_FILE), exist_ok=True)
+                with open(METRICS_JSON_FILE, 'w') as f:
+                    f.write(REQUEST_METRICS.to_json())
+                with open(METRICS_PROM_FILE, 'w') as f:
+                    f.write(REQUEST_METRICS.to_prometheus())
+                self.set_header_message(f"Exported to {METRICS_JSON_FILE} and {METRICS_PROM_FILE}")
+            except OSError as e:
+                logger.error(f"Error exporting metrics: {e}")
+                self.set_header_message(f"Export failed: {e}")
 
     def handle_player_selection(self, key: int) -> Tuple[bool, Optional[BlusoundPlayer], bool]:
         if self.selector_shortcuts_open:
@@ -230,65 +619,58 @@ class BlusoundCLI:
         elif key == KEY_DOWN and self.selected_index < len(self.players) - 1:
             self.selected_index += 1
         elif key == KEY_ENTER and self.players:
-            self.active_player = self.players[self.selected_index]
-            try:
-                success, status = self.active_player.get_status()
+            player = self.players[self.selected_index]
+            self.active_player = player
+            self.set_player_status(None)
+
+            def on_status(result: Tuple[bool, Union[PlayerStatus, str]]):
+                success, status = result
+                if player is not self.active_player:
+                    return
                 if success:
-                    self.player_status = status
-                    return True, self.active_player, False
+                    self.set_player_status(self.with_volume_target(status))
                 else:
                     logger.error(f"Error getting player status: {status}")
+                    self.set_header_message(f"Cannot reach {player.name}")
                     self.active_player = None
                     self.player_status = None
-                    return False, None, False
-            except requests.RequestException as e:
-                logger.error(f"Error connecting to the player: {e}")
-                self.active_player = None
-                self.player_status = None
-                return False, None, False
+                    self.player_mode = False
+
+            # Enter player control at once; the status fills in when the player answers.
+            self.loader.submit(player.get_status, on_done=on_status)
+            return True, self.active_player, False
         elif key == KEY_QUESTION:
             self.selector_shortcuts_open = not self.selector_shortcuts_open
         return False, self.active_player, False
 
     def handle_player_control(self, key: int, title_win: curses.window, stdscr: curses.window) -> Tuple[bool, bool]:
+        if self.group_mode and self.handle_group_control(key, title_win):
+            return True, False
         if key == KEY_B:
             return False, False
-        elif key == KEY_UP and self.active_player:
-            self.update_header(title_win, "Increasing volume...", "Player Control")
-            new_volume = min(100, self.player_status.volume + 5) if self.player_status else 5
-            success, message = self.active_player.set_volume(new_volume)
-            if success:
-                self.update_player_status()
-                self.display_player_control(stdscr)
-            self.update_header(title_win, message, "Player Control")
-        elif key == KEY_DOWN and self.active_player:
-            self.update_header(title_win, "Decreasing volume...", "Player Control")
-            new_volume = max(0, self.player_status.volume - 5) if self.player_status else 0
-            success, message = self.active_player.set_volume(new_volume)
-            if success:
-                self.update_player_status()
-                self.display_player_control(stdscr)
-            self.update_header(title_win, message, "Player Control")
+        elif key in (KEY_UP, KEY_DOWN) and self.volume_controller and self.player_status:
+            # The controller coalesces key repeats and keeps one request in flight.
+            target = self.volume_controller.adjust(VOLUME_STEP if key == KEY_UP else -VOLUME_STEP)
+            self.set_player_status(replace(self.player_status, volume=target))
+            self.set_header_message(f"Volume {target}%")
+        elif key in (KEY_PLUS, KEY_MINUS) and self.volume_controller:
+            db_step = VOLUME_DB_STEP if key == KEY_PLUS else -VOLUME_DB_STEP
+            self.volume_controller.adjust_db(db_step)
+            self.set_header_message(f"Volume {db_step:+g} dB")
         elif key == KEY_SPACE and self.active_player:
-            self.update_header(title_win, "Toggling play/pause...", "Player Control")
-            success, message = self.active_player.toggle_play_pause()
-            if success:
-                self.update_player_status()
-            self.update_header(title_win, message, "Player Control")
+            optimistic = None
+            if self.player_status:
+                new_state = 'pause' if self.player_status.state in ('play', 'stream') else 'play'
+                optimistic = replace(self.player_status, state=new_state)
+            self.run_command(title_win, "Toggling play/pause...", self.active_player.toggle_play_pause,
+                             optimistic=optimistic)
         elif key == KEY_RIGHT and self.active_player:
-            self.update_header(title_win, "Skipping to next track...", "Player Control")
-            success, message = self.active_player.skip()
-            if success:
-                self.update_player_status()
-            self.update_header(title_win, message, "Player Control")
+            self.run_command(title_win, "Skipping to next track...", self.active_player.skip)
         elif key == KEY_LEFT and self.active_player:
-            self.update_header(title_win, "Going to previous track...", "Player Control")
-            success, message = self.active_player.back()
-            if success:
-                self.update_player_status()
-            self.update_header(title_win, message, "Player Control")
+            self.run_command(title_win, "Going to previous track...", self.active_player.back)
         elif key == KEY_I or key == ord('s'):
             self.source_selection_mode = True
+            self.search_query = None
             self.selected_source_index = [0]
             self.current_sources = self.active_player.sources
         elif key == KEY_QUESTION:
@@ -298,8 +680,46 @@ class BlusoundCLI:
             self.update_header(title_win, f"{'Detailed' if self.detail_view else 'Summary'} view", "Player Control")
         elif key == KEY_P:
             self.pretty_print_player_state(stdscr)
+        elif key == KEY_E:
+            self.export_history()
+        elif key == KEY_G:
+            if self.active_group is None or len(self.active_group) < 2:
+                self.load_group()
+                self.set_header_message("Not in a group")
+            else:
+                self.group_mode = not self.group_mode
+                self.set_header_message(f"Group mode {'on' if self.group_mode else 'off'}: {self.active_group.name}")
         return True, False
 
+    def handle_group_control(self, key: int, title_win: curses.window) -> bool:
+        """Send volume and play/pause keys to every member of the group at once."""
+        group = self.active_group
+        if key in (KEY_UP, KEY_DOWN, KEY_PLUS, KEY_MINUS):
+            db_step = GROUP_VOLUME_DB_STEP if key in (KEY_UP, KEY_PLUS) else -GROUP_VOLUME_DB_STEP
+            self.run_group_command(title_win, f"Group volume {db_step:+g} dB...", group.adjust_volume, db_step)
+        elif key == KEY_SPACE:
+            playing = self.player_status is not None and self.player_status.state in ('play', 'stream')
+            optimistic = None
+            if self.player_status:
+                optimistic = replace(self.player_status, state='pause' if playing else 'play')
+            self.run_group_command(title_win, f"{'Pausing' if playing else 'Starting'} {group.name}...",
+                                   group.pause if playing else group.play, optimistic=optimistic)
+        else:
+            return False
+        return True
+
+    def export_history(self):
+        try:
+            os.makedirs(os.path.dirname(HISTORY_JSON_FILE), exist_ok=True)
+            with open(HISTORY_JSON_FILE, 'w') as f:
+                f.write(self.history.to_json())
+            with open(HISTORY_CSV_FILE, 'w', newline='') as f:
+                f.write(self.history.to_csv())
+            self.set_header_message(f"Exported history to {HISTORY_JSON_FILE} and {HISTORY_CSV_FILE}")
+        except OSError as e:
+            logger.error(f"Error exporting status history: {e}")
+            self.set_header_message(f"Export failed: {e}")
+
     def pretty_print_player_state(self, stdscr: curses.window):
         if self.active_player and self.player_status:
             def serialize_source(source):
@@ -320,7 +740,7 @@ class BlusoundCLI:
                     "base_url": self.active_player.base_url,
                     "sources": [serialize_source(source) for source in self.active_player.sources]
                 },
-                "status": self.player_status.__dict__
+                "status": asdict(self.player_status)
             }
             pretty_state = json.dumps(player_state, indent=2)
             
@@ -328,11 +748,20 @@ class BlusoundCLI:
             logger.info(f"Pretty print data:\n{pretty_state}")
 
     def handle_source_selection(self, key: int, title_win: curses.window) -> Tuple[bool, List[int]]:
-        height, _ = title_win.getmaxyx()
-        max_display_items = height - 12
-        logger.info("Key pressed: %s", key)
+        # title_win is only three lines tall; page size follows the full screen.
+        max_display_items = max(1, curses.LINES - 12)
+        logger.debug("Key pressed: %s", key)
 
-        if key == KEY_B:
+        if self.search_query is not None:
+            return self.handle_search(key)
+        if key == KEY_SLASH:
+            # Crawling costs requests to the player, so only players someone searches get crawled.
+            if self.crawler:
+                self.crawler.start()
+            self.search_query = ""
+            self.search_result = None
+            self.search_selected = 0
+        elif key == KEY_B:
             self.source_selection_mode = False
             return False, self.selected_source_index
         elif key == KEY_UP:
@@ -358,29 +787,140 @@ class BlusoundCLI:
             else:
                 self.source_selection_mode = False
                 return False, self.selected_source_index
-        elif key == KEY_RIGHT or key == KEY_ENTER:
+        elif (key == KEY_RIGHT or key == KEY_ENTER) and self.current_sources:
             selected_source = self.current_sources[self.selected_source_index[-1]]
             if selected_source.browse_key:
-                self.active_player.get_nested_sources(selected_source)
                 if selected_source.children:
-                    self.current_sources = selected_source.children
-                    self.selected_source_index.append(0)
+                    self.enter_source(selected_source)
                 else:
-                    self.update_header(title_win, f"No nested sources found for: {selected_source.text}", "Source Selection")
+                    self.expand_source_in_background(selected_source, 2 * max_display_items)
             elif selected_source.play_url:
-                self.update_header(title_win, f"Selecting source: {selected_source.text}", "Source Selection")
-                success, message = self.active_player.select_input(selected_source)
-                if success:
-                    self.update_player_status()
-                    return False, self.selected_source_index
-                self.update_header(title_win, message, "Source Selection")
+                self.select_source(selected_source)
+                return False, self.selected_source_index
             else:
                 self.update_header(title_win, f"Cannot expand or play: {selected_source.text}", "Source Selection")
         return True, self.selected_source_index
 
+    def select_source(self, source: PlayerSource):
+        player = self.active_player
+
+        def on_selected(result: Tuple[bool, str]):
+            success, message = result
+            if player is self.active_player and not success:
+                self.set_header_message(message)
+
+        # Leave source selection at once; a failure is reported in the header.
+        self.set_header_message(f"Selecting source: {source.text}")
+        if self.group_mode and self.active_group:
+            # Selected on the master so the whole group follows.
+            group = self.active_group
+            self.commands.submit(lambda: group_outcome(group.select_input(source)), on_done=on_selected)
+        else:
+            self.commands.submit(player.select_input, source, on_done=on_selected)
+
+    def handle_search(self, key: int) -> Tuple[bool, List[int]]:
+        hits = self.search_result.hits if self.search_result else []
+        if key == KEY_ESCAPE:
+            self.search_query = None
+        elif key in KEY_BACKSPACES:
+            if self.search_query:
+                self.search_query = self.search_query[:-1]
+                self.run_search()
+            else:
+                self.search_query = None
+        elif key == KEY_UP:
+            self.search_selected = max(0, self.search_selected - 1)
+        elif key == KEY_DOWN:
+            self.search_selected = min(max(0, len(hits) - 1), self.search_selected + 1)
+        elif key == KEY_ENTER and hits:
+            hit = hits[min(self.search_selected, len(hits) - 1)]
+            if hit.source.play_url and not hit.source.browse_key:
+                self.search_query = None
+                self.select_source(hit.source)
+                return False, self.selected_source_index
+            if self.show_search_hit(hit):
+                self.search_query = None
+            else:
+                self.set_header_message(f"{hit.source.text} has moved; the index is refreshing")
+        elif 32 <= key < 127:
+            self.search_query += chr(key)
+            self.run_search()
+        return True, self.selected_source_index
+
+    def run_search(self):
+        index = self.crawler.index if self.crawler else None
+        if index is None:
+            return
+        self.search_generation = index.generation
+        self.search_result = index.search(self.search_query, max(1, curses.LINES - 12))
+        self.search_selected = 0
+
+    def show_search_hit(self, hit: SearchHit) -> bool:
+        """Open the menus above a search hit and highlight it, as if browsed to by hand.
+
+        Containers not loaded yet are filled from the index. Returns False if
+        the live menus no longer match the path the index recorded.
+        """
+        index = self.crawler.index if self.crawler else None
+        if index is None or not hit.path:
+            return False
+        sources = self.active_player.sources
+        for position in hit.path[:-1]:
+            if position >= len(sources) or not sources[position].browse_key:
+                return False
+            entry = sources[position]
+            if not entry.children:
+                children = index.children(entry.browse_key)
+                if not children:
+                    return False
+                entry.children = children
+            sources = entry.children
+        position = hit.path[-1]
+        if position >= len(sources) or sources[position].text != hit.source.text:
+            return False
+        self.current_sources = sources
+        self.selected_source_index = list(hit.path)
+        return True
+
+    def enter_source(self, source: PlayerSource):
+        self.current_sources = source.children
+        self.selected_source_index.append(0)
+
+    def expand_source_in_background(self, source: PlayerSource, count: int):
+        player = self.active_player
+        parent_sources = self.current_sources
+        prefetcher = self.prefetcher
+
+        def load() -> PlayerSource:
+            if prefetcher:
+                prefetcher.wait(source)
+            if not source.children:
+                pager = SourcePager(player, source.browse_key)
+                pager.ensure(count)
+                source.children = pager
+            return source
+
+        def on_loaded(loaded: PlayerSource):
+            # Only navigate if the user is still looking at the entry they expanded.
+            still_selected = (self.source_selection_mode and player is self.active_player
+                              and self.current_sources is parent_sources
+                              and parent_sources[self.selected_source_index[-1]] is source)
+            if not still_selected:
+                return
+            if source.children:
+                self.enter_source(source)
+                self.render_scheduler.invalidate(REGION_SOURCES)
+            else:
+                self.set_header_message(f"No nested sources found for: {source.text}")
+
+        self.set_header_message(f"Loading {source.text}...")
+        self.loader.submit(load, on_done=on_loaded, key=('expand', id(source)))
+
     def main(self, stdscr: curses.window):
         stdscr.erase()
         curses.curs_set(0)
+        # ESC closes the search prompt; do not wait the default second for an escape sequence.
+        curses.set_escdelay(25)
         curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLUE)
         curses.init_pair(2, curses.COLOR_BLACK, curses.COLOR_WHITE)
 
@@ -388,57 +928,152 @@ class BlusoundCLI:
         title_win: curses.window = curses.newwin(3, width, 0, 0)
         title_win.bkgd(' ', curses.color_pair(1))
 
-        self.players = threaded_discover()
+        if self.daemon:
+            # The daemon already knows the players and keeps its mirror current.
+            self.registry = self.daemon
+        else:
+            # Start from the cached player list; discovery confirms or expires entries in the background.
+            self.registry = PlayerRegistry(self.player_cache.load())
+            threaded_discover(registry=self.registry)
+        self.refresh_players()
+        self.browse_cache.load()
         stdscr.addstr(5, 2, "Discovering Blusound players...")
         stdscr.refresh()
 
-        player_mode: bool = False
+        self.player_mode = False
+        scheduler = self.render_scheduler
+        view: Optional[str] = None
+        screen_signature = None
 
         while True:
-            stdscr.erase()
-            stdscr.refresh()
-            if not player_mode:
-                self.update_header(title_win, "", "Player Selection")
-                self.display_player_selection(stdscr)
+            self.refresh_players()
+            if self.stats_view:
+                current_view, body_region = "Request Stats", REGION_STATS
+            elif not self.player_mode:
+                current_view, body_region = "Player Selection", REGION_PLAYERS
+            elif not self.source_selection_mode:
+                current_view, body_region = "Player Control", REGION_STATUS
             else:
-                if not self.source_selection_mode:
-                    self.update_header(title_win, "", "Player Control", self.active_player)
+                current_view, body_region = "Source Selection", REGION_SOURCES
+            if current_view != view:
+                view = current_view
+                scheduler.invalidate()
+
+            # Background work (discovery, source loading, paging) shows up as a changed signature.
+            signature = self.screen_signature(body_region)
+            if signature != screen_signature:
+                screen_signature = signature
+                scheduler.invalidate(body_region)
+
+            changed_kinds, self.changed_kinds = self.changed_kinds, set()
+            if body_region == REGION_STATUS and changed_kinds and (
+                    self.detail_view or changed_kinds & SUMMARY_CHANGE_KINDS):
+                scheduler.invalidate(REGION_STATUS)
+
+            dirty = scheduler.take()
+            if body_region in dirty:
+                stdscr.erase()
+                if body_region == REGION_PLAYERS:
+                    self.display_player_selection(stdscr)
+                elif body_region == REGION_STATUS:
                     self.display_player_control(stdscr)
+                elif body_region == REGION_STATS:
+                    self.display_stats_view(stdscr)
                 else:
-                    self.update_header(title_win, "", "Source Selection", self.active_player)
                     self.display_source_selection(stdscr)
+                stdscr.noutrefresh()
+                # The body erase covers the header rows, so copy the header over again.
+                title_win.touchwin()
+            if REGION_HEADER in dirty:
+                self.update_header(title_win, "", view, self.active_player if self.player_mode else None)
+            elif dirty:
+                title_win.noutrefresh()
+            if dirty:
+                curses.doupdate()
 
             stdscr.timeout(100)
             key = stdscr.getch()
+            if key != -1:
+                scheduler.invalidate(REGION_HEADER, body_region)
 
-            if key == ord('q'):
+            if key == ord('q') and not (self.source_selection_mode and self.search_query is not None):
+                self.status_watcher.stop()
+                self.commands.shutdown()
+                self.loader.shutdown()
+                if self.prefetcher:
+                    self.prefetcher.shutdown()
+                if self.crawler:
+                    self.crawler.stop()
+                if self.daemon:
+                    self.daemon.close()
+                self.player_cache.save(self.players)
+                self.browse_cache.save()
+                logger.info(f"Browse cache stats: {self.browse_cache.stats()}")
+                logger.info(f"Render stats: {scheduler.stats()}")
+                logger.info(f"Status history stats: {self.history.stats()}")
+                close_sessions()
                 break
-            elif not player_mode:
+            elif self.stats_view:
+                self.handle_stats_view(key)
+            elif key == KEY_M and not self.source_selection_mode and not (
+                    self.shortcuts_open or self.selector_shortcuts_open):
+                self.stats_view = True
+            elif not self.player_mode:
                 if self.selector_shortcuts_open:
                     if key != -1:
                         self.selector_shortcuts_open = False
                 else:
-                    player_mode, self.active_player, _ = self.handle_player_selection(key)
-                    if player_mode:
-                        self.update_player_status()
+                    self.player_mode, self.active_player, _ = self.handle_player_selection(key)
+                    if self.player_mode:
+                        self.watch_active_player()
             else:
                 if self.shortcuts_open:
                     if key != -1:
                         self.shortcuts_open = False
                 elif not self.source_selection_mode:
-                    player_mode, _ = self.handle_player_control(key, title_win, stdscr)
+                    self.player_mode, _ = self.handle_player_control(key, title_win, stdscr)
                 else:
                     self.source_selection_mode, _ = self.handle_source_selection(key, title_win)
 
-            current_time = time.time()
-            if self.active_player and current_time - self.last_update_time >= 10:
-                self.update_player_status()
-                self.last_update_time = current_time
+            # Status changes arrive from the watcher's long-poll instead of a fixed poll.
+            self.apply_status_updates()
+            completed = self.commands.run_callbacks() + self.loader.run_callbacks()
+            if completed:
+                scheduler.invalidate(REGION_HEADER)
+
+    def refresh_players(self) -> bool:
+        """Take a new snapshot of the player list if the registry changed since the last one."""
+        version = self.registry.version
+        if version == self.players_version:
+            return False
+        self.players_version = version
+        self.players = self.registry.players()
+        self.selected_index = min(self.selected_index, max(0, len(self.players) - 1))
+        return True
 
-            self.update_header(title_win, "", "Player Selection" if not player_mode else "Player Control")
+    def screen_signature(self, body_region: str):
+        """Cheap summary of background state drawn in the body region."""
+        if body_region == REGION_PLAYERS:
+            # Membership, names and addresses are covered by the registry version.
+            return (self.players_version, tuple((p.sources_state, p.from_cache, p.circuit.state,
+                                                 round(p.circuit.retry_in)) for p in self.players))
+        if body_region == REGION_SOURCES and self.active_player:
+            pager_complete = getattr(self.current_sources, 'complete', True)
+            indexing = None
+            if self.search_query is not None and self.crawler:
+                indexing = (self.crawler.index.generation, self.crawler.crawling)
+            return (self.active_player.sources_state, len(self.current_sources), pager_complete, indexing)
+        return None
 
 if __name__ == "__main__":
-    cli = BlusoundCLI()
+    setup_logging()
+    if len(sys.argv) > 1:
+        # Any arguments select the non-interactive subcommands; no discovery or curses needed.
+        import headless
+        sys.exit(headless.main(sys.argv[1:]))
+    # Share discovery and status with a running daemon.py instead of starting cold.
+    from daemon import attach
+    cli = BlusoundCLI(daemon=attach())
     try:
         curses.wrapper(cli.main)
     except Exception as e:
@@ -0,0 +1,747 @@
+"""Long-running daemon that shares discovery, status and browse state between clients.
+
+One process runs mDNS discovery, keeps a long-poll /Status stream per player
+and holds the browse cache, and serves them over a Unix socket. `cli.py`
+attaches to it automatically when it is running, so several operators and
+scripts on the same machine cost the players one set of requests and start
+with the current state instead of a cold discovery.
+
+    python daemon.py [--socket PATH]
+
+The protocol is newline-delimited JSON. A request is
+`{"id": 1, "op": "status", "address": "192.168.1.20:11000"}` and is answered
+with `{"id": 1, "ok": true, "result": ...}` or `{"id": 1, "ok": false,
+"error": "..."}`. After `subscribe` the daemon also pushes
+`{"event": "status", "address": ..., "status": {...}}` whenever a player's
+status changes and `{"event": "players", "players": [...]}` whenever the
+player list does.
+
+`browse` returns a container's items, or with `"page": true` one server page
+as `{"items": [...], "next_key": ...}` so clients can page through large
+containers without the daemon loading them whole. `invalidate` drops a
+player's cached browse results after a client changed its sources directly.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, fields
+from typing import Callable, Dict, List, Optional, Union
+
+from cache import BROWSE_CACHE_FILE, BrowseCache, PlayerCache, source_from_dict, source_to_dict
+from history import StatusHistory
+from lazyimport import LazyModule
+from logconfig import setup_logging
+from metrics import REQUEST_METRICS
+from player import (SOURCES_READY, TRANSPORT_ACTIONS, BlusoundPlayer, BrowsePage, PlayerRegistry, PlayerStatus,
+                    StatusWatcher, close_sessions, threaded_discover)
+
+requests = LazyModule('requests')
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+SOCKET_ENV = 'BLUCLI_SOCKET'
+# How often the daemon picks up players added or removed by discovery.
+SYNC_INTERVAL = 1.0
+# Events buffered for a subscriber before a client that stopped reading is dropped.
+MAX_PENDING_EVENTS = 1000
+# Seconds between attempts to reattach after the daemon connection dropped.
+RECONNECT_INTERVAL = 2.0
+
+_STATUS_FIELDS = frozenset(f.name for f in fields(PlayerStatus))
+
+EventCallback = Callable[[Dict], None]
+
+
+def default_socket_path() -> str:
+    return os.environ.get(SOCKET_ENV) or os.path.join(tempfile.gettempdir(), f"blucli-{os.getuid()}.sock")
+
+
+class DaemonError(Exception):
+    """The daemon rejected a request, or the connection to it was lost."""
+
+
+def player_to_dict(player: BlusoundPlayer) -> Dict:
+    return {
+        "name": player.name,
+        "host_name": player.host_name,
+        "port": player.port,
+        "address": player.address,
+        "service_name": player.service_name,
+        "mac": player.mac,
+        "sources_state": player.sources_state,
+        "from_cache": player.from_cache,
+        "circuit": player.circuit.state,
+        "sources": [source_to_dict(source) for source in player.sources],
+    }
+
+
+def status_to_dict(status: PlayerStatus) -> Dict:
+    return asdict(status)
+
+
+def status_from_dict(data: Dict) -> PlayerStatus:
+    return PlayerStatus(**{key: value for key, value in data.items() if key in _STATUS_FIELDS})
+
+
+def _encode(message: Dict) -> bytes:
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+def _socket_alive(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+class _Connection:
+    """One attached client. Responses are written by its handler thread, events by its own pump thread."""
+
+    def __init__(self, sock: socket.socket, wfile):
+        self.sock = sock
+        self.wfile = wfile
+        self.subscribed = False
+        self.events: 'queue.Queue[Optional[Dict]]' = queue.Queue(MAX_PENDING_EVENTS)
+        self._write_lock = threading.Lock()
+
+    def send(self, message: Dict) -> None:
+        data = _encode(message)
+        with self._write_lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def push(self, event: Dict) -> None:
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            logger.warning("Dropping daemon client that stopped reading events")
+            self.close()
+
+    def close(self) -> None:
+        try:
+            # Wakes the handler thread blocked on reading from this client.
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def pump_events(self) -> None:
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            try:
+                self.send(event)
+            except OSError:
+                return
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon: 'PlayerDaemon' = self.server.player_daemon
+        connection = _Connection(self.request, self.wfile)
+        pump = threading.Thread(target=connection.pump_events, name='daemon-events', daemon=True)
+        pump.start()
+        daemon.attach(connection)
+        try:
+            for line in self.rfile:
+                if line.strip():
+                    connection.send(daemon.handle_line(line, connection))
+        except OSError:
+            pass
+        finally:
+            daemon.detach(connection)
+            connection.events.put(None)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    player_daemon: 'PlayerDaemon'
+
+
+class PlayerDaemon:
+    """Owns discovery, the status long-polls and the browse cache for every player.
+
+    Every discovered player is watched with one StatusWatcher, and status
+    changes are pushed to all subscribed clients, so the players see the same
+    traffic however many clients are attached.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, player_cache: Optional[PlayerCache] = None,
+                 browse_cache: Optional[BrowseCache] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.player_cache = player_cache or PlayerCache()
+        self.browse_cache = browse_cache or BrowseCache(path=BROWSE_CACHE_FILE)
+        self.watcher = StatusWatcher()
+        self.history = StatusHistory()
+        self.registry: Optional[PlayerRegistry] = None
+        self.players: List[BlusoundPlayer] = []
+        self.started = time.monotonic()
+        # Keyed by id(): a player that moves to a new address keeps its watch.
+        self._watched: Dict[int, BlusoundPlayer] = {}
+        self._sync_lock = threading.Lock()
+        self._connections: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server: Optional[_Server] = None
+        self._players_signature = None
+        self.handlers: Dict[str, Callable] = {
+            'hello': self._hello,
+            'players': self._players,
+            'status': self._status,
+            'browse': self._browse,
+            'invalidate': self._invalidate,
+            'command': self._command,
+            'subscribe': self._subscribe,
+            'history': self._history,
+            'stats': self._stats,
+        }
+
+    def start(self, players: Optional[List[BlusoundPlayer]] = None) -> None:
+        """Bind the socket and start serving; `players` replaces discovery with a fixed list."""
+        self._bind()
+        self.browse_cache.load()
+        if players is not None:
+            self.players = players
+        else:
+            self.registry = PlayerRegistry(self.player_cache.load())
+            self.players = threaded_discover(registry=self.registry)
+        self.watcher.subscribe(self.history.record)
+        self.watcher.subscribe(self._on_status)
+        self._sync_players()
+        if self.registry:
+            # Pass discovery changes on right away; the loop below catches source and circuit changes.
+            self.registry.subscribe(lambda event: self._sync_players())
+        threading.Thread(target=self._sync_loop, name='daemon-sync', daemon=True).start()
+        threading.Thread(target=self._server.serve_forever, name='daemon-server', daemon=True).start()
+        logger.info(f"Daemon listening on {self.socket_path}")
+
+    def wait(self) -> None:
+        while not self._stop.wait(1.0):
+            pass
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.close()
+        self.watcher.stop()
+        self.player_cache.save(self.players)
+        self.browse_cache.save()
+        close_sessions()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        logger.info("Daemon stopped")
+
+    def _bind(self) -> None:
+        if os.path.exists(self.socket_path):
+            if _socket_alive(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        # Only the owner may connect: clients can control every player.
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+        self._server.player_daemon = self
+
+    def attach(self, connection: _Connection) -> None:
+        with self._lock:
+            self._connections.append(connection)
+        logger.info(f"Client attached ({len(self._connections)} connected)")
+
+    def detach(self, connection: _Connection) -> None:
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        logger.info(f"Client detached ({len(self._connections)} connected)")
+
+    def broadcast(self, event: Dict) -> None:
+        with self._lock:
+            subscribers = [c for c in self._connections if c.subscribed]
+        for connection in subscribers:
+            connection.push(event)
+
+    def handle_line(self, line: bytes, connection: _Connection) -> Dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            handler = self.handlers.get(request.get('op'))
+            if handler is None:
+                raise DaemonError(f"Unknown op: {request.get('op')}")
+            return {"id": request_id, "ok": True, "result": handler(request, connection)}
+        except (DaemonError, ValueError, KeyError, TypeError, AttributeError) as e:
+            return {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+
+    def find(self, target: str) -> BlusoundPlayer:
+        players = list(self.players)
+        for player in players:
+            if target == player.address:
+                return player
+        for player in players:
+            if target in (player.host_name, player.name, player.name.replace('.local', '')):
+                return player
+        raise DaemonError(f"Unknown player: {target}")
+
+    def _sync_loop(self) -> None:
+        while not self._stop.wait(SYNC_INTERVAL):
+            try:
+                self._sync_players()
+            except Exception as e:
+                logger.error(f"Error syncing daemon players: {e}")
+
+    def _sync_players(self) -> None:
+        with self._sync_lock:
+            players = self.registry.players() if self.registry else list(self.players)
+            current = {id(player): player for player in players}
+            for key, player in current.items():
+                player.browse_cache = self.browse_cache
+                if key not in self._watched:
+                    self._watched[key] = player
+                    self.watcher.watch(player)
+            for key in [key for key in self._watched if key not in current]:
+                self.watcher.unwatch(self._watched.pop(key))
+            signature = tuple((p.address, p.name, p.sources_state, p.from_cache, p.circuit.state, len(p.sources))
+                              for p in players)
+            if signature == self._players_signature:
+                return
+            self._players_signature = signature
+        self.broadcast({"event": "players", "players": [player_to_dict(p) for p in players]})
+
+    def _on_status(self, player: BlusoundPlayer, status: PlayerStatus) -> None:
+        self.broadcast({"event": "status", "address": player.address, "status": status_to_dict(status)})
+
+    def _hello(self, request: Dict, connection: _Connection) -> Dict:
+        return {
+            "version": PROTOCOL_VERSION,
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self.started, 1),
+            "players": len(self.players),
+        }
+
+    def _players(self, request: Dict, connection: _Connection) -> List[Dict]:
+        return [player_to_dict(player) for player in list(self.players)]
+
+    def _status(self, request: Dict, connection: _Connection) -> Dict:
+        player = self.find(request['address'])
+        status = None if request.get('fresh') else self.watcher.latest(player)
+        if status is None:
+            success, result = player.get_status()
+            if not success:
+                raise DaemonError(result)
+            status = result
+        return status_to_dict(status)
+
+    def _browse(self, request: Dict, connection: _Connection) -> Union[List[Dict], Dict]:
+        player = self.find(request['address'])
+        browse_key = request.get('browse_key')
+        if not request.get('page'):
+            sources = player.capture_sources(browse_key, use_cache=request.get('use_cache', True))
+            return [source_to_dict(source) for source in sources]
+        cached = self.browse_cache.get(player.base_url, browse_key or '')
+        if cached is not None:
+            page = BrowsePage(cached)
+        else:
+            try:
+                page = player.fetch_browse_page(browse_key)
+            except requests.RequestException as e:
+                raise DaemonError(f"Error browsing {player.name}: {e}")
+        return {"items": [source_to_dict(source) for source in page.items], "next_key": page.next_key}
+
+    def _invalidate(self, request: Dict, connection: _Connection) -> None:
+        self.find(request['address']).invalidate_browse_cache()
+
+    def _command(self, request: Dict, connection: _Connection) -> Dict:
+        player = self.find(request['address'])
+        action = request['action']
+        if action in TRANSPORT_ACTIONS:
+            success, message = getattr(player, TRANSPORT_ACTIONS[action][0])()
+        elif action == 'volume':
+            success, message = player.set_volume(request.get('level'), db=request.get('db'))
+        elif action == 'input':
+            success, message = player.select_input(source_from_dict(request['source']))
+        else:
+            raise DaemonError(f"Unknown action: {action}")
+        return {"success": success, "message": message}
+
+    def _subscribe(self, request: Dict, connection: _Connection) -> Dict:
+        # Register before taking the snapshot so no change falls between the two.
+        connection.subscribed = True
+        players = list(self.players)
+        statuses = {}
+        for player in players:
+            status = self.watcher.latest(player)
+            if status is not None:
+                statuses[player.address] = status_to_dict(status)
+        return {"players": [player_to_dict(player) for player in players], "statuses": statuses}
+
+    def _history(self, request: Dict, connection: _Connection) -> List[Dict]:
+        player = self.find(request['address'])
+        return self.history.snapshot(player.address, request.get('start'), request.get('end'))
+
+    def _stats(self, request: Dict, connection: _Connection) -> Dict:
+        with self._lock:
+            clients = len(self._connections)
+        return {
+            "clients": clients,
+            "browse_cache": self.browse_cache.stats(),
+            "history": self.history.stats(),
+            "requests": REQUEST_METRICS.snapshot(),
+        }
+
+
+class DaemonClient:
+    """Connection to a running daemon. `call` may be used from any thread."""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 15.0):
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(self.path)
+        except OSError:
+            self._sock.close()
+            raise
+        self._rfile = self._sock.makefile('rb')
+        self._write_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._callbacks: List[EventCallback] = []
+        self.closed = threading.Event()
+        threading.Thread(target=self._read_loop, name='daemon-client', daemon=True).start()
+
+    @classmethod
+    def connect(cls, path: Optional[str] = None, timeout: float = 15.0) -> Optional['DaemonClient']:
+        """Attach to the daemon if one is running; None otherwise."""
+        try:
+            return cls(path, timeout)
+        except OSError:
+            return None
+
+    def call(self, op: str, **params):
+        if self.closed.is_set():
+            raise DaemonError("Connection to daemon closed")
+        request_id = next(self._ids)
+        future: Future = Future()
+        self._pending[request_id] = future
+        try:
+            with self._write_lock:
+                self._sock.sendall(_encode({"id": request_id, "op": op, **params}))
+            response = future.result(self.timeout)
+        except FutureTimeoutError:
+            raise DaemonError(f"No response from daemon to {op} within {self.timeout:g}s")
+        except OSError as e:
+            raise DaemonError(f"Connection to daemon failed: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Request failed'))
+        return response.get('result')
+
+    def subscribe(self, callback: EventCallback) -> Dict:
+        """Receive pushed events on the reader thread; returns the current players and statuses."""
+        self._callbacks.append(callback)
+        return self.call('subscribe')
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _read_loop(self) -> None:
+        try:
+            for line in self._rfile:
+                message = json.loads(line)
+                if 'event' in message:
+                    for callback in list(self._callbacks):
+                        try:
+                            callback(message)
+                        except Exception as e:
+                            logger.error(f"Daemon event callback failed: {e}")
+                    continue
+                future = self._pending.get(message.get('id'))
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Lost connection to daemon: {e}")
+        finally:
+            self.closed.set()
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(DaemonError("Connection to daemon closed"))
+            logger.info("Daemon connection closed")
+
+
+class RemotePlayer(BlusoundPlayer):
+    """Player handle mirrored from the daemon.
+
+    Sources come from the daemon's shared browse cache; transport commands
+    still go straight to the player so they cost no extra hop.
+    """
+
+    def __init__(self, client: DaemonClient, data: Dict):
+        super().__init__(data['host_name'], data['name'], port=data['port'], initialize=False)
+        self.client = client
+        self.update_from(data)
+
+    def update_from(self, data: Dict) -> None:
+        self.name = data['name']
+        self.from_cache = data['from_cache']
+        self.service_name = data.get('service_name')
+        self.mac = data.get('mac')
+        if data['address'] != self.address:
+            self.move(data['host_name'], data['port'])
+        # Keep sources already loaded here; they may have expanded children.
+        if self.sources_state != SOURCES_READY:
+            self.sources = [source_from_dict(source) for source in data['sources']]
+            self.sources_state = data['sources_state']
+
+    def capture_sources(self, browse_key: Optional[str] = None, use_cache: bool = True):
+        try:
+            sources = self.client.call('browse', address=self.address, browse_key=browse_key, use_cache=use_cache)
+            return [source_from_dict(source) for source in sources]
+        except DaemonError as e:
+            logger.warning(f"Browsing {self.name} through the daemon failed, asking the player: {e}")
+            return super().capture_sources(browse_key, use_cache)
+
+    def invalidate_browse_cache(self) -> None:
+        super().invalidate_browse_cache()
+        try:
+            self.client.call('invalidate', address=self.address)
+        except DaemonError as e:
+            logger.warning(f"Could not drop the daemon's browse cache for {self.name}: {e}")
+
+    def fetch_browse_page(self, browse_key: Optional[str] = None) -> BrowsePage:
+        # iter_source_pages, SourcePager and SourcePrefetcher all page through here.
+        try:
+            page = self.client.call('browse', address=self.address, browse_key=browse_key, page=True)
+        except DaemonError as e:
+            logger.warning(f"Browsing {self.name} through the daemon failed, asking the player: {e}")
+            return super().fetch_browse_page(browse_key)
+        return BrowsePage([source_from_dict(source) for source in page['items']], page.get('next_key'))
+
+
+class RemoteStatusWatcher(StatusWatcher):
+    """StatusWatcher fed by the daemon's pushed statuses instead of its own long-polls.
+
+    While the daemon connection is down (`set_local(True)`), watched players
+    are long-polled directly as a plain StatusWatcher would.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Keyed by id() so a player that moves to a new address stays watched.
+        self._watched: Dict[int, BlusoundPlayer] = {}
+        self._remote: Dict[str, PlayerStatus] = {}
+        self.local = False
+
+    def is_watching(self, player: BlusoundPlayer) -> bool:
+        with self._lock:
+            return id(player) in self._watched
+
+    def watch(self, player: BlusoundPlayer) -> None:
+        with self._lock:
+            if id(player) in self._watched:
+                return
+            self._watched[id(player)] = player
+            status = self._remote.get(player.base_url)
+            local = self.local
+        if local:
+            super().watch(player)
+        # The daemon already knows the status, so the view fills in without a request.
+        elif status is not None:
+            self._publish(player, status)
+
+    def unwatch(self, player: BlusoundPlayer) -> None:
+        with self._lock:
+            self._watched.pop(id(player), None)
+        super().unwatch(player)
+        self._latest.pop(player.base_url, None)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._watched.clear()
+        super().stop()
+
+    def set_local(self, local: bool) -> None:
+        """Long-poll the watched players directly (True) or go back to the daemon's statuses."""
+        with self._lock:
+            if local == self.local:
+                return
+            self.local = local
+            players = list(self._watched.values())
+        if local:
+            for player in players:
+                super().watch(player)
+        else:
+            # Ends only the local loops; a later set_local(True) starts them again.
+            super().stop()
+
+    def update(self, base_url: str, status: PlayerStatus) -> None:
+        with self._lock:
+            self._remote[base_url] = status
+            player = next((p for p in self._watched.values() if p.base_url == base_url), None)
+        if player is not None:
+            self._publish(player, status)
+
+
+def _identity(service_name: Optional[str], address: str) -> str:
+    return service_name or address
+
+
+class RemoteState:
+    """Local mirror of the daemon's players and statuses, kept current by its pushed events.
+
+    `players` and `version` match PlayerRegistry, and `watcher` stands in for
+    a StatusWatcher. If the connection drops, the watcher long-polls the
+    players itself and the last player list is kept until the daemon is
+    reached again, every RECONNECT_INTERVAL seconds.
+    """
+
+    def __init__(self, client: DaemonClient):
+        self.client = client
+        self.version = 0
+        self._players: List[RemotePlayer] = []
+        self.watcher = RemoteStatusWatcher()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._resubscribe(client)
+        threading.Thread(target=self._reconnect_loop, name='daemon-reconnect', daemon=True).start()
+
+    def players(self) -> List[RemotePlayer]:
+        with self._lock:
+            return list(self._players)
+
+    @property
+    def connected(self) -> bool:
+        return not self.client.closed.is_set()
+
+    def close(self) -> None:
+        self._closed.set()
+        self.client.close()
+
+    def _resubscribe(self, client: DaemonClient) -> None:
+        snapshot = client.subscribe(self._on_event)
+        with self._lock:
+            previous, self.client = self.client, client
+            for player in self._players:
+                player.client = client
+        if previous is not client:
+            previous.close()
+        self._apply_players(snapshot['players'])
+        for address, status in snapshot['statuses'].items():
+            self.watcher.update(f"http://{address}", status_from_dict(status))
+
+    def _reconnect_loop(self) -> None:
+        while True:
+            self.client.closed.wait()
+            if self._closed.is_set():
+                return
+            logger.warning("Lost the daemon; polling players directly until it is back")
+            self.watcher.set_local(True)
+            while not self._closed.wait(RECONNECT_INTERVAL):
+                client = DaemonClient.connect(self.client.path, self.client.timeout)
+                if client is None:
+                    continue
+                try:
+                    self._resubscribe(client)
+                except DaemonError as e:
+                    logger.warning(f"Reattaching to daemon at {client.path} failed: {e}")
+                    client.close()
+                    continue
+                self.watcher.set_local(False)
+                logger.info(f"Reattached to daemon at {client.path}")
+                break
+            else:
+                return
+
+    def _on_event(self, event: Dict) -> None:
+        if event['event'] == 'status':
+            self.watcher.update(f"http://{event['address']}", status_from_dict(event['status']))
+        elif event['event'] == 'players':
+            self._apply_players(event['players'])
+
+    def _apply_players(self, entries: List[Dict]) -> None:
+        with self._lock:
+            # Keep existing handles so the active player and its watch survive list updates.
+            known = {_identity(player.service_name, player.address): player for player in self._players}
+            before = [(player.address, player.name, player.from_cache) for player in self._players]
+            players = []
+            for data in entries:
+                player = known.get(_identity(data.get('service_name'), data['address']))
+                if player is None:
+                    player = RemotePlayer(self.client, data)
+                else:
+                    player.update_from(data)
+                players.append(player)
+            self._players = players
+            if [(player.address, player.name, player.from_cache) for player in players] != before:
+                self.version += 1
+
+
+def attach(path: Optional[str] = None) -> Optional[RemoteState]:
+    """Mirror the running daemon's state, or return None when no daemon is running."""
+    client = DaemonClient.connect(path)
+    if client is None:
+        return None
+    try:
+        state = RemoteState(client)
+    except DaemonError as e:
+        logger.warning(f"Ignoring daemon at {client.path}: {e}")
+        client.close()
+        return None
+    logger.info(f"Attached to daemon at {client.path} with {len(state.players())} players")
+    return state
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Share player discovery, status and browse state over a Unix socket.")
+    parser.add_argument('--socket', default=None, help=f"socket path (default: ${SOCKET_ENV} or {default_socket_path()})")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    daemon = PlayerDaemon(args.socket)
+    try:
+        daemon.start()
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    print(f"Serving on {daemon.socket_path}", file=sys.stderr)
+    try:
+        daemon.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
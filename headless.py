@@ -0,0 +1,389 @@
+"""Non-interactive subcommands for scripts, cron jobs and home-automation hooks.
+
+Targets are given as a host (`192.168.1.20`, `speaker.lan:11000`) or as a
+player name from the player cache. Neither needs mDNS discovery, so a
+command costs one round trip to the player. Only names that are not cached
+fall back to discovery.
+
+    python cli.py status --all --json
+    python cli.py volume 192.168.1.20 30
+    python cli.py skip "Living Room"
+    python cli.py batch < commands.txt
+"""
+import argparse
+import io
+import json
+import logging
+import shlex
+import sys
+import threading
+import time
+from contextlib import redirect_stderr
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cache import PlayerCache
+from player import TRANSPORT_ACTIONS, BlusoundPlayer, PlayerStatus, close_sessions, threaded_discover
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 10.0
+DEFAULT_DISCOVERY_TIMEOUT = 5.0
+MAX_WORKERS = 16
+
+
+class UsageError(Exception):
+    pass
+
+
+@dataclass
+class CommandResult:
+    command: str
+    player: str
+    address: str
+    ok: bool
+    message: str = ''
+    status: Optional[PlayerStatus] = None
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict:
+        data = {
+            "command": self.command,
+            "player": self.player,
+            "address": self.address,
+            "ok": self.ok,
+            "message": self.message,
+            "elapsed": round(self.elapsed, 4),
+        }
+        if self.status is not None:
+            data["status"] = asdict(self.status)
+        return data
+
+    def to_text(self) -> str:
+        if self.status is not None:
+            status = self.status
+            return (f"{self.player}: {status.state} | {status.title1} - {status.artist} | "
+                    f"volume {status.volume}")
+        return f"{self.player}: {'' if self.ok else 'error: '}{self.message}"
+
+
+def _status(player: BlusoundPlayer, args) -> Tuple[bool, str, Optional[PlayerStatus]]:
+    success, status = player.get_status()
+    if success:
+        return True, '', status
+    return False, status, None
+
+
+def _volume(player: BlusoundPlayer, args) -> Tuple[bool, str, Optional[PlayerStatus]]:
+    level = args.level
+    if level[:1] in '+-':
+        # Relative levels need the current volume first, so they cost two round trips.
+        success, status = player.get_status()
+        if not success:
+            return False, status, None
+        level = status.volume + int(level)
+    success, message = player.set_volume(max(0, min(100, int(level))))
+    return success, message, None
+
+
+def _command(method: str) -> Callable:
+    def run(player: BlusoundPlayer, args) -> Tuple[bool, str, Optional[PlayerStatus]]:
+        success, message = getattr(player, method)()
+        return success, message, None
+    return run
+
+
+def _input(player: BlusoundPlayer, args) -> Tuple[bool, str, Optional[PlayerStatus]]:
+    sources = player.capture_sources()
+    wanted = args.source.lower()
+    source = next((s for s in sources if s.text.lower() == wanted), None)
+    if source is None:
+        return False, f"No source named {args.source!r}", None
+    success, message = player.select_input(source)
+    return success, message, None
+
+
+def _sources(player: BlusoundPlayer, args) -> Tuple[bool, str, Optional[PlayerStatus]]:
+    sources = player.capture_sources()
+    if not sources:
+        return False, "No sources found", None
+    return True, ', '.join(source.text for source in sources), None
+
+
+# Subcommand name -> (handler, help)
+COMMANDS: Dict[str, Tuple[Callable, str]] = {
+    'status': (_status, "show what each player is doing"),
+    'volume': (_volume, "set the volume to LEVEL, or change it by +N/-N"),
+    **{name: (_command(method), help_text) for name, (method, help_text) in TRANSPORT_ACTIONS.items()},
+    'input': (_input, "select a top-level source by name"),
+    'sources': (_sources, "list the top-level sources"),
+}
+
+
+def _add_global_options(parser: argparse.ArgumentParser, defaults: bool) -> None:
+    # Added to the top-level parser with defaults and to every subcommand without,
+    # so the options work both before and after the subcommand name.
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
+
+    parser.add_argument('--json', action='store_true', default=default(False), help="print results as JSON")
+    parser.add_argument('--deadline', type=float, default=default(DEFAULT_DEADLINE),
+                        help=f"give up on players that have not answered after this many seconds "
+                             f"(default: {DEFAULT_DEADLINE:g})")
+    parser.add_argument('--discovery-timeout', type=float, default=default(DEFAULT_DISCOVERY_TIMEOUT),
+                        help="how long to search for players that are neither hosts nor cached "
+                             f"(default: {DEFAULT_DISCOVERY_TIMEOUT:g})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description="Control Blusound players without the TUI.")
+    _add_global_options(parser, defaults=True)
+    common = argparse.ArgumentParser(add_help=False)
+    _add_global_options(common, defaults=False)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        command = subparsers.add_parser(name, help=help_text, parents=[common])
+        if name == 'status':
+            command.add_argument('targets', nargs='*', metavar='TARGET')
+            command.add_argument('--all', action='store_true', help="every cached player")
+        else:
+            command.add_argument('target', metavar='TARGET', help="host[:port] or player name")
+        if name == 'volume':
+            command.add_argument('level', metavar='LEVEL')
+        elif name == 'input':
+            command.add_argument('source', metavar='SOURCE')
+    subparsers.add_parser('players', help="list the cached players", parents=[common])
+    discover = subparsers.add_parser('discover', help="search the network and refresh the player cache",
+                                     parents=[common])
+    discover.add_argument('--timeout', type=float, default=DEFAULT_DISCOVERY_TIMEOUT)
+    subparsers.add_parser('batch', help="read one command per line from stdin and run them concurrently",
+                          parents=[common])
+    return parser
+
+
+def _matches(player: BlusoundPlayer, target: str) -> bool:
+    target = target.lower()
+    name = player.name.lower().rstrip('.')
+    if name.endswith('.local'):
+        name = name[:-len('.local')]
+    return target in (player.host_name.lower(), player.address.lower(), name)
+
+
+def _looks_like_host(target: str) -> bool:
+    return '.' in target or ':' in target or target == 'localhost'
+
+
+def _direct_player(target: str) -> BlusoundPlayer:
+    host, port = target, ''
+    if target.count(':') == 1:
+        host, port = target.split(':')
+    if port and not port.isdigit():
+        raise UsageError(f"Invalid port in {target!r}")
+    return BlusoundPlayer(host, target, port=int(port or 11000), initialize=False)
+
+
+class TargetResolver:
+    """Turns TARGET arguments into players, preferring direct hosts and the cache over discovery."""
+
+    def __init__(self, discovery_timeout: float = DEFAULT_DISCOVERY_TIMEOUT,
+                 cache: Optional[PlayerCache] = None):
+        self.discovery_timeout = discovery_timeout
+        self.cache = cache or PlayerCache()
+        self._cached: Optional[List[BlusoundPlayer]] = None
+        self._discovered: Optional[List[BlusoundPlayer]] = None
+        self._discovery_started = 0.0
+
+    @property
+    def cached(self) -> List[BlusoundPlayer]:
+        if self._cached is None:
+            self._cached = self.cache.load()
+        return self._cached
+
+    def resolve(self, target: str) -> BlusoundPlayer:
+        player = next((p for p in self.cached if _matches(p, target)), None)
+        if player is not None:
+            return player
+        if _looks_like_host(target):
+            player = _direct_player(target)
+            self.cached.append(player)
+            return player
+        return self._discover(target)
+
+    def all(self) -> List[BlusoundPlayer]:
+        if self.cached:
+            return list(self.cached)
+        # Nothing cached yet: fall back to whatever discovery finds in time.
+        self._start_discovery()
+        self._wait(lambda: False)
+        return list(self._discovered)
+
+    def _start_discovery(self) -> None:
+        if self._discovered is None:
+            logger.info("Target not cached; starting discovery")
+            self._discovered = threaded_discover()
+            self._discovery_started = time.monotonic()
+
+    def _wait(self, found: Callable[[], bool]) -> None:
+        while not found() and time.monotonic() - self._discovery_started < self.discovery_timeout:
+            time.sleep(0.1)
+
+    def _discover(self, target: str) -> BlusoundPlayer:
+        self._start_discovery()
+        self._wait(lambda: any(_matches(p, target) for p in self._discovered))
+        player = next((p for p in self._discovered if _matches(p, target)), None)
+        if player is None:
+            raise UsageError(f"No player found for {target!r}")
+        return player
+
+
+def _run_in_order(tasks: List[Tuple[str, BlusoundPlayer, argparse.Namespace]], results: List[CommandResult],
+                  limit: threading.BoundedSemaphore) -> None:
+    with limit:
+        for command, player, args in tasks:
+            started = time.monotonic()
+            try:
+                ok, message, status = COMMANDS[command][0](player, args)
+            except Exception as e:
+                logger.error(f"{command} failed for {player.name}: {e}")
+                ok, message, status = False, str(e), None
+            results.append(CommandResult(command, player.name, player.address, ok, message, status,
+                                         time.monotonic() - started))
+
+def run_commands(commands: List[argparse.Namespace], resolver: TargetResolver,
+                 deadline: float = DEFAULT_DEADLINE) -> List[CommandResult]:
+    """Run parsed commands concurrently across players.
+
+    Commands for the same player run in the order given so that, for example,
+    a volume change and a skip in one batch do not race each other. Results
+    come back in command order; anything unfinished at `deadline` is reported
+    as timed out.
+    """
+    tasks: List[Tuple[str, BlusoundPlayer, argparse.Namespace]] = []
+    results: List[Optional[CommandResult]] = []
+    for args in commands:
+        targets = getattr(args, 'targets', None)
+        if targets is None:
+            targets = [args.target]
+        try:
+            players = resolver.all() if getattr(args, 'all', False) or not targets else \
+                [resolver.resolve(target) for target in targets]
+        except UsageError as e:
+            results.append(CommandResult(args.command, ', '.join(targets), '', False, str(e)))
+            continue
+        if not players:
+            results.append(CommandResult(args.command, 'all', '', False, "No players found"))
+            continue
+        for player in players:
+            tasks.append((args.command, player, args))
+            results.append(None)
+
+    groups: Dict[str, List[int]] = {}
+    for index, (_, player, _) in enumerate(tasks):
+        groups.setdefault(player.address, []).append(index)
+
+    # Daemon threads rather than a pool: a player that never answers must not keep the process alive.
+    started = time.monotonic()
+    limit = threading.BoundedSemaphore(MAX_WORKERS)
+    runs = []
+    for indexes in groups.values():
+        done: List[CommandResult] = []
+        thread = threading.Thread(target=_run_in_order, args=([tasks[i] for i in indexes], done, limit),
+                                  name='headless', daemon=True)
+        thread.start()
+        runs.append((thread, indexes, done))
+    for thread, _, _ in runs:
+        thread.join(max(0.0, deadline - (time.monotonic() - started)))
+
+    task_results: Dict[int, CommandResult] = {}
+    for _, indexes, done in runs:
+        done = list(done)
+        for index, result in zip(indexes, done):
+            task_results[index] = result
+        for index in indexes[len(done):]:
+            command, player, _ = tasks[index]
+            task_results[index] = CommandResult(command, player.name, player.address, False,
+                                                f"No response within {deadline}s", None,
+                                                time.monotonic() - started)
+    task_index = iter(range(len(tasks)))
+    return [result if result is not None else task_results[next(task_index)] for result in results]
+
+
+def read_batch(lines, parser: argparse.ArgumentParser) -> Tuple[List[argparse.Namespace], List[CommandResult]]:
+    """Parse one command per line; blank lines and # comments are skipped."""
+    commands, errors = [], []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        usage = io.StringIO()
+        try:
+            with redirect_stderr(usage):
+                args = parser.parse_args(shlex.split(line))
+        except (SystemExit, ValueError) as e:
+            reason = usage.getvalue().strip().splitlines()[-1:] or [str(e)]
+            errors.append(CommandResult('batch', f"line {number}", '', False, f"{line}: {reason[0]}"))
+            continue
+        if args.command not in COMMANDS:
+            errors.append(CommandResult('batch', f"line {number}", '', False, f"Not allowed in a batch: {line}"))
+            continue
+        commands.append(args)
+    return commands, errors
+
+
+def print_results(results: List[CommandResult], as_json: bool, out=sys.stdout) -> None:
+    if as_json:
+        json.dump([result.to_dict() for result in results], out, indent=2)
+        out.write('\n')
+        return
+    for result in results:
+        out.write(result.to_text() + '\n')
+
+
+def list_players(players: List[BlusoundPlayer], as_json: bool, out=sys.stdout) -> None:
+    if as_json:
+        json.dump([{"name": p.name, "address": p.address, "cached": p.from_cache} for p in players], out, indent=2)
+        out.write('\n')
+        return
+    for player in players:
+        out.write(f"{player.name}\t{player.address}\n")
+
+
+def discover_players(timeout: float, cache: PlayerCache) -> List[BlusoundPlayer]:
+    players = threaded_discover(cache.load())
+    time.sleep(timeout)
+    confirmed = [p for p in players if not p.from_cache]
+    # Give players found late a moment to finish loading their sources for the cache.
+    end = time.monotonic() + 2.0
+    while time.monotonic() < end and not all(p.sources_ready for p in confirmed):
+        time.sleep(0.1)
+    cache.save(list(players))
+    return confirmed
+
+
+def main(argv: List[str]) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return _run(parser, args)
+    finally:
+        close_sessions()
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    cache = PlayerCache()
+    if args.command == 'players':
+        list_players(cache.load(), args.json)
+        return 0
+    if args.command == 'discover':
+        list_players(discover_players(args.timeout, cache), args.json)
+        return 0
+
+    resolver = TargetResolver(args.discovery_timeout, cache)
+    errors: List[CommandResult] = []
+    if args.command == 'batch':
+        commands, errors = read_batch(sys.stdin, parser)
+    else:
+        commands = [args]
+    results = errors + run_commands(commands, resolver, args.deadline)
+    print_results(results, args.json)
+    return 0 if all(result.ok for result in results) else 1
@@ -0,0 +1,308 @@
+import array
+import bisect
+import csv
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from player import BlusoundPlayer, PlayerStatus
+
+DEFAULT_CAPACITY = 2048
+DEFAULT_MAX_PLAYERS = 64
+
+# Low to high; ASCII so it draws on any terminal.
+SPARK_LEVELS = '_.-:=+*#'
+STATE_MARKS = {'play': '>', 'stream': '>', 'pause': '|', 'stop': '.', 'connecting': '~'}
+
+
+@dataclass(slots=True, frozen=True)
+class HistorySample:
+    timestamp: float
+    volume: int
+    db: float
+    mute: bool
+    state: str
+    sync_stat: int
+    quality: int
+    title: str
+    artist: str
+    service: str
+
+
+SAMPLE_FIELDS = tuple(f.name for f in fields(HistorySample))
+# Typed array per numeric field; strings are stored as ids into a shared StringPool.
+_NUMERIC_COLUMNS = (('timestamp', 'd'), ('volume', 'h'), ('db', 'f'), ('mute', 'b'),
+                    ('sync_stat', 'q'), ('quality', 'q'))
+_STRING_COLUMNS = ('state', 'title', 'artist', 'service')
+
+
+def _tracked_values(status: PlayerStatus) -> Tuple:
+    # A new status is only stored when one of these changed.
+    return (status.volume, status.db, status.mute, status.state, status.sync_stat, status.quality,
+            status.name, status.artist, status.service)
+
+
+def _zeros(typecode: str, count: int) -> array.array:
+    return array.array(typecode, bytes(array.array(typecode).itemsize * count))
+
+
+class StringPool:
+    """Interns the strings referenced by history samples.
+
+    Ids are reference counted and reused once no sample refers to them, so
+    the pool never holds more strings than the ring buffers can reference.
+    Not thread-safe; StatusHistory guards it with its lock.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[Optional[str]] = []
+        self._refs = array.array('I')
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def acquire(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            if self._free:
+                index = self._free.pop()
+                self._strings[index] = value
+            else:
+                index = len(self._strings)
+                self._strings.append(value)
+                self._refs.append(0)
+            self._ids[value] = index
+        self._refs[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        self._refs[index] -= 1
+        if self._refs[index] == 0:
+            del self._ids[self._strings[index]]
+            self._strings[index] = None
+            self._free.append(index)
+
+    def get(self, index: int) -> str:
+        return self._strings[index]
+
+
+class PlayerHistory:
+    """Ring buffer of one player's samples with one preallocated typed array per field."""
+
+    def __init__(self, name: str, capacity: int, pool: StringPool):
+        self.name = name
+        self.capacity = capacity
+        self.dropped = 0
+        self._pool = pool
+        self._numeric = {column: _zeros(typecode, capacity) for column, typecode in _NUMERIC_COLUMNS}
+        self._strings = {column: _zeros('I', capacity) for column in _STRING_COLUMNS}
+        self._start = 0
+        self._count = 0
+        self._last: Optional[Tuple] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        columns = list(self._numeric.values()) + list(self._strings.values())
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def append(self, timestamp: float, status: PlayerStatus) -> bool:
+        values = _tracked_values(status)
+        if values == self._last:
+            return False
+        self._last = values
+        if self._count == self.capacity:
+            slot = self._start
+            for column in self._strings.values():
+                self._pool.release(column[slot])
+            self._start = (self._start + 1) % self.capacity
+            self.dropped += 1
+        else:
+            slot = (self._start + self._count) % self.capacity
+            self._count += 1
+        if self._count > 1:
+            # Keep timestamps sorted for range queries even if the wall clock steps back.
+            timestamp = max(timestamp, self._numeric['timestamp'][self._slot(self._count - 2)])
+        numeric = self._numeric
+        numeric['timestamp'][slot] = timestamp
+        numeric['volume'][slot] = status.volume
+        numeric['db'][slot] = status.db
+        numeric['mute'][slot] = status.mute
+        numeric['sync_stat'][slot] = status.sync_stat
+        numeric['quality'][slot] = status.quality
+        strings = self._strings
+        strings['state'][slot] = self._pool.acquire(status.state)
+        strings['title'][slot] = self._pool.acquire(status.name)
+        strings['artist'][slot] = self._pool.acquire(status.artist)
+        strings['service'][slot] = self._pool.acquire(status.service)
+        return True
+
+    def clear(self) -> None:
+        for index in range(self._count):
+            slot = self._slot(index)
+            for column in self._strings.values():
+                self._pool.release(column[slot])
+        self._start = self._count = 0
+        self._last = None
+
+    def samples(self, start: Optional[float] = None, end: Optional[float] = None) -> List[HistorySample]:
+        return [self._sample(self._slot(index)) for index in self._range(start, end)]
+
+    def series(self, column: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> List[Tuple[float, object]]:
+        """(timestamp, value) pairs of one field, without building whole samples."""
+        timestamps = self._numeric['timestamp']
+        slots = [self._slot(index) for index in self._range(start, end)]
+        if column in self._numeric:
+            values = self._numeric[column]
+            if column == 'mute':
+                return [(timestamps[slot], bool(values[slot])) for slot in slots]
+            return [(timestamps[slot], values[slot]) for slot in slots]
+        ids = self._strings[column]
+        return [(timestamps[slot], self._pool.get(ids[slot])) for slot in slots]
+
+    def _slot(self, index: int) -> int:
+        return (self._start + index) % self.capacity
+
+    def _range(self, start: Optional[float], end: Optional[float]) -> range:
+        timestamps = self._numeric['timestamp']
+        positions = range(self._count)
+        key = lambda index: timestamps[self._slot(index)]
+        low = 0 if start is None else bisect.bisect_left(positions, start, key=key)
+        high = self._count if end is None else bisect.bisect_right(positions, end, key=key)
+        return range(low, high)
+
+    def _sample(self, slot: int) -> HistorySample:
+        numeric, strings, get = self._numeric, self._strings, self._pool.get
+        return HistorySample(
+            timestamp=numeric['timestamp'][slot],
+            volume=numeric['volume'][slot],
+            db=round(numeric['db'][slot], 2),
+            mute=bool(numeric['mute'][slot]),
+            state=get(strings['state'][slot]),
+            sync_stat=numeric['sync_stat'][slot],
+            quality=numeric['quality'][slot],
+            title=get(strings['title'][slot]),
+            artist=get(strings['artist'][slot]),
+            service=get(strings['service'][slot]),
+        )
+
+
+class StatusHistory:
+    """Bounded status history for many players.
+
+    Subscribe `record` to a StatusWatcher. Each player keeps its last
+    `capacity` samples in preallocated arrays, and at most `max_players`
+    players are kept (the least recently updated goes first), so memory
+    stays flat however long the session runs. A sample is only stored when
+    volume, state, sync, quality, track or service changed.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, max_players: int = DEFAULT_MAX_PLAYERS):
+        self.capacity = capacity
+        self.max_players = max_players
+        self._players: 'OrderedDict[str, PlayerHistory]' = OrderedDict()
+        self._pool = StringPool()
+        self._lock = threading.Lock()
+
+    def record(self, player: BlusoundPlayer, status: PlayerStatus, timestamp: Optional[float] = None) -> bool:
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            history = self._players.get(player.address)
+            if history is None:
+                history = self._players[player.address] = PlayerHistory(player.name, self.capacity, self._pool)
+                while len(self._players) > self.max_players:
+                    _, evicted = self._players.popitem(last=False)
+                    evicted.clear()
+            self._players.move_to_end(player.address)
+            history.name = player.name
+            return history.append(timestamp, status)
+
+    def players(self) -> List[str]:
+        with self._lock:
+            return list(self._players)
+
+    def samples(self, player: str, start: Optional[float] = None,
+                end: Optional[float] = None) -> List[HistorySample]:
+        with self._lock:
+            history = self._players.get(player)
+            return history.samples(start, end) if history else []
+
+    def series(self, player: str, column: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> List[Tuple[float, object]]:
+        with self._lock:
+            history = self._players.get(player)
+            return history.series(column, start, end) if history else []
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "players": len(self._players),
+                "samples": sum(len(history) for history in self._players.values()),
+                "dropped": sum(history.dropped for history in self._players.values()),
+                "strings": len(self._pool),
+                "array_bytes": sum(history.nbytes for history in self._players.values()),
+            }
+
+    def snapshot(self, player: Optional[str] = None, start: Optional[float] = None,
+                 end: Optional[float] = None) -> List[Dict]:
+        with self._lock:
+            return [
+                {"player": address, "name": history.name, **asdict(sample)}
+                for address, history in self._players.items()
+                if player is None or address == player
+                for sample in history.samples(start, end)
+            ]
+
+    def to_json(self, player: Optional[str] = None, start: Optional[float] = None,
+                end: Optional[float] = None) -> str:
+        return json.dumps(self.snapshot(player, start, end), indent=2)
+
+    def to_csv(self, player: Optional[str] = None, start: Optional[float] = None,
+               end: Optional[float] = None) -> str:
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=('player', 'name') + SAMPLE_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.snapshot(player, start, end))
+        return out.getvalue()
+
+
+def timeline(points: Sequence[Tuple[float, object]], start: float, end: float, width: int) -> List[object]:
+    """Value in effect at the end of each of `width` equal slices of [start, end]; None before the first point."""
+    values: List[object] = []
+    index = 0
+    current = None
+    step = (end - start) / width if width else 0
+    for column in range(width):
+        bucket_end = start + step * (column + 1)
+        while index < len(points) and points[index][0] <= bucket_end:
+            current = points[index][1]
+            index += 1
+        values.append(current)
+    return values
+
+
+def sparkline(values: Sequence[Optional[float]], low: Optional[float] = None, high: Optional[float] = None) -> str:
+    known = [value for value in values if value is not None]
+    if not known:
+        return ' ' * len(values)
+    low = min(known) if low is None else low
+    high = max(known) if high is None else high
+    span = (high - low) or 1
+    top = len(SPARK_LEVELS) - 1
+    return ''.join(
+        ' ' if value is None else SPARK_LEVELS[max(0, min(top, round((value - low) / span * top)))]
+        for value in values
+    )
+
+
+def state_strip(values: Sequence[Optional[str]]) -> str:
+    return ''.join(' ' if value is None else STATE_MARKS.get(value, '?') for value in values)
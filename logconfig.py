@@ -0,0 +1,58 @@
+import atexit
+import logging
+import os
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+LOG_FILE = os.path.join('logs', 'cli.log')
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# HTTP response bodies are logged at DEBUG on this logger, and only when enabled.
+BODY_LOGGER = 'player.bodies'
+
+_listener: Optional['QueueListener'] = None
+
+
+def setup_logging(level: Union[int, str, None] = None, log_file: str = LOG_FILE,
+                  log_bodies: Optional[bool] = None) -> 'QueueListener':
+    """Send all log records through a queue to a rotating file written by a background thread.
+
+    Only the first call configures anything. `level` defaults to
+    $BLUCLI_LOG_LEVEL or INFO. Response bodies are logged (truncated to
+    player.BODY_LOG_LIMIT characters) only when `log_bodies` or
+    $BLUCLI_LOG_BODIES is set.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    # Imported here: logging.handlers pulls in socket, pickle and friends, which
+    # nothing needs until logging is actually configured.
+    import queue
+    from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+    if level is None:
+        level = os.environ.get('BLUCLI_LOG_LEVEL', 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    if log_bodies is None:
+        log_bodies = os.environ.get('BLUCLI_LOG_BODIES', '') not in ('', '0')
+
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    file_handler = RotatingFileHandler(log_file, maxBytes=1024*1024, backupCount=1)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    logging.getLogger(BODY_LOGGER).setLevel(logging.DEBUG if log_bodies else logging.WARNING)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
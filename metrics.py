@@ -0,0 +1,146 @@
+import json
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are interpolated within a bucket."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "bytes_received": self.bytes_received,
+            "p50": self.latency.percentile(50),
+            "p95": self.latency.percentile(95),
+            "p99": self.latency.percentile(99),
+            "max": self.latency.max,
+            "mean": self.latency.total / self.latency.count if self.latency.count else 0.0,
+        }
+
+
+class RequestMetrics:
+    """Per-player, per-endpoint request counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def record(self, player: str, endpoint: str, seconds: float, bytes_received: int = 0,
+               error: bool = False, timeout: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get((player, endpoint))
+            if stats is None:
+                stats = self._stats[(player, endpoint)] = EndpointStats()
+            stats.requests += 1
+            stats.bytes_received += bytes_received
+            if error:
+                stats.errors += 1
+            if timeout:
+                stats.timeouts += 1
+            stats.latency.observe(seconds)
+
+    def add_bytes(self, player: str, endpoint: str, bytes_received: int) -> None:
+        """Count body bytes of a streamed response once they have been read."""
+        with self._lock:
+            stats = self._stats.get((player, endpoint))
+            if stats is not None:
+                stats.bytes_received += bytes_received
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self, player: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            items = sorted(self._stats.items())
+            return [
+                {"player": key[0], "endpoint": key[1], **stats.as_dict()}
+                for key, stats in items
+                if player is None or key[0] == player
+            ]
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text format: each family's HELP and TYPE, followed by all of its samples."""
+        with self._lock:
+            items = [(f'player="{_escape(player)}",endpoint="{_escape(endpoint)}"', stats)
+                     for (player, endpoint), stats in sorted(self._stats.items())]
+            lines = []
+            for name, help_text, attr in _COUNTERS:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{{{labels}}} {getattr(stats, attr)}" for labels, stats in items)
+            name = "blucli_request_duration_seconds"
+            lines.append(f"# HELP {name} Request latency.")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, stats in items:
+                cumulative = 0
+                histogram = stats.latency
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# (name, help, EndpointStats attribute) of each counter family, in export order.
+_COUNTERS: Tuple[Tuple[str, str, str], ...] = (
+    ("blucli_requests_total", "Requests sent to BluOS players.", "requests"),
+    ("blucli_request_errors_total", "Failed requests, including timeouts.", "errors"),
+    ("blucli_request_timeouts_total", "Requests that timed out.", "timeouts"),
+    ("blucli_response_bytes_total", "Response bytes received.", "bytes_received"),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every player unless one is given its own.
+REQUEST_METRICS = RequestMetrics()
@@ -1,66 +1,235 @@
-import requests
-import xml.etree.ElementTree as ET
 import time
 import threading
+import queue
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import logging
-from logging.handlers import RotatingFileHandler
-from dataclasses import dataclass
-from zeroconf import ServiceBrowser, ServiceListener, Zeroconf
-from typing import List, Dict, Tuple, Optional, Union
-from dataclasses import dataclass, field
-import os
-import xml.etree.ElementTree as ET
-
-# Ensure logs directory exists
-os.makedirs('logs', exist_ok=True)
-
-# Set up logging
-log_file = 'logs/cli.log'
-log_handler = RotatingFileHandler(log_file, maxBytes=1024*1024, backupCount=1)
-log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                                  datefmt='%Y-%m-%d %H:%M:%S')
-log_handler.setFormatter(log_formatter)
+from lazyimport import LazyModule
+from metrics import REQUEST_METRICS, RequestMetrics
+from resilience import CircuitBreaker, RetryPolicy, failed_attempt
+from typing import Callable, Iterable, Iterator, List, Dict, Sequence, Tuple, Optional, Union
+from dataclasses import dataclass, field, fields
+
+# HTTP, XML and mDNS are imported on first use so importing this module stays cheap.
+requests = LazyModule('requests')
+ET = LazyModule('xml.etree.ElementTree')
+zeroconf = LazyModule('zeroconf')
+
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.addHandler(log_handler)
+# Response bodies go to a separate logger so they can be enabled on their own (see logconfig).
+body_logger = logging.getLogger(f"{__name__}.bodies")
+BODY_LOG_LIMIT = 2048
 
-@dataclass
+# (connect, read) timeouts in seconds, keyed by endpoint path.
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 10.0)
+ENDPOINT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    '/Status': (3.05, 10.0),
+    '/Browse': (3.05, 15.0),
+    '/Volume': (3.05, 5.0),
+    '/Pause': (3.05, 5.0),
+    '/Skip': (3.05, 5.0),
+    '/Back': (3.05, 5.0),
+    '/Play': (3.05, 5.0),
+    '/SyncStatus': (3.05, 5.0),
+}
+# Extra read time allowed on top of the server-side long-poll timeout.
+LONG_POLL_MARGIN = 5.0
+
+# Endpoints that are safe to send twice; only these are retried or hedged.
+IDEMPOTENT_ENDPOINTS = frozenset(('/Status', '/Browse', '/SyncStatus'))
+DEFAULT_RETRY_POLICY = RetryPolicy()
+# Short timeouts for the background probe of a player whose circuit is open.
+PROBE_TIMEOUT: Tuple[float, float] = (1.0, 2.0)
+
+_sessions: Dict[str, 'requests.Session'] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(base_url: str) -> 'requests.Session':
+    """Return the shared keep-alive session for a player, creating it on first use."""
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=8)
+            session.mount('http://', adapter)
+            _sessions[base_url] = session
+        return session
+
+def close_session(base_url: str) -> None:
+    """Close and forget the session for one player, e.g. the address it moved away from."""
+    with _sessions_lock:
+        session = _sessions.pop(base_url, None)
+    if session is not None:
+        session.close()
+
+def close_sessions() -> None:
+    """Close every player session; call on shutdown."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by every client of the player at `base_url`."""
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if breaker is None:
+            breaker = _breakers[base_url] = CircuitBreaker(base_url, probe=lambda: _probe(base_url))
+        return breaker
+
+def _probe(base_url: str) -> bool:
+    try:
+        response = get_session(base_url).get(f"{base_url}/Status", timeout=PROBE_TIMEOUT)
+        return response.status_code < 500
+    except requests.RequestException:
+        return False
+
+def _is_unreachable(error: Exception) -> bool:
+    """True for failures that suggest the player is offline; these count towards opening its circuit."""
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def _is_retryable(error: Exception) -> bool:
+    """True for failures that say the player is unreachable or overloaded, not that the request was wrong."""
+    if _is_unreachable(error):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code >= 500
+
+def _text(value: Optional[str]) -> str:
+    return value or ''
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+def _float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+def _flag(value: Optional[str]) -> bool:
+    return _int(value) == 1
+
+def _true(value: Optional[str]) -> bool:
+    return value == 'true'
+
+_DEFAULT_CONVERTERS: Dict[type, Callable[[Optional[str]], object]] = {
+    str: _text, int: _int, float: _float, bool: _flag,
+}
+
+def _xml(tag: str, default, convert: Optional[Callable[[Optional[str]], object]] = None):
+    """Declare a PlayerStatus field filled from the /Status child element `tag`."""
+    return field(default=default, metadata={'xml': tag, 'convert': convert})
+
+@dataclass(slots=True)
 class PlayerStatus:
     etag: str = ''
-    album: str = ''
-    artist: str = ''
-    name: str = ''
-    state: str = ''
-    volume: int = 0
-    service: str = ''
-    inputId: str = ''
-    can_move_playback: bool = False
-    can_seek: bool = False
-    cursor: int = 0
-    db: float = 0.0
-    fn: str = ''
-    image: str = ''
-    indexing: int = 0
-    mid: int = 0
-    mode: int = 0
-    mute: bool = False
-    pid: int = 0
-    prid: int = 0
-    quality: int = 0
-    repeat: int = 0
-    service_icon: str = ''
-    service_name: str = ''
-    shuffle: bool = False
-    sid: int = 0
-    sleep: str = ''
-    song: int = 0
-    stream_format: str = ''
-    sync_stat: int = 0
-    title1: str = ''
-    title2: str = ''
-    title3: str = ''
-    totlen: int = 0
-    secs: int = 0
+    album: str = _xml('album', '')
+    artist: str = _xml('artist', '')
+    name: str = _xml('title1', '')
+    state: str = _xml('state', '')
+    volume: int = _xml('volume', 0)
+    service: str = _xml('service', '')
+    inputId: str = _xml('inputId', '')
+    can_move_playback: bool = _xml('canMovePlayback', False, _true)
+    can_seek: bool = _xml('canSeek', False)
+    cursor: int = _xml('cursor', 0)
+    db: float = _xml('db', 0.0)
+    fn: str = _xml('fn', '')
+    image: str = _xml('image', '')
+    indexing: int = _xml('indexing', 0)
+    mid: int = _xml('mid', 0)
+    mode: int = _xml('mode', 0)
+    mute: bool = _xml('mute', False)
+    pid: int = _xml('pid', 0)
+    prid: int = _xml('prid', 0)
+    quality: int = _xml('quality', 0)
+    repeat: int = _xml('repeat', 0)
+    service_icon: str = _xml('serviceIcon', '')
+    service_name: str = _xml('serviceName', '')
+    shuffle: bool = _xml('shuffle', False)
+    sid: int = _xml('sid', 0)
+    sleep: str = _xml('sleep', '')
+    song: int = _xml('song', 0)
+    stream_format: str = _xml('streamFormat', '')
+    sync_stat: int = _xml('syncStat', 0)
+    title1: str = _xml('title1', '')
+    title2: str = _xml('title2', '')
+    title3: str = _xml('title3', '')
+    totlen: int = _xml('totlen', 0)
+    secs: int = _xml('secs', 0)
+
+def _build_status_table() -> Dict[str, Tuple[Tuple[str, Callable[[Optional[str]], object]], ...]]:
+    table: Dict[str, List[Tuple[str, Callable[[Optional[str]], object]]]] = {}
+    for status_field in fields(PlayerStatus):
+        tag = status_field.metadata.get('xml')
+        if tag is None:
+            continue
+        convert = status_field.metadata['convert'] or _DEFAULT_CONVERTERS[status_field.type]
+        table.setdefault(tag, []).append((status_field.name, convert))
+    return {tag: tuple(targets) for tag, targets in table.items()}
+
+# /Status child tag -> ((PlayerStatus attribute, converter), ...), derived from the field declarations.
+STATUS_FIELDS = _build_status_table()
+
+# Kinds of StatusChange events
+TRACK_CHANGED = 'track'
+VOLUME_CHANGED = 'volume'
+STATE_CHANGED = 'state'
+SYNC_CHANGED = 'sync_stat'
+SOURCE_CHANGED = 'source'
+PROGRESS_CHANGED = 'progress'
+MODE_CHANGED = 'mode'
+
+CHANGE_KINDS: Dict[str, str] = {
+    'album': TRACK_CHANGED, 'artist': TRACK_CHANGED, 'name': TRACK_CHANGED,
+    'title1': TRACK_CHANGED, 'title2': TRACK_CHANGED, 'title3': TRACK_CHANGED,
+    'song': TRACK_CHANGED, 'fn': TRACK_CHANGED, 'image': TRACK_CHANGED,
+    'totlen': TRACK_CHANGED, 'pid': TRACK_CHANGED, 'prid': TRACK_CHANGED,
+    'cursor': TRACK_CHANGED, 'can_seek': TRACK_CHANGED, 'can_move_playback': TRACK_CHANGED,
+    'volume': VOLUME_CHANGED, 'db': VOLUME_CHANGED, 'mute': VOLUME_CHANGED,
+    'state': STATE_CHANGED,
+    'sync_stat': SYNC_CHANGED,
+    'service': SOURCE_CHANGED, 'inputId': SOURCE_CHANGED, 'service_name': SOURCE_CHANGED,
+    'service_icon': SOURCE_CHANGED, 'stream_format': SOURCE_CHANGED, 'quality': SOURCE_CHANGED,
+    'sid': SOURCE_CHANGED, 'mid': SOURCE_CHANGED,
+    'secs': PROGRESS_CHANGED,
+    'repeat': MODE_CHANGED, 'shuffle': MODE_CHANGED, 'mode': MODE_CHANGED,
+    'sleep': MODE_CHANGED, 'indexing': MODE_CHANGED,
+}
+_DIFF_FIELDS = tuple(f.name for f in fields(PlayerStatus) if f.name in CHANGE_KINDS)
+
+@dataclass(slots=True)
+class StatusChange:
+    kind: str
+    # field name -> (old value, new value); old is None for the first status seen
+    changed: Dict[str, Tuple[object, object]]
+    status: PlayerStatus
+
+def diff_status(old: Optional[PlayerStatus], new: PlayerStatus) -> Dict[str, Tuple[object, object]]:
+    """Return the fields that differ between two statuses (every field if `old` is None)."""
+    if old is None:
+        return {name: (None, getattr(new, name)) for name in _DIFF_FIELDS}
+    diff = {}
+    for name in _DIFF_FIELDS:
+        old_value = getattr(old, name)
+        new_value = getattr(new, name)
+        if old_value != new_value:
+            diff[name] = (old_value, new_value)
+    return diff
+
+def status_changes(old: Optional[PlayerStatus], new: PlayerStatus) -> List[StatusChange]:
+    """Group the field-level diff between two statuses into one StatusChange per kind."""
+    grouped: Dict[str, Dict[str, Tuple[object, object]]] = {}
+    for name, values in diff_status(old, new).items():
+        grouped.setdefault(CHANGE_KINDS[name], {})[name] = values
+    return [StatusChange(kind, changed, new) for kind, changed in grouped.items()]
 
 @dataclass
 class PlayerSource:
@@ -70,45 +239,274 @@ class PlayerSource:
     play_url: Optional[str]
     input_type: Optional[str]
     type: str
-    children: List['PlayerSource'] = field(default_factory=list)
+    children: Sequence['PlayerSource'] = field(default_factory=list)
+
+def parse_status(xml_text: str) -> PlayerStatus:
+    """Build a PlayerStatus from the XML body of a /Status response in one pass over its children."""
+    root = ET.fromstring(xml_text)
+    values = {}
+    status_fields = STATUS_FIELDS
+    for child in root:
+        targets = status_fields.get(child.tag)
+        if targets is not None:
+            for attr, convert in targets:
+                values[attr] = convert(child.text)
+    return PlayerStatus(etag=root.get('etag', ''), **values)
+
+@dataclass
+class BrowsePage:
+    items: List[PlayerSource]
+    # Key for the next page of the same container, if the server truncated this one.
+    next_key: Optional[str] = None
+
+def source_from_element(item: 'ET.Element') -> PlayerSource:
+    return PlayerSource(
+        text=item.get('text', ''),
+        image=item.get('image', ''),
+        browse_key=item.get('browseKey'),
+        play_url=item.get('playURL'),
+        input_type=item.get('inputType'),
+        type=item.get('type', '')
+    )
+
+def parse_browse_page(chunks: Iterable[Union[str, bytes]]) -> BrowsePage:
+    """Incrementally parse one /Browse response fed in chunks.
+
+    Only top-level <item> elements are collected, and each is discarded as soon
+    as it has been converted, so large pages never build a full element tree.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    page = BrowsePage(items=[])
+    root = None
+    depth = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = element
+                    page.next_key = element.get('nextKey')
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and element.tag == 'item':
+                page.items.append(source_from_element(element))
+                root.remove(element)
+    parser.close()
+    return page
+
+def parse_sources(xml_text: str) -> List[PlayerSource]:
+    """Build the list of PlayerSource items from the XML body of a /Browse response."""
+    return parse_browse_page([xml_text]).items
+
+BROWSE_CHUNK_SIZE = 16 * 1024
+
+def endpoint_label(url: str, params: Optional[Dict] = None) -> str:
+    """Metrics label for a request: its path, with long-polls kept apart from plain /Status calls."""
+    path = url.split('?', 1)[0]
+    if params and 'timeout' in params and 'etag' in params:
+        return f"{path} long-poll"
+    return path
+
+def volume_params(volume: Optional[int] = None, db: Optional[float] = None,
+                  tell_slaves: Optional[bool] = None) -> Dict[str, Union[int, float]]:
+    params: Dict[str, Union[int, float]] = {}
+    if volume is not None:
+        params['level'] = volume
+    if db is not None:
+        params['db'] = db
+    if tell_slaves is not None:
+        params['tell_slaves'] = int(tell_slaves)
+    return params
+
+def parse_volume_level(xml_text: str) -> Optional[int]:
+    """Level from a /Volume response (`<volume db="-20" mute="0">40</volume>`), or None if it has none."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError:
+        return None
+    if root.tag != 'volume' or not (root.text or '').strip():
+        return None
+    return _int(root.text.strip())
+
+# Lifecycle of BlusoundPlayer.sources
+SOURCES_PENDING = 'pending'
+SOURCES_LOADING = 'loading'
+SOURCES_READY = 'ready'
+SOURCES_FAILED = 'failed'
+
+# Loads /Browse for discovered players so the zeroconf callback thread never blocks on HTTP.
+_source_loader = ThreadPoolExecutor(max_workers=4, thread_name_prefix='sources')
+
 
 class BlusoundPlayer:
-    def __init__(self, host_name, name):
+    def __init__(self, host_name, name, port: int = 11000,
+                 timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+                 initialize: bool = True):
         self.host_name = host_name
         self.name = name
-        self.base_url = f"http://{self.host_name}:11000"
+        self.port = port
+        self.address = f"{self.host_name}:{port}"
+        self.base_url = f"http://{self.address}"
+        # mDNS service name and MAC address, when discovery has reported them.
+        self.service_name: Optional[str] = None
+        self.mac: Optional[str] = None
         self.sources: List[PlayerSource] = []
+        self.sources_state: str = SOURCES_PENDING
+        self.metrics: RequestMetrics = REQUEST_METRICS
+        # Optional cache.BrowseCache consulted by capture_sources.
+        self.browse_cache = None
+        # True until live discovery confirms a player restored from the warm-start cache.
+        self.from_cache: bool = False
+        self._sources_lock = threading.Lock()
+        self.timeouts: Dict[str, Tuple[float, float]] = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY
+        # Send a second /Status if the first has not answered after this many seconds; None disables hedging.
+        self.hedge_status_after: Optional[float] = None
+        self.hedges_sent = 0
+        # Runs both copies of a hedged /Status request. Per player, so one slow
+        # player's stragglers never delay the hedges another player sends.
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
         logger.info(f"Initialized BlusoundPlayer: {self.name} at {self.host_name}")
-        self.initialize_sources()
+        if initialize:
+            self.load_sources()
+
+    @property
+    def session(self) -> 'requests.Session':
+        # Looked up per request so players restored from a cache cost nothing until they are used.
+        return get_session(self.base_url)
+
+    @property
+    def circuit(self) -> CircuitBreaker:
+        return get_breaker(self.base_url)
+
+    def move(self, host_name: str, port: int) -> None:
+        """Point this handle at a new address, e.g. after the player got a new DHCP lease."""
+        previous = self.base_url
+        self.host_name = host_name
+        self.port = port
+        self.address = f"{host_name}:{port}"
+        self.base_url = f"http://{self.address}"
+        if previous != self.base_url:
+            close_session(previous)
+
+    def request(self, url: str, params: Optional[Dict] = None,
+                timeout: Optional[Tuple[float, float]] = None, stream: bool = False,
+                deadline: Optional[float] = None, idempotent: Optional[bool] = None) -> 'requests.Response':
+        """Send a GET to the player, failing fast while its circuit is open.
 
-    def request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        Idempotent requests (by default those to IDEMPOTENT_ENDPOINTS) are
+        retried on connection errors, timeouts and 5xx responses with jittered
+        exponential backoff. `deadline` bounds the whole call, retries
+        included, in seconds; each attempt's timeouts are cut to what is left.
+        """
+        endpoint = url.split('?', 1)[0]
+        if timeout is None:
+            timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        if idempotent is None:
+            idempotent = endpoint in IDEMPOTENT_ENDPOINTS
+        attempts = self.retry_policy.attempts if idempotent else 1
+        expires = time.monotonic() + deadline if deadline is not None else None
+        breaker = self.circuit
+        label = endpoint_label(url, params)
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise requests.ConnectionError(f"{self.name} is unreachable (circuit {breaker.state}, "
+                                               f"next check in {breaker.retry_in:.0f}s)")
+            attempt_timeout = timeout
+            if expires is not None:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Deadline of {deadline}s exceeded for {label} on {self.name}")
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+            try:
+                response = self._send(url, params, attempt_timeout, stream, label)
+            except requests.RequestException as e:
+                remaining = expires - time.monotonic() if expires is not None else None
+                delay = failed_attempt(breaker, self.retry_policy, attempt, attempts,
+                                       _is_unreachable(e), _is_retryable(e), remaining)
+                if delay is None:
+                    raise
+                logger.info(f"Retrying {label} on {self.name} in {delay:.2f}s after: {e}")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            if self.from_cache:
+                # A player answering HTTP is live even if mDNS has not reported it yet.
+                self.from_cache = False
+                logger.info(f"Confirmed cached player {self.name} by HTTP")
+            return response
+
+    def _send(self, url: str, params: Optional[Dict], timeout: Tuple[float, float], stream: bool,
+              label: str) -> 'requests.Response':
         full_url = f"{self.base_url}{url}"
-        logger.info(f"Sending request to: {full_url}")
-        logger.info(f"Request params: {params}")
-        response = requests.get(full_url, params=params)
-        logger.info(f"Response status code: {response.status_code}")
-        logger.info(f"Response content: {response.text}")
+        logger.debug("Sending request to: %s params: %s", full_url, params)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(full_url, params=params, timeout=timeout, stream=stream)
+        except requests.Timeout:
+            self.metrics.record(self.address, label, time.perf_counter() - started, error=True, timeout=True)
+            raise
+        except requests.RequestException:
+            self.metrics.record(self.address, label, time.perf_counter() - started, error=True)
+            raise
+        # A streamed body is not read yet; its reader counts the bytes with metrics.add_bytes.
+        received = 0 if stream else len(response.content)
+        self.metrics.record(self.address, label, time.perf_counter() - started, received,
+                            error=not response.ok)
+        logger.debug("Response status code: %s", response.status_code)
+        if not stream and body_logger.isEnabledFor(logging.DEBUG):
+            body_logger.debug("Response content: %s", response.text[:BODY_LOG_LIMIT])
+        if stream and not response.ok:
+            # Release the connection; nobody will read the body of an error.
+            response.close()
         response.raise_for_status()
         return response
 
-    def capture_sources(self, browse_key: Optional[str] = None) -> List[PlayerSource]:
-        url = "/Browse"
+    def fetch_browse_page(self, browse_key: Optional[str] = None) -> BrowsePage:
         params = {"key": browse_key} if browse_key else None
+        response = self.request("/Browse", params, stream=True)
+        received = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size=BROWSE_CHUNK_SIZE):
+                received += len(chunk)
+                yield chunk
+
         try:
-            response = self.request(url, params)
-            root = ET.fromstring(response.text)
-            sources = []
-            for item in root.findall('item'):
-                source = PlayerSource(
-                    text=item.get('text', ''),
-                    image=item.get('image', ''),
-                    browse_key=item.get('browseKey'),
-                    play_url=item.get('playURL'),
-                    input_type=item.get('inputType'),
-                    type=item.get('type', '')
-                )
-                sources.append(source)
-            logger.info(f"Captured {len(sources)} sources for {self.name}")
+            return parse_browse_page(chunks())
+        finally:
+            response.close()
+            # Chunked responses have no Content-Length; count what was actually read.
+            self.metrics.add_bytes(self.address, endpoint_label("/Browse", params), received)
+
+    def iter_source_pages(self, browse_key: Optional[str] = None) -> Iterator[List[PlayerSource]]:
+        """Yield a container's items one server page at a time, following nextKey."""
+        seen_keys = set()
+        key = browse_key
+        while True:
+            page = self.fetch_browse_page(key)
+            yield page.items
+            if not page.next_key or page.next_key in seen_keys:
+                return
+            seen_keys.add(page.next_key)
+            key = page.next_key
+
+    def capture_sources(self, browse_key: Optional[str] = None, use_cache: bool = True) -> List[PlayerSource]:
+        cache = self.browse_cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(self.base_url, browse_key or '')
+            if cached is not None:
+                return cached
+        try:
+            sources = [source for page in self.iter_source_pages(browse_key) for source in page]
+            logger.debug("Captured %d sources for %s", len(sources), self.name)
+            if cache is not None and sources:
+                cache.put(self.base_url, browse_key or '', sources)
             return sources
         except requests.RequestException as e:
             logger.error(f"Error capturing sources for {self.name}: {str(e)}")
@@ -122,15 +520,59 @@ class BlusoundPlayer:
             else:
                 logger.warning(f"No nested sources found for {source.text}")
 
+    @property
+    def sources_ready(self) -> bool:
+        return self.sources_state == SOURCES_READY
+
+    def load_sources(self) -> None:
+        """Load the top-level sources unless another thread already has."""
+        with self._sources_lock:
+            if self.sources_state == SOURCES_READY:
+                return
+            self.initialize_sources()
+
+    def load_sources_in_background(self) -> None:
+        """Queue a source load on the shared worker pool if one is still needed."""
+        if self.sources_state in (SOURCES_PENDING, SOURCES_FAILED):
+            self.sources_state = SOURCES_LOADING
+            _source_loader.submit(self.load_sources)
+
+    def refresh_sources(self) -> None:
+        """Re-fetch the top-level sources, keeping the current ones if the player gives none.
+
+        Cached browse results for this player are dropped first, since the menus
+        behind them may have changed along with the sources.
+        """
+        with self._sources_lock:
+            self.invalidate_browse_cache()
+            sources = self.capture_sources(use_cache=False)
+            if sources:
+                self.sources = sources
+                self.sources_state = SOURCES_READY
+            elif not self.sources:
+                self.sources_state = SOURCES_FAILED
+
+    def invalidate_browse_cache(self) -> None:
+        if self.browse_cache is not None:
+            self.browse_cache.invalidate(self.base_url)
+
+    def refresh_sources_in_background(self) -> None:
+        _source_loader.submit(self.refresh_sources)
+
     def initialize_sources(self) -> None:
+        self.sources_state = SOURCES_LOADING
         self.sources = self.capture_sources()
-        if not self.sources:
-            logger.warning(f"No sources found for {self.name}. Retrying...")
-            time.sleep(1)  # Wait for a second before retrying
+        if not self.sources and not self.circuit.is_open:
+            # Request failures were already retried; a player that is still booting can answer with an empty menu.
+            delay = self.retry_policy.backoff(self.retry_policy.attempts)
+            logger.warning(f"No sources found for {self.name}. Retrying in {delay:.2f}s...")
+            time.sleep(delay)
             self.sources = self.capture_sources()
+        self.sources_state = SOURCES_READY if self.sources else SOURCES_FAILED
         logger.info(f"Initialized {len(self.sources)} sources for {self.name}")
 
-    def get_status(self, timeout: Optional[int] = None, etag: Optional[str] = None) -> Tuple[bool, Union[PlayerStatus, str]]:
+    def get_status(self, timeout: Optional[int] = None, etag: Optional[str] = None,
+                   deadline: Optional[float] = None) -> Tuple[bool, Union[PlayerStatus, str]]:
         url = "/Status"
         params = {}
         if timeout:
@@ -138,74 +580,84 @@ class BlusoundPlayer:
         if etag:
             params['etag'] = etag
 
-        logger.debug(f"Getting status for {self.name}")
+        # A long-poll holds the response for up to `timeout` seconds, so the
+        # read timeout has to outlast it.
+        connect_timeout, read_timeout = self.timeouts.get(url, DEFAULT_TIMEOUT)
+        if timeout:
+            read_timeout = max(read_timeout, timeout + LONG_POLL_MARGIN)
+
+        logger.debug("Getting status for %s", self.name)
         try:
-            response = self.request(url, params)
-            root = ET.fromstring(response.text)
-            
-            def safe_find(element, tag, default=''):
-                found = element.find(tag)
-                return found.text if found is not None else default
-
-            def safe_int(value, default=0):
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    return default
-
-            status = PlayerStatus(
-                etag=root.get('etag', ''),
-                album=safe_find(root, 'album'),
-                artist=safe_find(root, 'artist'),
-                name=safe_find(root, 'title1'),
-                state=safe_find(root, 'state'),
-                volume=safe_int(safe_find(root, 'volume')),
-                service=safe_find(root, 'service'),
-                inputId=safe_find(root, 'inputId'),
-                can_move_playback=safe_find(root, 'canMovePlayback') == 'true',
-                can_seek=safe_int(safe_find(root, 'canSeek')) == 1,
-                cursor=safe_int(safe_find(root, 'cursor')),
-                db=float(safe_find(root, 'db', '0')),
-                fn=safe_find(root, 'fn'),
-                image=safe_find(root, 'image'),
-                indexing=safe_int(safe_find(root, 'indexing')),
-                mid=safe_int(safe_find(root, 'mid')),
-                mode=safe_int(safe_find(root, 'mode')),
-                mute=safe_int(safe_find(root, 'mute')) == 1,
-                pid=safe_int(safe_find(root, 'pid')),
-                prid=safe_int(safe_find(root, 'prid')),
-                quality=safe_int(safe_find(root, 'quality')),
-                repeat=safe_int(safe_find(root, 'repeat')),
-                service_icon=safe_find(root, 'serviceIcon'),
-                service_name=safe_find(root, 'serviceName'),
-                shuffle=safe_int(safe_find(root, 'shuffle')) == 1,
-                sid=safe_int(safe_find(root, 'sid')),
-                sleep=safe_find(root, 'sleep'),
-                song=safe_int(safe_find(root, 'song')),
-                stream_format=safe_find(root, 'streamFormat'),
-                sync_stat=safe_int(safe_find(root, 'syncStat')),
-                title1=safe_find(root, 'title1'),
-                title2=safe_find(root, 'title2'),
-                title3=safe_find(root, 'title3'),
-                totlen=safe_int(safe_find(root, 'totlen')),
-                secs=safe_int(safe_find(root, 'secs'))
-            )
-            logger.info(f"Status for {self.name}: {status}")
+            if self.hedge_status_after is not None and not timeout:
+                response = self._hedged_request(url, params, (connect_timeout, read_timeout), deadline)
+            else:
+                response = self.request(url, params, timeout=(connect_timeout, read_timeout), deadline=deadline)
+            status = parse_status(response.text)
+            logger.debug("Status for %s: %s", self.name, status)
             return True, status
         except requests.RequestException as e:
             logger.error(f"Error getting status for {self.name}: {str(e)}")
             return False, str(e)
 
-    def set_volume(self, volume: int) -> Tuple[bool, str]:
+    def get_sync_status(self, deadline: Optional[float] = None) -> Tuple[bool, Union['SyncStatus', str]]:
+        logger.debug("Getting sync status for %s", self.name)
+        try:
+            response = self.request("/SyncStatus", deadline=deadline)
+            sync = parse_sync_status(response.text)
+            if sync.mac and not self.mac:
+                self.mac = sync.mac
+            return True, sync
+        except (requests.RequestException, ET.ParseError) as e:
+            logger.error(f"Error getting sync status for {self.name}: {str(e)}")
+            return False, str(e)
+
+    def _hedged_request(self, url: str, params: Optional[Dict], timeout: Tuple[float, float],
+                        deadline: Optional[float]) -> 'requests.Response':
+        """Send the request, and a duplicate if it is still unanswered after `hedge_status_after`.
+
+        The first successful response wins; the slower request finishes in the background.
+        """
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                # Room for a straggler from the previous call plus both copies of this one.
+                self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f'hedge-{self.address}')
+            pool = self._hedge_pool
+        first = pool.submit(self.request, url, params, timeout, False, deadline)
+        try:
+            return first.result(timeout=self.hedge_status_after)
+        except FutureTimeoutError:
+            pass
+        with self._hedge_lock:
+            self.hedges_sent += 1
+        logger.debug("Hedging %s on %s after %.3fs", url, self.name, self.hedge_status_after)
+        second = pool.submit(self.request, url, params, timeout, False, deadline)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return first.result()
+
+    def set_volume(self, volume: Optional[int] = None, db: Optional[float] = None,
+                   tell_slaves: Optional[bool] = None) -> Tuple[bool, str]:
+        """Set the absolute `volume` level (0-100) or change it by `db` decibels."""
+        success, message, _ = self.change_volume(volume, db, tell_slaves)
+        return success, message
+
+    def change_volume(self, volume: Optional[int] = None, db: Optional[float] = None,
+                      tell_slaves: Optional[bool] = None) -> Tuple[bool, str, Optional[int]]:
+        """Like set_volume, but also returns the level the player reports it ended up at, if it says."""
         url = "/Volume"
-        params = {'level': volume}
-        logger.info(f"Setting volume for {self.name} to {volume}")
+        params = volume_params(volume, db, tell_slaves)
+        logger.info(f"Setting volume for {self.name}: {params}")
         try:
-            self.request(url, params)
-            return True, "Volume set successfully"
+            # An absolute level can safely be sent twice; a relative dB step cannot.
+            response = self.request(url, params, idempotent=db is None)
+            return True, "Volume set successfully", parse_volume_level(response.text)
         except requests.RequestException as e:
             logger.error(f"Error setting volume for {self.name}: {str(e)}")
-            return False, str(e)
+            return False, str(e), None
 
     def toggle_play_pause(self) -> Tuple[bool, str]:
         url = "/Pause"
@@ -218,6 +670,26 @@ class BlusoundPlayer:
             logger.error(f"Error toggling play/pause for {self.name}: {str(e)}")
             return False, str(e)
 
+    def play(self) -> Tuple[bool, str]:
+        url = "/Play"
+        logger.info(f"Starting playback on {self.name}")
+        try:
+            self.request(url)
+            return True, "Playback started successfully"
+        except requests.RequestException as e:
+            logger.error(f"Error starting playback on {self.name}: {str(e)}")
+            return False, str(e)
+
+    def pause(self) -> Tuple[bool, str]:
+        url = "/Pause"
+        logger.info(f"Pausing {self.name}")
+        try:
+            self.request(url)
+            return True, "Playback paused successfully"
+        except requests.RequestException as e:
+            logger.error(f"Error pausing {self.name}: {str(e)}")
+            return False, str(e)
+
     def skip(self) -> Tuple[bool, str]:
         url = "/Skip"
         logger.info(f"Skipping track on {self.name}")
@@ -250,45 +722,932 @@ class BlusoundPlayer:
 
         try:
             self.request(url, params if source.browse_key else None)
+            # Selecting a source can add to presets and recently played lists.
+            self.invalidate_browse_cache()
             return True, f"{source.text} selected successfully"
         except requests.RequestException as e:
             logger.error(f"Error selecting source for {self.name}: {str(e)}")
             return False, str(e)
 
-class MyListener(ServiceListener):
-    def __init__(self):
-        self.players = []
+class SourcePager:
+    """Sequence view of a browse container that fetches server pages on demand.
+
+    Only the items loaded so far are visible; call `ensure` with the number of
+    items a view needs. Fully loaded containers are stored in the player's
+    browse cache, and a cached container is served without any request.
+    """
+
+    def __init__(self, player: 'BlusoundPlayer', browse_key: str):
+        self.player = player
+        self.browse_key = browse_key
+        self.items: List[PlayerSource] = []
+        self.complete = False
+        self.error: Optional[str] = None
+        self._pages: Optional[Iterator[List[PlayerSource]]] = None
+        cache = player.browse_cache
+        cached = cache.get(player.base_url, browse_key) if cache is not None else None
+        if cached is not None:
+            self.items = cached
+            self.complete = True
+        else:
+            self._pages = player.iter_source_pages(browse_key)
+
+    def ensure(self, count: int) -> None:
+        while not self.complete and len(self.items) < count:
+            try:
+                self.items.extend(next(self._pages))
+            except StopIteration:
+                self.complete = True
+                if self.player.browse_cache is not None and self.items:
+                    self.player.browse_cache.put(self.player.base_url, self.browse_key, self.items)
+            except requests.RequestException as e:
+                logger.error(f"Error browsing {self.browse_key} on {self.player.name}: {str(e)}")
+                self.error = str(e)
+                self.complete = True
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self) -> Iterator[PlayerSource]:
+        return iter(self.items)
+
+class SourcePrefetcher:
+    """Speculatively loads the children of the highlighted browse entry and its neighbours.
+
+    Work runs on a small bounded pool. Each `focus` call cancels queued loads
+    for entries that are no longer near the cursor; loads already running are
+    left to finish and still fill `PlayerSource.children`.
+    """
+
+    def __init__(self, player: 'BlusoundPlayer', max_workers: int = 2, neighbours: int = 1):
+        self.player = player
+        self.neighbours = neighbours
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[PlayerSource, Future]] = {}
+
+    def focus(self, sources: Sequence[PlayerSource], index: int, page_size: int) -> None:
+        first = max(0, index - self.neighbours)
+        last = min(len(sources), index + self.neighbours + 1)
+        targets = {id(source): source for source in (sources[i] for i in range(first, last))
+                   if source.browse_key and not source.children}
+        with self._lock:
+            for key, (source, future) in list(self._pending.items()):
+                if future.done() or (key not in targets and future.cancel()):
+                    del self._pending[key]
+            for key, source in targets.items():
+                if key not in self._pending:
+                    future = self._executor.submit(self._load, source, page_size)
+                    self._pending[key] = (source, future)
+
+    def wait(self, source: PlayerSource, timeout: Optional[float] = None) -> None:
+        """Block until an in-flight load for `source` finishes, so it is not fetched twice."""
+        with self._lock:
+            entry = self._pending.get(id(source))
+        if entry is not None and entry[0] is source:
+            try:
+                entry[1].result(timeout)
+            except (FutureTimeoutError, CancelledError):
+                pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for _, future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, source: PlayerSource, page_size: int) -> None:
+        if source.children:
+            return
+        pager = SourcePager(self.player, source.browse_key)
+        pager.ensure(page_size)
+        if pager:
+            source.children = pager
+            logger.debug(f"Prefetched {len(pager)} sources under {source.text}")
+
+class VolumeController:
+    """Coalesces rapid volume changes for one player.
+
+    `set`, `adjust` and `adjust_db` update a local target at once and return.
+    At most one /Volume request is in flight; when it finishes, the latest
+    target is sent rather than every intermediate step. With `ramp_step`
+    set, large jumps are sent in steps of that size `ramp_interval` seconds
+    apart. `on_result(success, message)` is called from the worker thread.
+    """
+
+    def __init__(self, player: 'BlusoundPlayer', tell_slaves: Optional[bool] = None,
+                 ramp_step: Optional[int] = None, ramp_interval: float = 0.05,
+                 on_result: Optional[Callable[[bool, str], None]] = None):
+        self.player = player
+        self.tell_slaves = tell_slaves
+        self.ramp_step = ramp_step
+        self.ramp_interval = ramp_interval
+        self.on_result = on_result
+        self._lock = threading.Lock()
+        # Last level the player reported or acknowledged.
+        self.level: Optional[int] = None
+        self.target: Optional[int] = None
+        self._pending_db = 0.0
+        self._sending = False
+        self.requests_sent = 0
+        self.changes_coalesced = 0
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return self._sending or bool(self._pending_db) or (
+                self.target is not None and self.target != self.level)
+
+    def observe(self, status: PlayerStatus) -> None:
+        """Record the level reported by the player; the target follows it while idle."""
+        with self._lock:
+            idle = not self._sending and (self.target is None or self.target == self.level)
+            self.level = status.volume
+            if idle:
+                self.target = status.volume
+
+    def set(self, level: int) -> int:
+        with self._lock:
+            self.target = max(0, min(100, level))
+            target = self.target
+        self._kick()
+        return target
+
+    def adjust(self, delta: int) -> int:
+        with self._lock:
+            base = self.target if self.target is not None else (self.level or 0)
+        return self.set(base + delta)
+
+    def adjust_db(self, delta_db: float) -> None:
+        with self._lock:
+            self._pending_db += delta_db
+        self._kick()
+
+    def _kick(self) -> None:
+        with self._lock:
+            if self._sending:
+                self.changes_coalesced += 1
+                return
+            self._sending = True
+        threading.Thread(target=self._drain, name=f"volume-{self.player.host_name}", daemon=True).start()
 
-    def add_service(self, zeroconf: Zeroconf, type, name):
-        info = zeroconf.get_service_info(type, name)
-        ipv4 = [addr for addr in info.parsed_addresses() if addr.count('.') == 3][0]
-        player = BlusoundPlayer(host_name=ipv4, name=info.server)
-        self.players.append(player)
-        logger.info(f"Discovered new player: {player.name} at {player.host_name}")
+    def _next_params(self) -> Optional[Dict[str, Union[int, float]]]:
+        if self._pending_db:
+            params = volume_params(db=self._pending_db, tell_slaves=self.tell_slaves)
+            self._pending_db = 0.0
+            return params
+        if self.target is None or self.target == self.level:
+            return None
+        level = self.target
+        if self.ramp_step and self.level is not None and abs(self.target - self.level) > self.ramp_step:
+            level = self.level + (self.ramp_step if self.target > self.level else -self.ramp_step)
+        return volume_params(volume=level, tell_slaves=self.tell_slaves)
 
-    def remove_service(self, zeroconf, type, name):
-        self.players = [p for p in self.players if p.name != name]
-        logger.info(f"Removed player: {name}")
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                params = self._next_params()
+                if params is None:
+                    self._sending = False
+                    return
+            success, message, confirmed = self.player.change_volume(
+                params.get('level'), params.get('db'), self.tell_slaves)
+            with self._lock:
+                self.requests_sent += 1
+                if success and confirmed is not None:
+                    self.level = confirmed
+                    if 'level' in params and confirmed != params['level']:
+                        # The player kept another level (e.g. its volume limit); chasing the target would never end.
+                        self.target = confirmed
+                elif success and 'level' in params:
+                    self.level = params['level']
+                elif not success:
+                    # Give up on the target; the next observed status resets it.
+                    self.target = self.level
+                ramping = success and self.ramp_step and self.target != self.level
+            if self.on_result:
+                self.on_result(success, message)
+            if ramping:
+                time.sleep(self.ramp_interval)
+
+@dataclass
+class SnapshotResult:
+    player: 'BlusoundPlayer'
+    status: Optional[PlayerStatus] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None
+
+def snapshot_all(players: List['BlusoundPlayer'], max_concurrency: int = 16,
+                 deadline: float = 5.0) -> List[SnapshotResult]:
+    """Fetch the status of every player concurrently.
+
+    At most `max_concurrency` requests run at once. Results come back in the
+    order of `players` after at most `deadline` seconds; players that have not
+    answered by then are reported as timed out rather than waited for.
+    """
+    players = list(players)
+    if not players:
+        return []
+
+    def query(player: 'BlusoundPlayer') -> Tuple[bool, Union[PlayerStatus, str], float]:
+        started = time.monotonic()
+        success, status = player.get_status(deadline=deadline)
+        return success, status, time.monotonic() - started
+
+    batch_started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(players)),
+                                  thread_name_prefix='snapshot')
+    try:
+        futures = [executor.submit(query, player) for player in players]
+        wait(futures, timeout=deadline)
+    finally:
+        # Stragglers finish in the background, bounded by their own request timeouts.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for player, future in zip(players, futures):
+        result = SnapshotResult(player=player)
+        if not future.done() or future.cancelled():
+            result.timed_out = True
+            result.error = f"No response within {deadline}s"
+            result.elapsed = time.monotonic() - batch_started
+        elif future.exception() is not None:
+            result.error = str(future.exception())
+        else:
+            success, status, result.elapsed = future.result()
+            if success:
+                result.status = status
+            else:
+                result.error = status
+        results.append(result)
+    timed_out = sum(result.timed_out for result in results)
+    logger.info(f"Snapshot of {len(results)} players took {time.monotonic() - batch_started:.3f}s "
+                f"({timed_out} timed out)")
+    return results
+
+@dataclass
+class SyncStatus:
+    name: str = ''
+    mac: str = ''
+    group: str = ''
+    volume: int = 0
+    etag: str = ''
+    # Address of the group master when this player is a slave.
+    master: Optional[str] = None
+    # Addresses of the slaves when this player is a master.
+    slaves: List[str] = field(default_factory=list)
+
+def parse_sync_status(xml_text: str) -> SyncStatus:
+    root = ET.fromstring(xml_text)
+    master = root.find('master')
+    master_address = None
+    if master is not None and master.text:
+        master_address = f"{master.text.strip()}:{master.get('port', '11000')}"
+    return SyncStatus(
+        name=root.get('name', ''),
+        mac=(root.get('mac') or '').lower(),
+        group=root.get('group', ''),
+        volume=_int(root.get('volume')),
+        etag=root.get('etag', ''),
+        master=master_address,
+        slaves=[f"{slave.get('id')}:{slave.get('port', '11000')}" for slave in root.findall('slave') if slave.get('id')],
+    )
+
+@dataclass
+class MemberResult:
+    player: 'BlusoundPlayer'
+    success: bool = False
+    message: str = ''
+    # Seconds after the fan-out was released that the request was sent and answered.
+    sent_at: Optional[float] = None
+    done_at: Optional[float] = None
+
+@dataclass
+class GroupResult:
+    action: str
+    results: List[MemberResult]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.success for result in self.results)
+
+    @property
+    def failed(self) -> List[MemberResult]:
+        return [result for result in self.results if not result.success]
+
+    @property
+    def send_skew(self) -> float:
+        """Spread between the first and last request leaving, in seconds."""
+        sent = [result.sent_at for result in self.results if result.sent_at is not None]
+        return max(sent) - min(sent) if sent else 0.0
+
+    @property
+    def completion_skew(self) -> float:
+        """Spread between the first and last member confirming the command, in seconds."""
+        done = [result.done_at for result in self.results if result.success]
+        return max(done) - min(done) if done else 0.0
+
+    def summary(self) -> str:
+        text = (f"{self.action}: {len(self.results) - len(self.failed)}/{len(self.results)} ok, "
+                f"skew {self.completion_skew * 1000:.0f} ms")
+        if self.failed:
+            text += " - failed: " + ', '.join(f"{result.player.name} ({result.message})" for result in self.failed)
+        return text
+
+def group_command(players: Sequence['BlusoundPlayer'], action: str,
+                  send: Callable[['BlusoundPlayer'], Tuple[bool, str]], deadline: float = 5.0) -> GroupResult:
+    """Run `send` on every player at once and measure how far apart the members acted.
 
-    def update_service(self, zeroconf, type, name):
-        logger.info(f"Updated service: {name}")
+    Each member gets its own thread, and all of them wait on a barrier so the
+    requests leave together instead of one after another. Members that have
+    not answered within `deadline` seconds are reported as failed; the rest
+    of the group is not held up by them.
+    """
+    players = list(players)
+    if not players:
+        return GroupResult(action, [])
+    origin = [0.0]
+    sent: Dict[int, float] = {}
+    outcomes: Dict[int, Tuple[bool, str, float]] = {}
 
-def discover(players):
+    def release():
+        origin[0] = time.monotonic()
+
+    barrier = threading.Barrier(len(players) + 1, action=release)
+
+    def run(index: int, player: 'BlusoundPlayer'):
+        try:
+            barrier.wait(timeout=deadline)
+        except threading.BrokenBarrierError:
+            return
+        sent[index] = time.monotonic() - origin[0]
+        try:
+            success, message = send(player)
+        except Exception as e:
+            success, message = False, str(e)
+        outcomes[index] = (success, message, time.monotonic() - origin[0])
+
+    threads = [threading.Thread(target=run, args=(index, player), name=f"group-{player.host_name}", daemon=True)
+               for index, player in enumerate(players)]
+    for thread in threads:
+        thread.start()
+    try:
+        barrier.wait(timeout=deadline)
+    except threading.BrokenBarrierError:
+        logger.error(f"Group {action} could not start all {len(players)} members")
+    end = time.monotonic() + deadline
+    for thread in threads:
+        thread.join(max(0.0, end - time.monotonic()))
+
+    results = []
+    for index, player in enumerate(players):
+        result = MemberResult(player, sent_at=sent.get(index))
+        if index in outcomes:
+            result.success, result.message, result.done_at = outcomes[index]
+        else:
+            result.message = f"No response within {deadline}s"
+        results.append(result)
+    group_result = GroupResult(action, results)
+    logger.info(f"Group {group_result.summary()} (send skew {group_result.send_skew * 1000:.1f} ms)")
+    return group_result
+
+# Transport actions that take no arguments: name -> (BlusoundPlayer method, help).
+# Shared by the headless subcommands and the daemon's `command` op.
+TRANSPORT_ACTIONS: Dict[str, Tuple[str, str]] = {
+    'play': ('play', "start or resume playback"),
+    'pause': ('pause', "pause playback"),
+    'toggle': ('toggle_play_pause', "toggle play/pause"),
+    'skip': ('skip', "skip to the next track"),
+    'back': ('back', "go back a track"),
+}
+
+def find_source(sources: Sequence[PlayerSource], name: str) -> Optional[PlayerSource]:
+    wanted = name.lower()
+    return next((source for source in sources if source.text.lower() == wanted), None)
+
+@dataclass
+class PlayerGroup:
+    """A BluOS sync group: its master and slaves. An ungrouped player is a group of one."""
+    master: 'BlusoundPlayer'
+    slaves: List['BlusoundPlayer'] = field(default_factory=list)
+    name: str = ''
+
+    @property
+    def members(self) -> List['BlusoundPlayer']:
+        return [self.master] + self.slaves
+
+    def __len__(self) -> int:
+        return 1 + len(self.slaves)
+
+    def __contains__(self, player: 'BlusoundPlayer') -> bool:
+        return any(member.address == player.address for member in self.members)
+
+    def play(self, deadline: float = 5.0) -> GroupResult:
+        return group_command(self.members, 'play', lambda player: player.play(), deadline)
+
+    def pause(self, deadline: float = 5.0) -> GroupResult:
+        return group_command(self.members, 'pause', lambda player: player.pause(), deadline)
+
+    def set_volume(self, level: int, deadline: float = 5.0) -> GroupResult:
+        # tell_slaves=0: each member is set on its own, concurrently, instead of by the master in turn.
+        return group_command(self.members, f"volume {level}%",
+                             lambda player: player.set_volume(level, tell_slaves=False), deadline)
+
+    def adjust_volume(self, db: float, deadline: float = 5.0) -> GroupResult:
+        """Change every member's volume by `db` decibels, keeping the balance between rooms."""
+        return group_command(self.members, f"volume {db:+g} dB",
+                             lambda player: player.set_volume(db=db, tell_slaves=False), deadline)
+
+    def select_input(self, source: Union[PlayerSource, str], deadline: float = 5.0) -> GroupResult:
+        """Select an input for the whole group.
+
+        Slaves play whatever the master plays, and selecting an input on a
+        slave would take it out of the group, so only the master is sent the
+        command.
+        """
+        def send(player: 'BlusoundPlayer') -> Tuple[bool, str]:
+            if isinstance(source, PlayerSource):
+                return player.select_input(source)
+            found = find_source(player.sources or player.capture_sources(), source)
+            if found is None:
+                return False, f"No source named {source!r}"
+            return player.select_input(found)
+
+        text = source.text if isinstance(source, PlayerSource) else source
+        return group_command([self.master], f"input {text}", send, deadline)
+
+def read_groups(players: Sequence['BlusoundPlayer'], deadline: float = 5.0) -> List[PlayerGroup]:
+    """Fetch /SyncStatus from every player concurrently and assemble the group topology.
+
+    Group members that are not in `players` get a lightweight handle of their
+    own. Players that did not answer within `deadline` are left out.
+    """
+    players = list(players)
+    if not players:
+        return []
+    by_address = {player.address: player for player in players}
+
+    def handle(address: str) -> 'BlusoundPlayer':
+        player = by_address.get(address)
+        if player is None:
+            host_name, _, port = address.rpartition(':')
+            player = by_address[address] = BlusoundPlayer(host_name, host_name, port=int(port or 11000),
+                                                           initialize=False)
+        return player
+
+    executor = ThreadPoolExecutor(max_workers=min(16, len(players)), thread_name_prefix='sync')
+    try:
+        futures = [executor.submit(player.get_sync_status, deadline) for player in players]
+        wait(futures, timeout=deadline)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    syncs = []
+    for player, future in zip(players, futures):
+        if future.done() and not future.cancelled() and future.exception() is None:
+            success, sync = future.result()
+            if success:
+                syncs.append((player, sync))
+
+    groups: Dict[str, PlayerGroup] = {}
+
+    def group_for(master_address: str, name: str) -> PlayerGroup:
+        group = groups.get(master_address)
+        if group is None:
+            master = handle(master_address)
+            group = groups[master_address] = PlayerGroup(master, name=name or master.name)
+        return group
+
+    for player, sync in syncs:
+        if sync.master is None:
+            group = group_for(player.address, sync.group)
+            for address in sync.slaves:
+                slave = handle(address)
+                if slave not in group:
+                    group.slaves.append(slave)
+    for player, sync in syncs:
+        if sync.master is not None:
+            group = group_for(sync.master, sync.group)
+            if player not in group:
+                group.slaves.append(player)
+    logger.info(f"Read {len(groups)} groups from {len(syncs)} of {len(players)} players")
+    return list(groups.values())
+
+StatusCallback = Callable[['BlusoundPlayer', PlayerStatus], None]
+ChangeCallback = Callable[['BlusoundPlayer', StatusChange], None]
+
+class StatusWatcher:
+    """Keeps one long-poll /Status loop per watched player.
+
+    Each loop passes the last etag back to the player, so the request only
+    returns when something changed (or the poll times out). New statuses are
+    published to every subscriber from the watcher's threads; use
+    `subscribe_queue` to hand them over to another thread safely.
+    """
+
+    def __init__(self, poll_timeout: int = 100, retry_delay: float = 2.0, min_interval: float = 1.0):
+        self.poll_timeout = poll_timeout
+        self.retry_delay = retry_delay
+        # BluOS asks clients not to long-poll the same player more than once per second.
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._subscribers: List[StatusCallback] = []
+        self._change_subscribers: List[Tuple[ChangeCallback, Optional[frozenset]]] = []
+        self._stop_events: Dict[str, threading.Event] = {}
+        self._watched_players: Dict[str, 'BlusoundPlayer'] = {}
+        self._latest: Dict[str, PlayerStatus] = {}
+
+    def subscribe(self, callback: StatusCallback) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: StatusCallback) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def subscribe_changes(self, callback: ChangeCallback, kinds: Optional[Iterable[str]] = None) -> None:
+        """Receive a StatusChange for each kind of change, optionally only for `kinds`."""
+        with self._lock:
+            self._change_subscribers.append((callback, frozenset(kinds) if kinds is not None else None))
+
+    def unsubscribe_changes(self, callback: ChangeCallback) -> None:
+        with self._lock:
+            self._change_subscribers = [(cb, kinds) for cb, kinds in self._change_subscribers if cb != callback]
+
+    def subscribe_queue(self, maxsize: int = 0) -> 'queue.Queue[Tuple[BlusoundPlayer, PlayerStatus]]':
+        status_queue: 'queue.Queue[Tuple[BlusoundPlayer, PlayerStatus]]' = queue.Queue(maxsize)
+        self.subscribe(lambda player, status: status_queue.put((player, status)))
+        return status_queue
+
+    def latest(self, player: 'BlusoundPlayer') -> Optional[PlayerStatus]:
+        return self._latest.get(player.base_url)
+
+    def is_watching(self, player: 'BlusoundPlayer') -> bool:
+        with self._lock:
+            return player.base_url in self._stop_events
+
+    def watch(self, player: 'BlusoundPlayer') -> None:
+        with self._lock:
+            if player.base_url in self._stop_events:
+                return
+            stop_event = threading.Event()
+            self._stop_events[player.base_url] = stop_event
+            self._watched_players[player.base_url] = player
+        thread = threading.Thread(target=self._run, args=(player, stop_event),
+                                  name=f"status-{player.host_name}", daemon=True)
+        thread.start()
+        logger.info(f"Watching status of {player.name}")
+
+    def unwatch(self, player: 'BlusoundPlayer') -> None:
+        with self._lock:
+            # The player may have moved to a new address since it was watched.
+            key = next((url for url, watched in self._watched_players.items() if watched is player),
+                       player.base_url)
+            self._watched_players.pop(key, None)
+            stop_event = self._stop_events.pop(key, None)
+        if stop_event:
+            stop_event.set()
+            self._latest.pop(key, None)
+            self._latest.pop(player.base_url, None)
+            logger.info(f"Stopped watching status of {player.name}")
+
+    def stop(self) -> None:
+        """End every long-poll loop. Players can be watched again afterwards."""
+        with self._lock:
+            stop_events = list(self._stop_events.values())
+            self._stop_events.clear()
+            self._watched_players.clear()
+        for stop_event in stop_events:
+            stop_event.set()
+
+    def _publish(self, player: 'BlusoundPlayer', status: PlayerStatus) -> None:
+        previous = self._latest.get(player.base_url)
+        self._latest[player.base_url] = status
+        with self._lock:
+            subscribers = list(self._subscribers)
+            change_subscribers = list(self._change_subscribers)
+        for callback in subscribers:
+            try:
+                callback(player, status)
+            except Exception as e:
+                logger.error(f"Status subscriber failed for {player.name}: {e}")
+        if not change_subscribers:
+            return
+        for change in status_changes(previous, status):
+            for callback, kinds in change_subscribers:
+                if kinds is not None and change.kind not in kinds:
+                    continue
+                try:
+                    callback(player, change)
+                except Exception as e:
+                    logger.error(f"Change subscriber failed for {player.name}: {e}")
+
+    def _run(self, player: 'BlusoundPlayer', stop_event: threading.Event) -> None:
+        etag: Optional[str] = None
+        while not stop_event.is_set():
+            started = time.monotonic()
+            # The first request returns immediately so subscribers get a baseline.
+            success, status = player.get_status(timeout=self.poll_timeout if etag else None, etag=etag)
+            if stop_event.is_set():
+                break
+            if not success:
+                stop_event.wait(self.retry_delay)
+                # While the player is offline its circuit breaker probes it; poll again once it is back.
+                while player.circuit.is_open and not stop_event.wait(self.retry_delay):
+                    pass
+                continue
+            if status.etag != etag:
+                etag = status.etag
+                self._publish(player, status)
+            remaining = self.min_interval - (time.monotonic() - started)
+            if remaining > 0:
+                stop_event.wait(remaining)
+
+PLAYER_ADDED = 'added'
+PLAYER_UPDATED = 'updated'
+PLAYER_REMOVED = 'removed'
+
+@dataclass(frozen=True)
+class RegistryEvent:
+    kind: str
+    player: 'BlusoundPlayer'
+    version: int
+    # What an update changed: 'confirmed', 'name', 'address', 'service_name' or 'mac'.
+    changes: Tuple[str, ...] = ()
+
+RegistryCallback = Callable[[RegistryEvent], None]
+
+def _normalize_mac(mac: Optional[str]) -> Optional[str]:
+    return mac.strip().lower().replace('-', ':') if mac else None
+
+class PlayerRegistry:
+    """Thread-safe set of known players, indexed by mDNS service name, address and MAC.
+
+    Discovery applies add, update and remove events one at a time instead of
+    rebuilding the list. `version` goes up with every change, and each
+    subscriber gets a RegistryEvent, so views only redraw the player list
+    when it actually changed.
+    """
+
+    def __init__(self, seed: Optional[List[BlusoundPlayer]] = None):
+        self._lock = threading.Lock()
+        self._players: List[BlusoundPlayer] = []
+        self._by_service: Dict[str, BlusoundPlayer] = {}
+        self._by_address: Dict[str, BlusoundPlayer] = {}
+        self._by_mac: Dict[str, BlusoundPlayer] = {}
+        self._subscribers: List[RegistryCallback] = []
+        self.version = 0
+        for player in seed or []:
+            self._players.append(player)
+            self._index(player)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def players(self) -> List[BlusoundPlayer]:
+        with self._lock:
+            return list(self._players)
+
+    def get(self, service_name: Optional[str] = None, address: Optional[str] = None,
+            mac: Optional[str] = None) -> Optional[BlusoundPlayer]:
+        with self._lock:
+            return self._lookup(service_name, address, _normalize_mac(mac))
+
+    def subscribe(self, callback: RegistryCallback) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: RegistryCallback) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def upsert(self, service_name: str, host_name: str, port: int, name: str,
+               mac: Optional[str] = None) -> Optional[RegistryEvent]:
+        """Add or update the player announced as `service_name`; None if nothing changed."""
+        mac = _normalize_mac(mac)
+        address = f"{host_name}:{port}"
+        with self._lock:
+            player = self._lookup(service_name, address, mac)
+            if player is None:
+                player = BlusoundPlayer(host_name=host_name, name=name, port=port, initialize=False)
+                player.service_name = service_name
+                player.mac = mac
+                self._players.append(player)
+                self._index(player)
+                event = self._event(PLAYER_ADDED, player)
+            else:
+                changes = []
+                if player.from_cache:
+                    player.from_cache = False
+                    changes.append('confirmed')
+                if player.name != name:
+                    changes.append('name')
+                if player.address != address:
+                    changes.append('address')
+                if player.service_name != service_name:
+                    changes.append('service_name')
+                if mac and player.mac != mac:
+                    changes.append('mac')
+                if not changes:
+                    return None
+                self._unindex(player)
+                player.name = name
+                player.service_name = service_name
+                player.mac = mac or player.mac
+                if player.address != address:
+                    player.move(host_name, port)
+                self._index(player)
+                event = self._event(PLAYER_UPDATED, player, tuple(changes))
+        self._notify(event)
+        return event
+
+    def remove(self, service_name: str) -> Optional[RegistryEvent]:
+        with self._lock:
+            player = self._by_service.get(service_name)
+            if player is None:
+                return None
+            event = self._delete(player)
+        self._notify(event)
+        return event
+
+    def remove_where(self, predicate: Callable[[BlusoundPlayer], bool]) -> List[RegistryEvent]:
+        with self._lock:
+            events = [self._delete(player) for player in [p for p in self._players if predicate(p)]]
+        for event in events:
+            self._notify(event)
+        return events
+
+    def _lookup(self, service_name: Optional[str], address: Optional[str],
+                mac: Optional[str]) -> Optional[BlusoundPlayer]:
+        player = self._by_service.get(service_name) if service_name else None
+        if player is None and mac:
+            player = self._by_mac.get(mac)
+        if player is None and address:
+            candidate = self._by_address.get(address)
+            # An explicit address lookup returns whatever is there. When matching an
+            # announcement, the address only identifies the player if nothing says
+            # it is a different device.
+            if candidate is not None and (service_name is None
+                                          or candidate.service_name in (None, service_name)):
+                player = candidate
+        return player
+
+    def _index(self, player: BlusoundPlayer) -> None:
+        self._by_address[player.address] = player
+        if player.service_name:
+            self._by_service[player.service_name] = player
+        if player.mac:
+            self._by_mac[player.mac] = player
+
+    def _unindex(self, player: BlusoundPlayer) -> None:
+        for index, key in ((self._by_address, player.address), (self._by_service, player.service_name),
+                           (self._by_mac, player.mac)):
+            if key is not None and index.get(key) is player:
+                del index[key]
+
+    def _delete(self, player: BlusoundPlayer) -> RegistryEvent:
+        self._unindex(player)
+        self._players.remove(player)
+        return self._event(PLAYER_REMOVED, player)
+
+    def _event(self, kind: str, player: BlusoundPlayer, changes: Tuple[str, ...] = ()) -> RegistryEvent:
+        self.version += 1
+        return RegistryEvent(kind, player, self.version, changes)
+
+    def _notify(self, event: RegistryEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Registry subscriber failed for {event.player.name}: {e}")
+
+def _txt(info: 'zeroconf.ServiceInfo', key: str) -> Optional[str]:
+    value = (info.properties or {}).get(key.encode())
+    return value.decode(errors='replace') if value else None
+
+class MyListener:
+    """zeroconf service listener that applies announcements to a PlayerRegistry.
+
+    Service info is resolved on a small worker pool: `get_service_info` can
+    block for seconds, and zeroconf delivers every callback on one thread.
+    """
+
+    def __init__(self, seed: Optional[List[BlusoundPlayer]] = None, registry: Optional[PlayerRegistry] = None):
+        # Players restored from the warm-start cache are listed until discovery confirms or expires them.
+        self.registry = registry if registry is not None else PlayerRegistry(seed)
+        self.started = time.monotonic()
+        self.first_player_after: Optional[float] = None
+        self._resolver = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mdns')
+        # Counts removals per service name so a resolve that finishes after a removal is dropped.
+        self._removals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def players(self) -> List[BlusoundPlayer]:
+        return self.registry.players()
+
+    def add_service(self, zc: 'zeroconf.Zeroconf', type, name):
+        self._resolve(zc, type, name)
+
+    def update_service(self, zc: 'zeroconf.Zeroconf', type, name):
+        # Sent when a player's records change, e.g. after it got a new IP address.
+        self._resolve(zc, type, name)
+
+    def remove_service(self, zc, type, name):
+        with self._lock:
+            self._removals[name] = self._removals.get(name, 0) + 1
+            event = self.registry.remove(name)
+        if event:
+            logger.info(f"Removed player: {event.player.name} ({name})")
+
+    def close(self) -> None:
+        """Drop resolves that have not started; call before closing the Zeroconf instance."""
+        self._resolver.shutdown(wait=False, cancel_futures=True)
+
+    def expire_cached(self, confirm_timeout: float) -> None:
+        """Drop cached players that neither mDNS nor an HTTP response confirmed within `confirm_timeout`."""
+        if time.monotonic() - self.started < confirm_timeout:
+            return
+        for event in self.registry.remove_where(lambda player: player.from_cache):
+            logger.info(f"Expired cached player: {event.player.name} at {event.player.host_name}")
+
+    def _resolve(self, zc: 'zeroconf.Zeroconf', type, name):
+        with self._lock:
+            removals = self._removals.get(name, 0)
+        self._resolver.submit(self._apply, zc, type, name, removals)
+
+    def _apply(self, zc: 'zeroconf.Zeroconf', type, name, removals: int):
+        info = zc.get_service_info(type, name)
+        if info is None:
+            logger.warning(f"No service info for {name}")
+            return
+        ipv4 = next((addr for addr in info.parsed_addresses() if addr.count('.') == 3), None)
+        if ipv4 is None:
+            logger.warning(f"No IPv4 address for {name}")
+            return
+        with self._lock:
+            if self._removals.get(name, 0) != removals:
+                logger.debug("Dropping service info for %s; it was removed while resolving", name)
+                return
+            elapsed = time.monotonic() - self.started
+            if self.first_player_after is None:
+                self.first_player_after = elapsed
+            event = self.registry.upsert(name, ipv4, info.port or 11000, info.server, mac=_txt(info, 'mac'))
+        if event is None:
+            return
+        player = event.player
+        if event.kind == PLAYER_ADDED:
+            # Register a lightweight handle now; sources load on the worker pool.
+            player.load_sources_in_background()
+            logger.info(f"Discovered new player: {player.name} at {player.host_name} after {elapsed:.3f}s")
+            return
+        if 'confirmed' in event.changes or 'address' in event.changes:
+            player.refresh_sources_in_background()
+        logger.info(f"Updated player: {player.name} at {player.host_name} ({', '.join(event.changes)}) "
+                    f"after {elapsed:.3f}s")
+
+def discover(players, seed: Optional[List[BlusoundPlayer]] = None, confirm_timeout: float = 15.0,
+             registry: Optional[PlayerRegistry] = None):
     logger.info("Starting discovery process")
-    zeroconf = Zeroconf()
-    listener = MyListener()
-    ServiceBrowser(zeroconf, "_musc._tcp.local.", listener)
+    registry = registry if registry is not None else PlayerRegistry(seed)
+    sync_lock = threading.Lock()
+
+    def sync(event: Optional[RegistryEvent] = None):
+        # Copy the registry into the shared list only when it changed.
+        with sync_lock:
+            players[:] = registry.players()
+
+    registry.subscribe(sync)
+    sync()
+    zc = zeroconf.Zeroconf()
+    listener = MyListener(registry=registry)
+    zeroconf.ServiceBrowser(zc, "_musc._tcp.local.", listener)
     try:
         while True:
             time.sleep(1)
-            players[:] = listener.players
+            listener.expire_cached(confirm_timeout)
     finally:
-        zeroconf.close()
+        registry.unsubscribe(sync)
+        listener.close()
+        zc.close()
         logger.info("Discovery process ended")
 
-def threaded_discover():
+def threaded_discover(seed: Optional[List[BlusoundPlayer]] = None, registry: Optional[PlayerRegistry] = None):
     logger.info("Starting threaded discovery")
-    players = []
-    discovery_thread = threading.Thread(target=discover, args=(players,), daemon=True)
+    players = registry.players() if registry is not None else list(seed or [])
+    discovery_thread = threading.Thread(target=discover, args=(players, seed),
+                                        kwargs={'registry': registry}, daemon=True)
     discovery_thread.start()
     return players
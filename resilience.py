@@ -0,0 +1,143 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often, and how patiently, idempotent requests are retried."""
+    # Total tries including the first one.
+    attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+
+    def backoff(self, retry: int) -> float:
+        """Delay before retry number `retry` (0-based): exponential with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+def failed_attempt(breaker: 'CircuitBreaker', policy: RetryPolicy, attempt: int, attempts: int,
+                   unreachable: bool, retryable: bool, remaining: Optional[float] = None) -> Optional[float]:
+    """Account for a failed attempt; returns the delay before the next one, or None to give up.
+
+    Any HTTP response, even an error, shows the player is reachable. An
+    unreachable player counts as one failure per call, recorded when the call
+    gives up, so the retries of a single call cannot open the circuit.
+    `remaining` is what is left of the call's deadline, in seconds.
+    """
+    if not unreachable:
+        breaker.record_success()
+    delay = policy.backoff(attempt)
+    if not retryable or attempt == attempts - 1 or (remaining is not None and delay >= remaining):
+        if unreachable:
+            breaker.record_failure()
+        return None
+    return delay
+
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+# A background probe is in flight; real requests still fail fast.
+CIRCUIT_HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """Fails fast while a player is unreachable and probes it in the background.
+
+    After `failure_threshold` consecutive failures the circuit opens: `allow`
+    returns False so callers skip the network entirely. A daemon thread then
+    calls `probe` every `probe_interval` seconds, backing off with jitter up to
+    `max_probe_interval`, and closes the circuit as soon as a probe succeeds.
+    """
+
+    def __init__(self, name: str, probe: Callable[[], bool], failure_threshold: int = 3,
+                 probe_interval: float = 2.0, max_probe_interval: float = 30.0):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # How often the circuit has opened; shown in the CLI's request stats.
+        self.times_opened = 0
+        self._next_probe_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._closed.set()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CIRCUIT_CLOSED
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next background probe, or 0 when the circuit is closed."""
+        next_probe = self._next_probe_at
+        if not self.is_open or next_probe is None:
+            return 0.0
+        return max(0.0, next_probe - time.monotonic())
+
+    def allow(self) -> bool:
+        return self.state == CIRCUIT_CLOSED
+
+    def record_success(self) -> None:
+        if self.failures == 0 and self.state == CIRCUIT_CLOSED:
+            return
+        self._set_state(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            should_open = self.state == CIRCUIT_CLOSED and self.failures >= self.failure_threshold
+        if should_open:
+            self._set_state(CIRCUIT_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        with self._lock:
+            previous = self.state
+            if state == CIRCUIT_CLOSED:
+                self.failures = 0
+                self.opened_at = None
+                self._next_probe_at = None
+            elif previous == CIRCUIT_CLOSED:
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+            self.state = state
+        if state == previous:
+            return
+        if state == CIRCUIT_CLOSED:
+            self._closed.set()
+            logger.info(f"Circuit for {self.name} closed")
+        elif previous == CIRCUIT_CLOSED:
+            self._closed.clear()
+            logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            threading.Thread(target=self._probe_until_closed, name=f"probe-{self.name}", daemon=True).start()
+
+    def _probe_until_closed(self) -> None:
+        interval = self.probe_interval
+        while self.is_open:
+            delay = interval * random.uniform(0.8, 1.2)
+            self._next_probe_at = time.monotonic() + delay
+            if self._closed.wait(delay):
+                return
+            self._set_state(CIRCUIT_HALF_OPEN)
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                logger.debug("Probe of %s failed: %s", self.name, e)
+                healthy = False
+            if healthy:
+                self._set_state(CIRCUIT_CLOSED)
+                return
+            if self.state == CIRCUIT_CLOSED:
+                # A real request succeeded while the probe was running.
+                return
+            self._set_state(CIRCUIT_OPEN)
+            interval = min(self.max_probe_interval, interval * 2)
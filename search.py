@@ -0,0 +1,497 @@
+import array
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from player import BlusoundPlayer, PlayerSource
+
+logger = logging.getLogger(__name__)
+
+# Container key of the top-level menu (/Browse without a key).
+ROOT_KEY = ''
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_MAX_NODES = 50000
+DEFAULT_WORKERS = 3
+DEFAULT_REFRESH_INTERVAL = 300.0
+# Stale containers re-fetched per pass, oldest first, so refreshes are spread over passes.
+DEFAULT_REFRESH_BUDGET = 25
+DEFAULT_LIMIT = 50
+# Every 1- to 3-character slice of each word is indexed, so a short term is
+# answered by one posting list and a longer one starts from its rarest trigram.
+GRAM_SIZE = 3
+TRAIL_SEPARATOR = ' > '
+# Candidate lists up to this long are checked entry by entry; longer ones
+# are first narrowed with the bitmaps of the query's other grams.
+SCAN_BUDGET = 200
+# A gram also gets a bitmap once it occurs in at least 1/BITMAP_DENSITY of
+# the entries, where the bitmap is no bigger than its posting list.
+BITMAP_DENSITY = 32
+_NONZERO = re.compile(b'[^\x00]')
+
+
+def fold(text: str) -> str:
+    """Case- and accent-insensitive form used for indexing and queries ('Café' -> 'cafe')."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _grams(folded: str) -> Set[str]:
+    grams = set()
+    for word in folded.split():
+        for size in range(1, min(GRAM_SIZE, len(word)) + 1):
+            grams.update(word[i:i + size] for i in range(len(word) - size + 1))
+    return grams
+
+
+def _term_grams(term: str) -> List[str]:
+    if len(term) <= GRAM_SIZE:
+        return [term]
+    return [term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)]
+
+
+def _signature(sources: Sequence[PlayerSource]) -> int:
+    return hash(tuple((source.text, source.browse_key, source.play_url) for source in sources))
+
+
+def _set_bit(bitmap: bytearray, node: int) -> None:
+    index = node >> 3
+    if index >= len(bitmap):
+        bitmap.extend(bytes(index + 1 - len(bitmap)))
+    bitmap[index] |= 1 << (node & 7)
+
+
+def _bitmap(posting: Iterable[int]) -> bytearray:
+    bitmap = bytearray()
+    for node in posting:
+        _set_bit(bitmap, node)
+    return bitmap
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Set bit positions of `mask` in ascending order."""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for match in _NONZERO.finditer(data):
+        base = match.start() << 3
+        byte = data[match.start()]
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+@dataclass(slots=True)
+class _Container:
+    depth: int
+    signature: int
+    fetched_at: float
+    # Node ids of a container are contiguous: first .. first + count - 1.
+    first: int = -1
+    count: int = 0
+
+
+class _Nodes:
+    """Column store of indexed entries plus the gram -> node id posting lists."""
+
+    def __init__(self):
+        self.sources: List[PlayerSource] = []
+        self.folded: List[str] = []
+        self.container_of: List[str] = []
+        self.depths = array.array('B')
+        self.postings: Dict[str, array.array] = {}
+        # Bitmaps of the common grams, so they intersect with one big-integer AND.
+        self.bitmaps: Dict[str, bytearray] = {}
+        # browse_key -> node id of the first entry that opens that container.
+        self.openers: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def append(self, key: str, container: _Container, sources: Sequence[PlayerSource]) -> None:
+        container.first = len(self.sources)
+        container.count = len(sources)
+        postings, bitmaps = self.postings, self.bitmaps
+        for source in sources:
+            node = len(self.sources)
+            folded = fold(source.text)
+            self.sources.append(source)
+            self.folded.append(folded)
+            self.container_of.append(key)
+            self.depths.append(min(container.depth, 255))
+            for gram in _grams(folded):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array.array('I')
+                posting.append(node)
+                bitmap = bitmaps.get(gram)
+                if bitmap is not None:
+                    _set_bit(bitmap, node)
+                elif len(posting) > SCAN_BUDGET and len(posting) * BITMAP_DENSITY > node:
+                    bitmaps[gram] = _bitmap(posting)
+            if source.browse_key:
+                self.openers.setdefault(source.browse_key, node)
+
+
+@dataclass
+class SearchHit:
+    source: PlayerSource
+    # Position of each entry on the way down from the top-level menu, ending with this one.
+    path: Tuple[int, ...]
+    # Texts of the containers above the entry, e.g. "TuneIn > Local Radio".
+    trail: str
+    depth: int
+
+
+@dataclass
+class SearchResult:
+    query: str
+    hits: List[SearchHit]
+    total: int
+    # False when the scan stopped at a full page; `total` is then a lower bound.
+    complete: bool = True
+    # True when nothing contained every term and hits are ranked by shared trigrams instead.
+    fuzzy: bool = False
+    elapsed: float = 0.0
+
+
+class SourceIndex:
+    """In-memory index of a player's browse tree for instant search.
+
+    Containers are added with `add` as a crawler fetches them. Each entry's
+    folded text is split into words whose 1- to 3-character slices map to
+    posting lists of node ids, kept in breadth-first order so shallow entries
+    rank first; common slices also get a bitmap. A query matches entries
+    containing every term as a substring. Candidates come from the rarest
+    slice of the query, are narrowed by ANDing the bitmaps of the others, and
+    checking stops once a page of hits is found, so each keystroke stays well
+    under a millisecond on tens of thousands of entries. When nothing
+    matches, entries sharing the most trigrams with the query are returned
+    instead.
+
+    New containers are appended at once. A container whose contents changed,
+    or that `prune` drops, only takes effect at the next `rebuild`, which
+    builds fresh lists and swaps them in.
+    """
+
+    def __init__(self, max_nodes: int = DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.generation = 0
+        self._contents: Dict[str, List[PlayerSource]] = {}
+        self._containers: Dict[str, _Container] = {}
+        self._nodes = _Nodes()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def containers(self) -> int:
+        return len(self._containers)
+
+    def add(self, key: str, sources: Sequence[PlayerSource], depth: int) -> bool:
+        """Record the contents of container `key`; returns True if they are new or changed."""
+        signature = _signature(sources)
+        with self._lock:
+            container = self._containers.get(key)
+            if container is not None:
+                container.fetched_at = time.monotonic()
+                if container.signature == signature:
+                    return False
+                container.signature = signature
+                self._contents[key] = list(sources)
+                self._dirty = True
+                return True
+            if len(self._nodes) + len(sources) > self.max_nodes:
+                logger.warning(f"Search index full ({len(self._nodes)} entries); not indexing {key or 'top level'}")
+                return False
+            container = self._containers[key] = _Container(depth, signature, time.monotonic())
+            self._contents[key] = list(sources)
+            self._nodes.append(key, container, sources)
+            self.generation += 1
+            return True
+
+    def children(self, key: str) -> Optional[List[PlayerSource]]:
+        with self._lock:
+            sources = self._contents.get(key)
+            return list(sources) if sources is not None else None
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since container `key` was last fetched, or None if it is not indexed."""
+        with self._lock:
+            container = self._containers.get(key)
+            return None if container is None else time.monotonic() - container.fetched_at
+
+    def stale(self, older_than: float, limit: int) -> List[str]:
+        """Keys of up to `limit` containers fetched at least `older_than` seconds ago, oldest first."""
+        cutoff = time.monotonic() - older_than
+        with self._lock:
+            stale = [(container.fetched_at, key) for key, container in self._containers.items()
+                     if container.fetched_at <= cutoff]
+        return [key for _, key in heapq.nsmallest(limit, stale)]
+
+    def prune(self, keep: Set[str]) -> int:
+        """Forget containers not in `keep`, e.g. those no longer reachable; applied at the next rebuild."""
+        with self._lock:
+            dropped = [key for key in self._containers if key not in keep]
+            for key in dropped:
+                del self._containers[key]
+                del self._contents[key]
+            if dropped:
+                self._dirty = True
+            return len(dropped)
+
+    def rebuild(self, force: bool = False) -> bool:
+        """Re-create the node lists from the container contents if anything changed or was dropped."""
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            self._dirty = False
+            contents = dict(self._contents)
+            containers = {key: _Container(c.depth, c.signature, c.fetched_at) for key, c in self._containers.items()}
+        nodes = _Nodes()
+        level = [ROOT_KEY] if ROOT_KEY in contents else []
+        seen = set(level)
+        while level:
+            next_level = []
+            for key in level:
+                nodes.append(key, containers[key], contents[key])
+                for source in contents[key]:
+                    if source.browse_key in contents and source.browse_key not in seen:
+                        seen.add(source.browse_key)
+                        next_level.append(source.browse_key)
+            level = next_level
+        with self._lock:
+            # Containers added while rebuilding are appended so none is lost.
+            for key, sources in self._contents.items():
+                if key not in seen:
+                    container = self._containers[key]
+                    containers[key] = container
+                    nodes.append(key, container, sources)
+            for key, container in containers.items():
+                if key in self._containers:
+                    container.fetched_at = self._containers[key].fetched_at
+            self._containers = {key: containers[key] for key in self._contents}
+            self._nodes = nodes
+            self.generation += 1
+        return True
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> SearchResult:
+        started = time.perf_counter()
+        folded = fold(query).strip()
+        terms = folded.split()
+        if not terms:
+            return SearchResult(query, [], 0)
+        with self._lock:
+            nodes = self._nodes
+            matches, total, complete = self._match(nodes, terms, limit)
+            fuzzy = complete and not matches
+            if fuzzy:
+                matches, total = self._fuzzy(nodes, terms, limit)
+            hits = [self._hit(nodes, node) for node in matches[:limit]]
+        return SearchResult(query, hits, total, complete, fuzzy, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            nodes = self._nodes
+            return {
+                "containers": len(self._containers),
+                "entries": len(nodes),
+                "grams": len(nodes.postings),
+                "postings": sum(len(posting) for posting in nodes.postings.values()),
+                "bitmaps": len(nodes.bitmaps),
+                "generation": self.generation,
+            }
+
+    def _match(self, nodes: _Nodes, terms: List[str], limit: int) -> Tuple[Sequence[int], int, bool]:
+        """First `limit` matches in node order, the number found, and whether that number is exact."""
+        postings, bitmaps = nodes.postings, nodes.bitmaps
+        empty = array.array('I')
+        grams = sorted({gram for term in terms for gram in _term_grams(term)},
+                       key=lambda gram: len(postings.get(gram, empty)))
+        posting = postings.get(grams[0], empty)
+        if len(terms) == 1 and len(terms[0]) <= GRAM_SIZE:
+            # The posting list of a short term is already exact.
+            return posting, len(posting), True
+        candidates: Iterable[int] = posting
+        common = [gram for gram in grams if gram in bitmaps]
+        if len(posting) > SCAN_BUDGET and common:
+            mask = int.from_bytes(bitmaps[common[0]], 'little')
+            for gram in common[1:]:
+                mask &= int.from_bytes(bitmaps[gram], 'little')
+            if common[0] == grams[0]:
+                candidates = _bits(mask)
+            else:
+                data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+                candidates = (node for node in posting if node >> 3 < len(data) and data[node >> 3] >> (node & 7) & 1)
+        texts = nodes.folded
+        if len(terms) == 1:
+            term = terms[0]
+            check = lambda node: term in texts[node]
+        else:
+            def check(node: int) -> bool:
+                text = texts[node]
+                for term in terms:
+                    if term not in text:
+                        return False
+                return True
+        # Stop once the page is full: a common term need not be checked against every entry.
+        matches = list(islice(filter(check, candidates), limit + 1))
+        return matches, len(matches), len(matches) <= limit
+
+    def _fuzzy(self, nodes: _Nodes, terms: List[str], limit: int) -> Tuple[List[int], int]:
+        """Entries sharing as many of the query's trigrams as possible, rarest trigrams first."""
+        postings = nodes.postings
+        grams = sorted({gram for term in terms if len(term) >= GRAM_SIZE for gram in _term_grams(term)
+                        if gram in postings}, key=lambda gram: len(postings[gram]))
+        mask = 0
+        for gram in grams:
+            bitmap = nodes.bitmaps.get(gram)
+            gram_mask = int.from_bytes(bitmap if bitmap is not None else _bitmap(postings[gram]), 'little')
+            # A trigram that would leave nothing is taken to be a typo and skipped.
+            narrowed = gram_mask & mask if mask else gram_mask
+            if narrowed:
+                mask = narrowed
+        return list(islice(_bits(mask), limit)), mask.bit_count()
+
+    def _hit(self, nodes: _Nodes, node: int) -> SearchHit:
+        path = []
+        trail = []
+        current = node
+        rooted = False
+        for _ in range(256):
+            key = nodes.container_of[current]
+            container = self._containers.get(key)
+            if container is None:
+                break
+            path.append(current - container.first)
+            if key == ROOT_KEY:
+                rooted = True
+                break
+            current = nodes.openers.get(key, -1)
+            if current < 0:
+                break
+            trail.append(nodes.sources[current].text)
+        # Entries whose way down from the top level is no longer indexed get an empty path.
+        return SearchHit(nodes.sources[node], tuple(reversed(path)) if rooted else (),
+                         TRAIL_SEPARATOR.join(reversed(trail)), nodes.depths[node])
+
+
+class BrowseCrawler:
+    """Keeps a SourceIndex of one player's browse tree current in the background.
+
+    Each pass walks the tree breadth first from the top-level menu, fetching
+    at most `max_workers` containers at a time and going no deeper than
+    `max_depth` levels. Only containers not indexed yet are always fetched.
+    Of those older than `refresh_interval` seconds, the `refresh_budget`
+    oldest are fetched again; the rest come from the index without a
+    request, so a large tree is refreshed a slice per pass. Unchanged
+    containers cost no re-indexing. Fetches bypass the player's browse
+    cache so a crawl never evicts what the user browsed.
+    """
+
+    def __init__(self, player: BlusoundPlayer, index: Optional[SourceIndex] = None,
+                 max_depth: int = DEFAULT_MAX_DEPTH, max_workers: int = DEFAULT_WORKERS,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 refresh_budget: int = DEFAULT_REFRESH_BUDGET):
+        self.player = player
+        self.index = index if index is not None else SourceIndex()
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.refresh_interval = refresh_interval
+        self.refresh_budget = refresh_budget
+        self.passes = 0
+        self.crawling = False
+        self.last_pass: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"crawl-{self.player.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def crawl(self) -> Dict[str, float]:
+        """Run one pass; returns counts of containers visited, fetched and changed."""
+        started = time.perf_counter()
+        self.crawling = True
+        visited: Set[str] = set()
+        fetched = changed = 0
+        complete = True
+        level = [ROOT_KEY]
+        refresh = set(self.index.stale(self.refresh_interval, self.refresh_budget))
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crawl') as pool:
+                for depth in range(self.max_depth):
+                    if not level:
+                        break
+                    if self._stop.is_set() or self.player.circuit.is_open:
+                        complete = False
+                        break
+                    visited.update(level)
+                    next_level: List[str] = []
+                    # Results are applied in order so node ids stay breadth first.
+                    results = pool.map(self._fetch, level, [key in refresh for key in level])
+                    for key, (sources, was_fetched) in zip(level, results):
+                        fetched += was_fetched
+                        if sources is None:
+                            complete = False
+                            sources = self.index.children(key) or []
+                        elif was_fetched and self.index.add(key, sources, depth):
+                            changed += 1
+                        for source in sources:
+                            child = source.browse_key
+                            if child and child not in visited:
+                                visited.add(child)
+                                next_level.append(child)
+                    level = next_level
+        finally:
+            self.crawling = False
+        if complete:
+            # Only a full pass knows which containers are unreachable now.
+            self.index.prune(visited)
+        self.index.rebuild()
+        self.passes += 1
+        self.last_pass = {
+            "containers": len(visited) - len(level),
+            "fetched": fetched,
+            "changed": changed,
+            "entries": len(self.index),
+            "seconds": time.perf_counter() - started,
+        }
+        logger.info(f"Indexed browse tree of {self.player.name}: {self.last_pass}")
+        return self.last_pass
+
+    def _fetch(self, key: str, refresh: bool) -> Tuple[Optional[List[PlayerSource]], bool]:
+        if self._stop.is_set():
+            return None, False
+        if not refresh:
+            indexed = self.index.children(key)
+            if indexed is not None:
+                return indexed, False
+        sources = self.player.capture_sources(key or None, use_cache=False)
+        if not sources:
+            # capture_sources reports failures as an empty list; keep what was indexed and try again next pass.
+            return None, True
+        return sources, True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.crawl()
+            except Exception as e:
+                logger.error(f"Crawling {self.player.name} failed: {e}")
+            if self._stop.wait(self.refresh_interval):
+                return
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import daemon
+from benchmarks.bluos_server import BluOSServer
+from cache import BrowseCache, PlayerCache
+from player import BlusoundPlayer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def server():
+    with BluOSServer() as server:
+        yield server
+
+
+@pytest.fixture
+def start_daemon(server, tmp_path):
+    host, port = server.address
+    daemons = []
+
+    def start():
+        player_daemon = daemon.PlayerDaemon(str(tmp_path / 'd.sock'), PlayerCache(path=str(tmp_path / 'p.json')),
+                                            BrowseCache(path=str(tmp_path / 'b.json')))
+        player_daemon.start([BlusoundPlayer(host, 'Sim', port=port, initialize=False)])
+        daemons.append(player_daemon)
+        return player_daemon
+
+    yield start
+    for player_daemon in daemons:
+        player_daemon.stop()
+
+
+def test_transport_commands_match_headless(server, start_daemon):
+    player_daemon = start_daemon()
+    client = daemon.DaemonClient(player_daemon.socket_path)
+    address = f"{server.address[0]}:{server.address[1]}"
+    try:
+        for action, state in (('pause', 'pause'), ('pause', 'pause'), ('play', 'stream'),
+                              ('toggle', 'pause'), ('toggle', 'stream')):
+            result = client.call('command', address=address, action=action)
+            assert result['success'], result
+            assert server.player.state == state, action
+        with pytest.raises(daemon.DaemonError):
+            client.call('command', address=address, action='rewind')
+    finally:
+        client.close()
+
+
+def test_watcher_polls_locally_each_time_the_daemon_drops(server, start_daemon, monkeypatch):
+    monkeypatch.setattr(daemon, 'RECONNECT_INTERVAL', 0.1)
+    player_daemon = start_daemon()
+    state = daemon.attach(player_daemon.socket_path)
+    volumes = []
+    try:
+        player = state.players()[0]
+        state.watcher.subscribe(lambda watched, status: volumes.append(status.volume))
+        state.watcher.watch(player)
+
+        for round_number, volume in enumerate((40, 50)):
+            player_daemon.stop()
+            assert wait_for(lambda: state.watcher.local), f"round {round_number}: no local fallback"
+            assert state.watcher.is_watching(player)
+            server.player.update(volume=volume)
+            assert wait_for(lambda: volume in volumes), f"round {round_number}: no local long-poll"
+
+            player_daemon = start_daemon()
+            assert wait_for(lambda: state.connected and not state.watcher.local), f"round {round_number}"
+            assert state.players()[0] is player
+            assert player.client is state.client
+            # Local long-polls stopped; only the daemon's watcher polls the player now.
+            assert wait_for(lambda: not state.watcher._stop_events)
+            server.player.update(volume=volume + 1)
+            assert wait_for(lambda: volume + 1 in volumes), f"round {round_number}: no pushed status"
+    finally:
+        state.close()
+
+
+def test_selecting_an_input_directly_drops_the_daemons_browse_cache(start_daemon):
+    player_daemon = start_daemon()
+    state = daemon.attach(player_daemon.socket_path)
+    try:
+        player = state.players()[0]
+        sources = player.capture_sources()
+        assert len(player_daemon.browse_cache) == 1
+        assert player.select_input(sources[0])[0]
+        assert len(player_daemon.browse_cache) == 0
+    finally:
+        state.close()
@@ -0,0 +1,96 @@
+import threading
+
+from benchmarks.bluos_server import BluOSFleet
+from player import BlusoundPlayer, PlayerGroup, group_command, parse_sync_status, read_groups
+
+MASTER_XML = """<SyncStatus name="Living Room" mac="90:56:82:AA:BB:CC" group="Downstairs" volume="30" etag="7">
+<slave id="10.0.0.6" port="11000"/>
+<slave id="10.0.0.7" port="11010"/>
+<slave port="11000"/>
+</SyncStatus>"""
+
+SLAVE_XML = """<SyncStatus name="Kitchen" mac="90:56:82:00:00:01" group="Downstairs" volume="25">
+<master port="11000">10.0.0.5</master>
+</SyncStatus>"""
+
+
+def players(count):
+    return [BlusoundPlayer(f'10.0.0.{i}', f'P{i}', initialize=False) for i in range(count)]
+
+
+def test_parse_master():
+    sync = parse_sync_status(MASTER_XML)
+    assert sync.name == 'Living Room'
+    assert sync.mac == '90:56:82:aa:bb:cc'
+    assert sync.group == 'Downstairs'
+    assert sync.volume == 30
+    assert sync.etag == '7'
+    assert sync.master is None
+    assert sync.slaves == ['10.0.0.6:11000', '10.0.0.7:11010']
+
+
+def test_parse_slave_and_ungrouped():
+    sync = parse_sync_status(SLAVE_XML)
+    assert sync.master == '10.0.0.5:11000'
+    assert sync.slaves == []
+    alone = parse_sync_status('<SyncStatus name="Office"/>')
+    assert (alone.master, alone.slaves, alone.group, alone.volume) == (None, [], '', 0)
+
+
+def test_group_command_releases_members_together():
+    result = group_command(players(4), 'play', lambda player: (True, 'ok'))
+    assert result.ok
+    assert all(member.sent_at is not None and member.done_at is not None for member in result.results)
+    assert result.send_skew < 0.5
+
+
+def test_group_command_reports_failures_and_exceptions():
+    def send(player):
+        if player.name == 'P1':
+            return False, 'refused'
+        if player.name == 'P2':
+            raise RuntimeError('boom')
+        return True, 'ok'
+
+    result = group_command(players(3), 'pause', send)
+    assert not result.ok
+    assert [(member.player.name, member.message) for member in result.failed] == [('P1', 'refused'), ('P2', 'boom')]
+    assert 'P1 (refused)' in result.summary()
+
+
+def test_group_command_does_not_wait_for_a_stuck_member():
+    release = threading.Event()
+
+    def send(player):
+        if player.name == 'P0':
+            release.wait(5)
+        return True, 'ok'
+
+    try:
+        result = group_command(players(3), 'play', send, deadline=0.3)
+    finally:
+        release.set()
+    assert [member.player.name for member in result.failed] == ['P0']
+    assert result.failed[0].message == 'No response within 0.3s'
+    assert result.failed[0].sent_at is not None
+
+
+def test_group_command_with_no_players():
+    result = group_command([], 'play', lambda player: (True, ''))
+    assert result.ok and result.results == []
+
+
+def test_read_groups_from_simulated_fleet():
+    with BluOSFleet(4) as fleet:
+        fleet.group(0, [1, 2], name='Downstairs')
+        handles = [BlusoundPlayer(host, f'Player {i + 1}', port=port, initialize=False)
+                   for i, (host, port) in enumerate(fleet.addresses)]
+        groups = sorted(read_groups(handles), key=len, reverse=True)
+
+    assert [len(group) for group in groups] == [3, 1]
+    downstairs = groups[0]
+    assert downstairs.name == 'Downstairs'
+    assert downstairs.master is handles[0]
+    assert downstairs.slaves == handles[1:3]
+    assert handles[3] in groups[1] and handles[3] not in downstairs
+    assert isinstance(downstairs, PlayerGroup)
@@ -0,0 +1,74 @@
+from history import PlayerHistory, StatusHistory, StringPool, sparkline, timeline
+from player import BlusoundPlayer, PlayerStatus
+
+
+def status(volume, state='play', title='So What'):
+    return PlayerStatus(volume=volume, state=state, name=title, artist='Miles Davis', service='Tidal')
+
+
+def test_string_pool_reuses_released_ids():
+    pool = StringPool()
+    a = pool.acquire('a')
+    assert pool.acquire('a') == a
+    b = pool.acquire('b')
+    assert len(pool) == 2
+
+    pool.release(a)
+    assert pool.get(a) == 'a'
+    pool.release(a)
+    assert len(pool) == 1
+    assert pool.get(a) is None
+    assert pool.acquire('c') == a
+    assert pool.get(b) == 'b'
+
+
+def test_ring_buffer_wraps_and_keeps_the_newest_samples():
+    pool = StringPool()
+    history = PlayerHistory('Kitchen', capacity=4, pool=pool)
+    for volume in range(10):
+        history.append(float(volume), status(volume, title=f"track {volume}"))
+
+    assert len(history) == 4
+    assert history.dropped == 6
+    assert [s.volume for s in history.samples()] == [6, 7, 8, 9]
+    assert [s.title for s in history.samples()] == ['track 6', 'track 7', 'track 8', 'track 9']
+    assert history.series('volume', start=7, end=8) == [(7.0, 7), (8.0, 8)]
+    # Overwritten titles are released; the shared state, artist and service stay.
+    assert len(pool) == 4 + 3
+
+
+def test_ring_buffer_skips_unchanged_and_keeps_time_sorted():
+    history = PlayerHistory('Kitchen', capacity=3, pool=StringPool())
+    assert history.append(10.0, status(5))
+    assert not history.append(11.0, status(5))
+    assert history.append(9.0, status(6))
+    assert [s.timestamp for s in history.samples()] == [10.0, 10.0]
+
+
+def test_clear_releases_every_string():
+    pool = StringPool()
+    history = PlayerHistory('Kitchen', capacity=3, pool=pool)
+    for volume in range(5):
+        history.append(float(volume), status(volume, title=str(volume)))
+    history.clear()
+    assert len(history) == 0
+    assert len(pool) == 0
+
+
+def test_status_history_evicts_least_recently_updated_player():
+    history = StatusHistory(capacity=8, max_players=2)
+    players = [BlusoundPlayer(f'10.0.0.{i}', f'P{i}', initialize=False) for i in range(3)]
+    history.record(players[0], status(1), 1.0)
+    history.record(players[1], status(1), 2.0)
+    history.record(players[0], status(2), 3.0)
+    history.record(players[2], status(1), 4.0)
+
+    assert history.players() == ['10.0.0.0:11000', '10.0.0.2:11000']
+    assert history.stats()['samples'] == 3
+    assert history.samples('10.0.0.1:11000') == []
+
+
+def test_timeline_and_sparkline():
+    points = [(1.5, 'play'), (3.5, 'pause')]
+    assert timeline(points, 0.0, 4.0, 4) == [None, 'play', 'play', 'pause']
+    assert sparkline([0, None, 100]) == '_ #'
@@ -0,0 +1,56 @@
+import re
+
+from metrics import RequestMetrics
+
+SAMPLE = re.compile(r'^([a-z_]+)\{([^}]*)\} (\S+)$')
+
+
+def parse_families(text):
+    """Parse the exposition text strictly: every sample must follow its own family's HELP and TYPE."""
+    families = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            name = line.split()[2]
+            assert name not in families, f"{name} appears twice"
+            families[name] = {'type': None, 'samples': []}
+            current = name
+        elif line.startswith('# TYPE '):
+            _, _, name, kind = line.split()
+            assert name == current
+            families[name]['type'] = kind
+        else:
+            name, labels, value = SAMPLE.match(line).groups()
+            family = current
+            if families[current]['type'] == 'histogram':
+                assert name in (f"{family}_bucket", f"{family}_sum", f"{family}_count"), line
+            else:
+                assert name == family, line
+            families[family]['samples'].append((name, labels, float(value)))
+    return families
+
+
+def test_prometheus_families_are_contiguous():
+    metrics = RequestMetrics()
+    metrics.record('10.0.0.1:11000', '/Status', 0.02, 100)
+    metrics.record('10.0.0.1:11000', '/Browse', 0.3, 5000)
+    metrics.record('10.0.0.2:11000', '/Status', 0.04, 120, error=True)
+    families = parse_families(metrics.to_prometheus())
+
+    assert list(families) == ['blucli_requests_total', 'blucli_request_errors_total',
+                              'blucli_request_timeouts_total', 'blucli_response_bytes_total',
+                              'blucli_request_duration_seconds']
+    requests = families['blucli_requests_total']['samples']
+    assert len(requests) == 3 and all(value == 1 for _, _, value in requests)
+    assert sum(value for _, _, value in families['blucli_request_errors_total']['samples']) == 1
+    assert sum(value for _, _, value in families['blucli_response_bytes_total']['samples']) == 5220
+    histogram = families['blucli_request_duration_seconds']
+    assert histogram['type'] == 'histogram'
+    counts = [value for name, _, value in histogram['samples'] if name.endswith('_count')]
+    assert counts == [1, 1, 1]
+
+
+def test_prometheus_without_samples_still_declares_families():
+    families = parse_families(RequestMetrics().to_prometheus())
+    assert len(families) == 5
+    assert all(not family['samples'] for family in families.values())
@@ -0,0 +1,169 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.bluos_server import BluOSServer
+from player import (PLAYER_ADDED, PLAYER_REMOVED, PLAYER_UPDATED, BlusoundPlayer, MyListener, PlayerRegistry,
+                    _sessions, close_sessions)
+
+SERVICE_TYPE = '_musc._tcp.local.'
+
+
+def announce(registry, service='Kitchen._musc._tcp.local.', host='10.0.0.5', port=11000,
+             name='Kitchen', mac=None):
+    return registry.upsert(service, host, port, name, mac)
+
+
+def test_upsert_adds_then_ignores_repeats():
+    registry = PlayerRegistry()
+    events = []
+    registry.subscribe(events.append)
+
+    added = announce(registry, mac='AA-BB-CC-DD-EE-FF')
+    assert added.kind == PLAYER_ADDED
+    assert added.player.mac == 'aa:bb:cc:dd:ee:ff'
+    assert announce(registry, mac='AA-BB-CC-DD-EE-FF') is None
+    assert len(registry) == 1
+    assert registry.version == 1
+    assert events == [added]
+
+
+def test_upsert_reports_rename():
+    registry = PlayerRegistry()
+    player = announce(registry).player
+
+    event = announce(registry, name='Kitchen Node')
+    assert event.kind == PLAYER_UPDATED
+    assert event.changes == ('name',)
+    assert event.player is player
+    assert player.name == 'Kitchen Node'
+
+
+def test_address_move_keeps_the_same_player():
+    registry = PlayerRegistry()
+    player = announce(registry).player
+
+    event = announce(registry, host='10.0.0.9')
+    assert event.changes == ('address',)
+    assert event.player is player
+    assert player.address == '10.0.0.9:11000'
+    assert registry.get(address='10.0.0.9:11000') is player
+    assert registry.get(address='10.0.0.5:11000') is None
+
+
+def test_mac_identifies_a_player_under_a_new_service_name():
+    registry = PlayerRegistry()
+    player = announce(registry, mac='aa:bb:cc:dd:ee:ff').player
+
+    event = announce(registry, service='Kitchen (2)._musc._tcp.local.', host='10.0.0.9', mac='aa:bb:cc:dd:ee:ff')
+    assert event.player is player
+    assert set(event.changes) == {'address', 'service_name'}
+    assert registry.get(service_name='Kitchen._musc._tcp.local.') is None
+    assert len(registry) == 1
+
+
+def test_reused_address_does_not_merge_different_devices():
+    registry = PlayerRegistry()
+    kitchen = announce(registry).player
+
+    event = announce(registry, service='Office._musc._tcp.local.', name='Office')
+    assert event.kind == PLAYER_ADDED
+    assert event.player is not kitchen
+    assert len(registry) == 2
+
+
+def test_cached_player_is_confirmed_by_address():
+    cached = BlusoundPlayer('10.0.0.5', 'Kitchen', initialize=False)
+    cached.from_cache = True
+    registry = PlayerRegistry([cached])
+
+    event = announce(registry)
+    assert event.player is cached
+    assert event.changes == ('confirmed', 'service_name')
+    assert not cached.from_cache
+
+
+def test_get_by_address_and_mac_ignores_service_name():
+    registry = PlayerRegistry()
+    player = announce(registry, mac='aa:bb:cc:dd:ee:ff').player
+
+    assert registry.get(service_name='Kitchen._musc._tcp.local.') is player
+    assert registry.get(address='10.0.0.5:11000') is player
+    assert registry.get(mac='AA:BB:CC:DD:EE:FF') is player
+    assert registry.get(address='10.0.0.6:11000') is None
+    assert registry.get() is None
+
+
+def test_remove_unindexes_the_player():
+    registry = PlayerRegistry()
+    announce(registry, mac='aa:bb:cc:dd:ee:ff')
+
+    event = registry.remove('Kitchen._musc._tcp.local.')
+    assert event.kind == PLAYER_REMOVED
+    assert registry.remove('Kitchen._musc._tcp.local.') is None
+    assert len(registry) == 0
+    assert registry.get(address='10.0.0.5:11000') is None
+    assert registry.get(mac='aa:bb:cc:dd:ee:ff') is None
+    assert announce(registry).kind == PLAYER_ADDED
+
+
+def test_remove_where_removes_matching_players():
+    registry = PlayerRegistry()
+    announce(registry)
+    announce(registry, service='Office._musc._tcp.local.', host='10.0.0.6', name='Office')
+
+    events = registry.remove_where(lambda p: p.name == 'Office')
+    assert [e.player.name for e in events] == ['Office']
+    assert [p.name for p in registry.players()] == ['Kitchen']
+
+
+def test_move_closes_the_old_session():
+    player = BlusoundPlayer('10.0.0.5', 'Kitchen', initialize=False)
+    old_session = player.session
+    player.move('10.0.0.9', 11000)
+    assert 'http://10.0.0.5:11000' not in _sessions
+    assert player.session is not old_session
+    close_sessions()
+    assert not _sessions
+
+
+class SlowZeroconf:
+    """Answers get_service_info only once `release` is set, like a player whose records are not cached yet."""
+
+    def __init__(self, host, port):
+        self.info = SimpleNamespace(port=port, server='kitchen.local.', properties={},
+                                    parsed_addresses=lambda: [host])
+        self.release = threading.Event()
+
+    def get_service_info(self, type, name):
+        self.release.wait(5)
+        return self.info
+
+
+def test_listener_resolves_off_the_callback_thread():
+    with BluOSServer() as server:
+        zc = SlowZeroconf(*server.address)
+        listener = MyListener()
+        try:
+            started = time.monotonic()
+            listener.add_service(zc, SERVICE_TYPE, 'Kitchen.' + SERVICE_TYPE)
+            assert time.monotonic() - started < 0.5
+            assert not listener.players
+            zc.release.set()
+            deadline = time.monotonic() + 5
+            while not listener.players and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [player.address for player in listener.players] == ['%s:%d' % server.address]
+        finally:
+            listener.close()
+
+
+def test_listener_drops_a_resolve_that_finishes_after_removal():
+    zc = SlowZeroconf('10.0.0.5', 11000)
+    listener = MyListener()
+    listener.add_service(zc, SERVICE_TYPE, 'Kitchen.' + SERVICE_TYPE)
+    listener.remove_service(zc, SERVICE_TYPE, 'Kitchen.' + SERVICE_TYPE)
+    zc.release.set()
+    listener.close()
+    listener._resolver.shutdown(wait=True)
+    assert not listener.players
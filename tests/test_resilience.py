@@ -0,0 +1,53 @@
+import asyncio
+
+from async_player import AsyncBlusoundPlayer
+from player import BlusoundPlayer
+from resilience import CIRCUIT_CLOSED, CircuitBreaker, RetryPolicy, failed_attempt
+
+POLICY = RetryPolicy(attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+def breaker():
+    return CircuitBreaker('test', probe=lambda: False)
+
+
+def test_failed_attempt_counts_one_failure_when_giving_up():
+    circuit = breaker()
+    assert failed_attempt(circuit, POLICY, 0, 3, unreachable=True, retryable=True) == 0.0
+    assert failed_attempt(circuit, POLICY, 1, 3, unreachable=True, retryable=True) == 0.0
+    assert circuit.failures == 0
+    assert failed_attempt(circuit, POLICY, 2, 3, unreachable=True, retryable=True) is None
+    assert circuit.failures == 1
+
+
+def test_failed_attempt_gives_up_on_deadline_and_non_retryable_errors():
+    circuit = breaker()
+    slow = RetryPolicy(attempts=3, base_delay=1.0, max_delay=1.0)
+    assert failed_attempt(circuit, slow, 0, 3, unreachable=True, retryable=True, remaining=0.0) is None
+    assert circuit.failures == 1
+    # An HTTP error response shows the player is up.
+    assert failed_attempt(circuit, POLICY, 0, 3, unreachable=False, retryable=False) is None
+    assert circuit.failures == 0
+    assert circuit.state == CIRCUIT_CLOSED
+
+
+# Nothing listens on the discard port here, so connections are refused at once.
+OFFLINE = ('127.0.0.1', 9)
+
+
+def test_sync_and_async_calls_each_count_one_failure():
+    host, port = OFFLINE
+    player = BlusoundPlayer(host, 'offline', port=port, initialize=False)
+    player.retry_policy = POLICY
+    assert not player.get_status()[0]
+    assert player.circuit.failures == 1
+
+    async def run():
+        async with AsyncBlusoundPlayer(host, 'offline', port=port) as async_player:
+            async_player.retry_policy = POLICY
+            return await async_player.get_status()
+
+    assert not asyncio.run(run())[0]
+    assert player.circuit.failures == 2
+    assert player.circuit.state == CIRCUIT_CLOSED
+    player.circuit.record_success()
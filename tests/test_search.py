@@ -0,0 +1,158 @@
+import random
+
+from benchmarks.bluos_server import BluOSServer, SimulatorConfig, browse_tree_size
+from cache import BrowseCache
+from player import BlusoundPlayer, PlayerSource
+from search import ROOT_KEY, BrowseCrawler, SourceIndex, fold
+
+WORDS = ['Jazz', 'Radio', 'Café', 'Beyoncé', 'Motörhead', 'Live', 'Blue', 'Note', 'Kind', 'of', 'Miles',
+         'Davis', 'Coltrane', 'Love', 'Supreme', 'Station', 'Mix', 'Deep', 'House', 'Classic', 'Rock']
+
+
+def build_index(seed=7, fanout=12, depth=3):
+    """Index a random tree breadth first; returns the index and the entries in node order."""
+    rng = random.Random(seed)
+    index = SourceIndex()
+    entries = []
+    level = [ROOT_KEY]
+    serial = 0
+    for current_depth in range(depth):
+        next_level = []
+        for key in level:
+            sources = []
+            for _ in range(fanout):
+                serial += 1
+                text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + f" {serial}"
+                child = f"c{serial}" if current_depth < depth - 1 else None
+                sources.append(PlayerSource(text, '', child, None, None, 'link' if child else 'audio'))
+                if child:
+                    next_level.append(child)
+            index.add(key, sources, current_depth)
+            entries.extend(sources)
+        level = next_level
+    return index, entries
+
+
+def brute_force(entries, query):
+    terms = fold(query).split()
+    return [source for source in entries if all(term in fold(source.text) for term in terms)]
+
+
+def queries(entries, rng, count=150):
+    for _ in range(count):
+        text = fold(rng.choice(entries).text)
+        start = rng.randrange(len(text))
+        term = text[start:start + rng.randint(1, 6)].strip()
+        if not term:
+            continue
+        yield term
+        yield f"{term} {fold(rng.choice(WORDS))[:rng.randint(1, 4)]}"
+
+
+def test_search_matches_brute_force():
+    index, entries = build_index()
+    assert len(index) == len(entries) == 12 + 144 + 1728
+    assert index.stats()['bitmaps'] > 0
+    rng = random.Random(3)
+    for query in queries(entries, rng):
+        expected = brute_force(entries, query)
+        result = index.search(query, limit=len(entries))
+        assert result.complete
+        if result.fuzzy:
+            assert not expected, query
+            continue
+        assert [hit.source for hit in result.hits] == expected, query
+        assert result.total == len(expected)
+
+
+def test_search_stops_at_a_page_in_node_order():
+    index, entries = build_index()
+    for query in ('jazz', 'cafe', 'e', 'live mi', 'motorhead', 'BEYONCÉ', 'note 1'):
+        expected = brute_force(entries, query)
+        assert len(expected) > 10, query
+        result = index.search(query, limit=10)
+        assert [hit.source for hit in result.hits] == expected[:10]
+        # The total is exact when it comes straight from a posting list, a lower bound otherwise.
+        assert result.total == len(expected) if result.complete else 10 < result.total <= len(expected)
+
+
+def test_search_after_change_and_prune_matches_brute_force():
+    index, entries = build_index()
+    old = {id(source) for source in index.children('c3')}
+    gone = {id(source) for source in index.children('c5')}
+    changed = [PlayerSource(f"Renamed Station {n}", '', None, None, None, 'audio') for n in range(20)]
+    assert index.add('c3', changed, 1)
+    assert index.prune(set(index._containers) - {'c5'}) == 1
+    assert index.rebuild()
+    current = [source for source in entries if id(source) not in old | gone] + changed
+    assert len(index) == len(current)
+    for query in ('renamed', 'station', 'jazz radio', 'c'):
+        found = {id(hit.source) for hit in index.search(query, limit=len(current)).hits}
+        assert found == {id(source) for source in brute_force(current, query)}, query
+
+
+def test_fuzzy_fallback_for_typos():
+    index, entries = build_index()
+    result = index.search('coltarne', limit=5)
+    assert result.fuzzy
+    assert result.hits
+    assert not brute_force(entries, 'coltarne')
+
+
+def test_hit_path_leads_back_to_the_entry():
+    index, entries = build_index()
+    for hit in index.search('supreme', limit=20).hits:
+        sources = index.children(ROOT_KEY)
+        for position in hit.path[:-1]:
+            sources = index.children(sources[position].browse_key)
+        assert sources[hit.path[-1]] is hit.source
+        assert len(hit.path) == hit.depth + 1
+
+
+def test_crawler_bypasses_browse_cache_and_refreshes_oldest_slice():
+    tree = SimulatorConfig(browse_depth=3, browse_fanout=4, seed=5)
+    with BluOSServer(config=tree) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'crawl', port=port, initialize=False)
+        player.browse_cache = BrowseCache()
+        crawler = BrowseCrawler(player, refresh_interval=0, refresh_budget=5)
+        first = crawler.crawl()
+        containers = first['containers']
+        assert first['entries'] == browse_tree_size(tree)
+        assert first['fetched'] == containers
+        assert len(player.browse_cache) == 0
+
+        fetched = []
+        capture = player.capture_sources
+        player.capture_sources = lambda key, use_cache: fetched.append(key or '') or capture(key, use_cache)
+        refreshed = set()
+        for _ in range(-(-containers // 5)):
+            oldest = set(crawler.index.stale(0, 5))
+            fetched.clear()
+            result = crawler.crawl()
+            assert (result['fetched'], result['changed']) == (5, 0)
+            assert set(fetched) == oldest
+            assert not refreshed & oldest or len(refreshed) + 5 > containers
+            refreshed |= oldest
+        # Oldest first: consecutive passes walk through the whole tree.
+        assert len(refreshed) == containers
+        assert len(player.browse_cache) == 0
+
+
+def test_source_changes_drop_cached_browse_results():
+    with BluOSServer(config=SimulatorConfig(browse_depth=2, browse_fanout=3, seed=5)) as server:
+        host, port = server.address
+        player = BlusoundPlayer(host, 'cached', port=port, initialize=False)
+        player.browse_cache = BrowseCache()
+        player.browse_cache.put('http://elsewhere:11000', '', [PlayerSource('Other', None, 'other', None, None, None)])
+        top = player.capture_sources()
+        player.capture_sources(top[0].browse_key)
+        assert len(player.browse_cache) == 3
+
+        player.refresh_sources()
+        assert len(player.browse_cache) == 1
+
+        nested = player.capture_sources(top[0].browse_key)
+        assert len(player.browse_cache) == 2
+        assert player.select_input(nested[0])[0]
+        assert len(player.browse_cache) == 1
@@ -0,0 +1,47 @@
+import time
+
+from benchmarks.bluos_server import BluOSServer
+from player import BlusoundPlayer, PlayerStatus, VolumeController, parse_volume_level
+
+
+def wait_idle(controller, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while controller.busy:
+        assert time.monotonic() < deadline, "volume controller never settled"
+        time.sleep(0.01)
+
+
+def test_parse_volume_level():
+    assert parse_volume_level('<volume db="-20" mute="0">40</volume>') == 40
+    assert parse_volume_level('<ok/>') is None
+    assert parse_volume_level('not xml') is None
+
+
+def test_controller_settles_when_the_player_clamps():
+    with BluOSServer() as server:
+        server.player.max_volume = 60
+        host, port = server.address
+        player = BlusoundPlayer(host, 'Sim', port=port, initialize=False)
+        for ramp_step in (None, 5):
+            server.player.update(volume=50)
+            controller = VolumeController(player, ramp_step=ramp_step, ramp_interval=0.0)
+            controller.observe(PlayerStatus(volume=50))
+            assert controller.set(90) == 90
+            wait_idle(controller)
+            assert (controller.level, controller.target) == (60, 60)
+            sent = controller.requests_sent
+            time.sleep(0.1)
+            assert controller.requests_sent == sent
+            assert server.player.volume == 60
+
+
+def test_controller_reaches_unclamped_targets():
+    with BluOSServer() as server:
+        host, port = server.address
+        controller = VolumeController(BlusoundPlayer(host, 'Sim', port=port, initialize=False),
+                                      ramp_step=10, ramp_interval=0.0)
+        controller.observe(PlayerStatus(volume=28))
+        controller.set(70)
+        wait_idle(controller)
+        assert controller.level == controller.target == server.player.volume == 70
+        assert controller.requests_sent == 5